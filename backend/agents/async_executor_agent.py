@@ -0,0 +1,244 @@
+import asyncio
+
+from agents.executor_agent import (
+    ExecutorAgent, CONTROL_WAIT_SECONDS, DUMMY_BANK_BASE_URL, PAGE_READY_SELECTOR, format_amount,
+)
+from agents.plan_compiler import FUSED_DOM_JS, FusedRunRejected
+from agents.safety_officer import SafetyOfficer
+from services.async_playwright_engine import AsyncPlaywrightEngine
+from services.async_redis_memory import async_redis_memory
+from services.metrics import metrics
+from services.redis_memory import redis_memory, DEFAULT_SESSION
+from services.vision_engine import VisionEngine
+from services.wait_strategy import AsyncWaitStrategy
+
+
+class AsyncExecutorAgent(ExecutorAgent):
+    """
+    ExecutorAgent on AsyncPlaywrightEngine.
+
+    Browser steps are awaited so many workflows can share one event loop
+    (and one Chromium). Workflow state (step pointer, pause/risk, logs,
+    screenshots) goes through AsyncRedisMemory (`self.state`), so nothing
+    on the loop blocks on Redis. Ledger steps (resolve_bill,
+    record_deposit, record_completion) are inherited and run on a worker
+    thread against the sync RedisMemory (`self.memory`).
+    """
+
+    def __init__(self, shared_browser=None):
+        # Not super().__init__(): that would build sync engines to discard
+        self.browser = AsyncPlaywrightEngine(shared_browser)
+        self.vision = VisionEngine()
+        self.safety = SafetyOfficer(self.browser, self.vision)
+        self.waits = AsyncWaitStrategy(self.browser)
+        self._init_state()
+        self.state = async_redis_memory
+
+    # ---------------------------------------------
+    # MAIN EXECUTION LOOP
+    # ---------------------------------------------
+    async def run(self, session_id: str = DEFAULT_SESSION):
+        self.memory = redis_memory.for_session(session_id)
+        self.state = async_redis_memory.for_session(session_id)
+        self.safety.memory = self.memory
+        self.safety.async_memory = self.state
+
+        plan = await self.state.get_plan()
+        if not plan:
+            raise ValueError("No plan found in Redis.")
+
+        self.fused_runs = self.compile_runs(plan)
+
+        self.page = await self.browser.launch()
+        await self.state.clear_control()
+
+        try:
+            await self._run_loop(plan)
+        finally:
+            await self.browser.release()
+
+    async def warm_up(self):
+        await self.browser.start()
+
+    async def close(self):
+        await self.browser.close()
+
+    async def _run_loop(self, plan):
+        while True:
+            step_id = await self.state.get_current_step()
+            paused = await self.state.is_paused()
+
+            if step_id >= len(plan):
+                await self.state.push_log("Workflow completed.")
+                break
+
+            if paused:
+                await self.state.wait_control(CONTROL_WAIT_SECONDS)
+                continue
+
+            run = self.fused_runs.get(step_id)
+            if run and await self.execute_fused(run):
+                await self.state.set_current_step(run.end)
+                continue
+
+            step = plan[step_id]
+            await self.state.push_log(f"About to execute step {step_id + 1}: {step}")
+
+            await self.execute_step(step)
+
+            await self.state.increment_step()
+
+    async def execute_fused(self, run) -> bool:
+        amount = await self._fused_amount(run.steps)
+        ops = self.fused_ops(run.steps, amount)
+        await self.state.push_log(
+            f"About to execute steps {run.start + 1}-{run.end} in one round trip: "
+            f"{[step['action'] for step in run.steps]}"
+        )
+        try:
+            if run.navigates:
+                async with self.waits.navigation():
+                    await self._apply_fused_async(ops)
+            else:
+                await self._apply_fused_async(ops)
+                await self.waits.dom_settled()
+        except FusedRunRejected as e:
+            await self.state.push_log(f"Fused steps rejected ({e}), running them one by one")
+            metrics.incr("plan_fusion.fallbacks")
+            return False
+
+        for line in self.fused_log_lines(run.steps, amount):
+            await self.state.push_log(line)
+        self._count_fused(run)
+        return True
+
+    async def _fused_amount(self, steps):
+        for step in steps:
+            if step["action"] == "enter_amount":
+                return await self.resolve_amount_async(step)
+        return None
+
+    async def _apply_fused_async(self, ops):
+        result = await self.page.evaluate(FUSED_DOM_JS, ops)
+        if not result.get("ok"):
+            raise FusedRunRejected(result.get("reason"))
+
+    async def resolve_amount_async(self, step) -> str:
+        amt = step["amount"]
+        if amt is None:
+            amt = await self.state.get_temp("current_bill_amount")
+        return format_amount(amt)
+
+    # ---------------------------------------------
+    # Step Executor
+    # ---------------------------------------------
+    async def execute_step(self, step):
+        action = step["action"]
+
+        if action == "navigate":
+            await self.handle_navigate(step)
+            await self.pacing.pause_async("navigate")
+
+        elif action == "click":
+            await self.handle_click(step)
+            await self.pacing.pause_async("click")
+
+        elif action == "enter_amount":
+            amt_str = await self.resolve_amount_async(step)
+
+            if self.pacing.enabled:
+                await self.browser.type_slow(
+                    "input#amount", amt_str, delay=self.pacing.typing_delay_ms
+                )
+            else:
+                await self.browser.type_text("input#amount", amt_str)
+
+            await self.page.press("input#amount", "Tab")
+            await self.state.push_log(f"Typed amount (human-like): {amt_str}")
+            await self.pacing.pause_async("enter_amount")
+
+        elif action == "select_biller":
+            await self.state.push_log(f"Selecting biller: {step['entity']}")
+            await self.browser.select("#biller", step["entity"])
+            await self.pacing.pause_async("select_biller")
+
+        elif action in ("confirm_payment", "submit_payment"):
+            allowed = await self.safety.evaluate_async(step)
+            if not allowed:
+                await self.state.push_log("Execution paused by Safety Officer")
+                return
+            await self.handle_final_submit()
+            await self.pacing.pause_async("final_submit")
+
+        elif action == "wait_for_success":
+            await self.page.wait_for_selector("#success", timeout=5000)
+
+        elif action == "capture_success":
+            img = await self.browser.screenshot()
+            await self.state.set_screenshot(img)
+            await self.state.push_log("Captured success screenshot")
+
+        elif action == "log_completion":
+            # Ledger (sync Redis) off the event loop
+            await asyncio.to_thread(self.record_completion, step)
+
+        elif action == "pause_for_approval":
+            await self.trigger_pause(step)
+
+        elif action == "select_beneficiary":
+            await self.browser.type_text("#recipient", step["entity"])
+
+        elif action == "confirm_transfer":
+            await self.handle_final_submit()
+
+        elif action == "fetch_bill_amount":
+            await asyncio.to_thread(self.resolve_bill, step)
+            await self.trigger_pause(step)
+
+        elif action == "deposit_funds":
+            await asyncio.to_thread(self.record_deposit, step)
+            await self.pacing.pause_async("deposit_funds")
+
+        else:
+            await self.state.push_log(f"Unknown action: {action}")
+
+    # ---------------------------------------------
+    # Browser steps
+    # ---------------------------------------------
+    async def handle_navigate(self, step):
+        url = f"{DUMMY_BANK_BASE_URL}/{step['page']}.html"
+        await self.browser.navigate(url, ready_selector=PAGE_READY_SELECTOR)
+
+    async def handle_click(self, step):
+        target = step["target"]
+        selector = self.click_selector(target)
+        if selector:
+            await self.state.push_log(f"Clicking {target}")
+            await self.waits.click(selector, navigates=target in self.navigating_targets)
+            return
+
+        # Fallback to Vision model
+        metrics.incr("executor.vision_clicks")
+        screenshot = await self.browser.screenshot()
+        bbox = await self.vision.locate_element_async(screenshot, target)
+
+        if bbox:
+            x, y = bbox
+            await self.page.mouse.click(x, y)
+        else:
+            await self.state.push_log(f"Failed to locate {target}.")
+            raise RuntimeError("Executor could not find element.")
+
+    async def handle_final_submit(self):
+        buttons = self.page.locator("button")
+        async with self.waits.navigation():
+            await buttons.nth(0).click()
+
+    async def trigger_pause(self, step):
+        img = await self.browser.screenshot()
+        await self.state.set_screenshot(img)
+
+        await self.state.set_paused(True)
+        await self.state.set_risk("High-risk action requires approval")
+
+        await self.state.push_log(f"Paused before executing step: {step['action']}")
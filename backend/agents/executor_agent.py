@@ -1,70 +1,168 @@
-import time
-import base64
-from services.redis_memory import redis_memory
+import os
+from services.redis_memory import redis_memory, DEFAULT_SESSION
 from services.playwright_engine import PlaywrightEngine
+from services.wait_strategy import WaitStrategy, HumanPacing
 from services.vision_engine import VisionEngine
 from agents.safety_officer import SafetyOfficer
+from agents.plan_compiler import (
+    PLAN_FUSION, FUSED_DOM_JS, FusedRunRejected, compile_plan_runs,
+)
+from services.metrics import metrics
+from services.selector_index import selector_index, page_from_url, SELECTOR_INDEX_STRICT
 from services.profile_engine import apply_transaction
 
-DUMMY_BANK_BASE_URL = "http://localhost:8000/dummy_bank"
+DUMMY_BANK_BASE_URL = os.getenv("DUMMY_BANK_BASE_URL", "http://localhost:8000/dummy_bank")
+
+# Every dummy_bank page renders its content inside .container
+PAGE_READY_SELECTOR = ".container"
+
+# Upper bound on one blocking wait while paused. Approve/reject wake the
+# executor immediately; this only bounds how long a lost signal can stall it.
+CONTROL_WAIT_SECONDS = 30
+
+# Map plan "targets" to CSS selectors (DOM-first approach)
+SELECTOR_MAP = {
+    "invest_button": "#buy-gold-btn",
+    "transfer_button": "#transfer-btn",
+    "pay_bill_button": "#pay-bill-btn",
+    "proceed_button": "#proceed-btn",
+    "submit_bill_button": "#confirmBtn"
+}
+
+# Targets whose click loads another dummy_bank page
+NAVIGATING_TARGETS = {
+    "invest_button",
+    "transfer_button",
+    "pay_bill_button",
+    "proceed_button",
+    "submit_bill_button",
+}
+
+
+def plan_click_targets():
+    from agents.planner_agent import PLAN_TEMPLATES
+    return {
+        step["target"]
+        for steps in PLAN_TEMPLATES.values()
+        for step in steps
+        if step["action"] == "click"
+    }
+
+
+def format_amount(amt) -> str:
+    if amt is None:
+        raise RuntimeError("Unable to resolve bill amount")
+
+    # Always integer string for finance
+    return str(int(float(amt)))
+
 
 class ExecutorAgent:
     def __init__(self):
         self.browser = PlaywrightEngine()
         self.vision = VisionEngine()
-        self.safety = SafetyOfficer(self.browser)
+        self.safety = SafetyOfficer(self.browser, self.vision)
+        self.waits = WaitStrategy(self.browser)
+        self._init_state()
+
+    def _init_state(self):
+        """
+        Everything that doesn't depend on the browser engine; shared with
+        AsyncExecutorAgent.
+        """
+        self.pacing = HumanPacing()
 
         self.page = None
+        self.memory = redis_memory
+        self.fusion = PLAN_FUSION
+        self.fused_runs = {}
+
+        self.selector_map = dict(SELECTOR_MAP)
+        self.navigating_targets = set(NAVIGATING_TARGETS)
 
-        # Map plan "targets" to CSS selectors (DOM-first approach)
-        self.selector_map = {
-            "invest_button": "#buy-gold-btn",
-            "transfer_button": "#transfer-btn",
-            "pay_bill_button": "#pay-bill-btn",
-            "proceed_button": "#proceed-btn",
-            "submit_bill_button": "#confirmBtn"
-        }
+        self.selectors = selector_index
+        self.validate_selectors()
 
     # ---------------------------------------------
     # MAIN EXECUTION LOOP
     # ---------------------------------------------
-    def run(self):
-        plan = redis_memory.get_plan()
+    def run(self, session_id: str = DEFAULT_SESSION):
+        # Bind every Redis read/write of this run to the workflow session
+        self.memory = redis_memory.for_session(session_id)
+        self.safety.memory = self.memory
+
+        plan = self.memory.get_plan()
         if not plan:
             raise ValueError("No plan found in Redis.")
 
-        self.page = self.browser.launch()
+        self.fused_runs = self.compile_runs(plan)
 
+        self.page = self.browser.launch()
+        self.memory.clear_control()
+
+        try:
+            self._run_loop(plan)
+        finally:
+            # Hand the browser context back for cleanup and reuse
+            self.browser.release()
+
+    def warm_up(self):
+        """
+        Starts the browser and pre-warms contexts before the first job.
+        """
+        self.browser.start()
+
+    def close(self):
+        self.browser.close()
+
+    def validate_selectors(self):
+        """
+        Checks selector_map against the offline selector index, so a
+        renamed button shows up at startup (and under `selector_map` in
+        GET /metrics) instead of mid-workflow.
+        """
+        problems = self.selectors.validate(
+            self.selector_map, self.navigating_targets, plan_click_targets()
+        )
+        metrics.register_collector("selector_map", lambda: {"problems": problems})
+        if problems and SELECTOR_INDEX_STRICT:
+            raise ValueError(f"selector_map does not match dummy_bank: {problems}")
+        return problems
+
+    def compile_runs(self, plan):
+        # Human pacing wants the pauses between steps, so nothing is fused
+        if not self.fusion or self.pacing.enabled:
+            return {}
+        return compile_plan_runs(plan, self.selector_map, self.navigating_targets)
+
+    def _run_loop(self, plan):
         while True:
-            step_id = redis_memory.get_current_step()
-            paused = redis_memory.is_paused()
-
-            print(f"DEBUG: Executor loop, step_id={step_id}, paused={paused}")
+            step_id = self.memory.get_current_step()
+            paused = self.memory.is_paused()
 
             # End condition
             if step_id >= len(plan):
-                redis_memory.push_log("Workflow completed.")
-                print("DEBUG: Workflow completed, exiting executor")
+                self.memory.push_log("Workflow completed.")
                 break
 
-            # If paused, just wait
+            # If paused, block until /approve, /reject or cancel signals us
             if paused:
-                time.sleep(0.5)
+                self.memory.wait_control(timeout=CONTROL_WAIT_SECONDS)
                 continue
 
-            step = plan[step_id]
-            redis_memory.push_log(f"About to execute step {step_id + 1}: {step}")
+            run = self.fused_runs.get(step_id)
+            if run and self.execute_fused(run):
+                self.memory.set_current_step(run.end)
+                continue
 
-            # # 🔴 PAUSE BEFORE EXECUTION
-            # # if step.get("requires_pause"):
-            # #     self.trigger_pause(step)
-            #     continue  # DO NOT execute yet
+            step = plan[step_id]
+            self.memory.push_log(f"About to execute step {step_id + 1}: {step}")
 
             # ✅ SAFE STEP — EXECUTE ONCE
             self.execute_step(step)
 
             # Move forward
-            redis_memory.increment_step()
+            self.memory.increment_step()
 
     # Step Executor
     # ---------------------------------------------
@@ -73,41 +171,37 @@ class ExecutorAgent:
 
         if action == "navigate":
             self.handle_navigate(step)
-            time.sleep(1)
+            self.pacing.pause("navigate")
 
         elif action == "click":
             self.handle_click(step)
-            time.sleep(1)
+            self.pacing.pause("click")
 
 
         elif action == "enter_amount":
-            amt = step["amount"]
+            amt_str = self.resolve_amount(step)
 
-            if amt is None:
-                amt = redis_memory.get_temp("current_bill_amount")
-
-            if amt is None:
-                raise RuntimeError("Unable to resolve bill amount")
-
-            # Always integer string for finance
-            amt_str = str(int(float(amt)))
-
-            self.browser.type_slow("input#amount", amt_str)
+            if self.pacing.enabled:
+                self.browser.type_slow(
+                    "input#amount", amt_str, delay=self.pacing.typing_delay_ms
+                )
+            else:
+                self.browser.type_text("input#amount", amt_str)
 
             # Blur like real user
             self.page.press("input#amount", "Tab")
 
 
-            redis_memory.push_log(f"Typed amount (human-like): {amt_str}")
+            self.memory.push_log(f"Typed amount (human-like): {amt_str}")
 
-            time.sleep(0.3)
+            self.pacing.pause("enter_amount")
 
 
 
         elif action == "select_biller":
-            redis_memory.push_log(f"Selecting biller: {step['entity']}")
+            self.memory.push_log(f"Selecting biller: {step['entity']}")
             self.browser.select("#biller", step["entity"])
-            time.sleep(1)
+            self.pacing.pause("select_biller")
 
         # elif action == "open_confirmation":
         #     # Dummy bank automatically opens confirmation on click
@@ -116,76 +210,21 @@ class ExecutorAgent:
         elif action in ("confirm_payment", "submit_payment", "submit_bill_butoon"):
             allowed = self.safety.evaluate(step)
             if not allowed:
-                redis_memory.push_log("Execution paused by Safety Officer")
+                self.memory.push_log("Execution paused by Safety Officer")
                 return
             self.handle_final_submit()
-            # self.handle_final_submit()
-            time.sleep(1)
+            self.pacing.pause("final_submit")
         elif action == "wait_for_success":
             # wait for success banner / confirmation text
             self.page.wait_for_selector("#success", timeout=5000)
 
         elif action == "capture_success":
             img = self.browser.screenshot()
-            redis_memory.set_screenshot(base64.b64encode(img).decode())
-            redis_memory.push_log("Captured success screenshot")
+            self.memory.set_screenshot(img)
+            self.memory.push_log("Captured success screenshot")
 
         elif action == "log_completion":
-            amount = step.get("amount")
-            profile = redis_memory.get_profile()
-            intent = redis_memory.get_intent()
-            biller=step.get("entity")
-            biller = intent["entity"]
-
-
-            redis_memory.set_profile(profile)
-
-            redis_memory.log_transaction({
-                "type": intent["action"],
-                "amount": amount
-            })
-            if intent["action"] == "pay_bill":
-                amount=profile["bills"][biller]
-                profile["balance"] -= amount
-                redis_memory.clear_bill(intent["entity"])
-                redis_memory.set_profile(profile)
-                redis_memory.log_transaction({
-                    "type": "bill_payment",
-                    "amount": amount
-                })
-                redis_memory.push_log(
-                    f"✅ Bill for {intent['entity']} paid successfully"
-                )
-
-            if intent["action"] == "pay_bill":
-                biller = intent["entity"]
-                amount = redis_memory.get_temp("current_bill_amount")
-                amount=profile["bills"][biller]
-
-                profile["balance"] -= amount
-                profile["bills"][biller] = 0
-
-                redis_memory.set_profile(profile)
-
-                redis_memory.log_transaction({
-                    "type": "bill_payment",
-                    "amount": amount
-                })
-
-            if intent["action"] == "buy_gold":
-                amount=step.get("amount")
-                profile["balance"] -= amount
-                redis_memory.set_profile(profile)
-                redis_memory.log_transaction({
-                    "type": "gold_purchase",
-                    "amount": amount
-                })
-                redis_memory.push_log(
-                    f"✅ Bill for {intent['entity']} paid successfully"
-                )
-            redis_memory.set_profile(profile)
-
-            redis_memory.push_log("Transaction completed successfully")
+            self.record_completion(step)
 
         elif action == "pause_for_approval":
             self.trigger_pause(step)
@@ -198,51 +237,96 @@ class ExecutorAgent:
             self.handle_final_submit()
 
         elif action == "fetch_bill_amount":
-            biller = step.get("entity")
-
-            profile = redis_memory.get_profile()
-            bill = profile["bills"].get(biller)
-
-            if bill is None:
-                raise RuntimeError("Unable to resolve bill amount")
-
-            redis_memory.set_temp("current_bill_amount", bill)
-
-            redis_memory.push_log(
-                f"📄 Found ₹{bill} due for {biller}. Awaiting user approval."
-            )
-
+            self.resolve_bill(step)
             self.trigger_pause(step)
             return
         
         elif action == "deposit_funds":
-            amount = step.get("amount")
-
-            if not amount or amount <= 0:
-                raise RuntimeError("Invalid deposit amount")
-
-            profile = redis_memory.get_profile()
-
-            profile["balance"] += amount
-
-            redis_memory.set_profile(profile)
-
-            redis_memory.log_transaction({
-                "type": "deposit",
-                "amount": amount
-            })
-
-            redis_memory.push_log(f"💰 Deposited ₹{amount} successfully")
-            redis_memory.push_narration(
-                f"I have deposited {amount} rupees into your account."
-            )
-
-            time.sleep(0.5)
+            self.record_deposit(step)
+            self.pacing.pause("deposit_funds")
 
 
 
         else:
-            redis_memory.push_log(f"Unknown action: {action}")
+            self.memory.push_log(f"Unknown action: {action}")
+
+    # ---------------------------------------------
+    # Fused DOM steps (see agents/plan_compiler.py)
+    # ---------------------------------------------
+    def execute_fused(self, run) -> bool:
+        """
+        Runs a FusedRun in one page.evaluate. Returns False (page
+        untouched) when the page doesn't match, so the caller falls back
+        to executing the steps one by one.
+        """
+        ops = self.fused_ops(run.steps)
+        self.memory.push_log(
+            f"About to execute steps {run.start + 1}-{run.end} in one round trip: "
+            f"{[step['action'] for step in run.steps]}"
+        )
+        try:
+            if run.navigates:
+                with self.waits.navigation():
+                    self._apply_fused(ops)
+            else:
+                self._apply_fused(ops)
+                self.waits.dom_settled()
+        except FusedRunRejected as e:
+            return self._fused_rejected(e)
+
+        self._fused_done(run)
+        return True
+
+    def _apply_fused(self, ops):
+        result = self.page.evaluate(FUSED_DOM_JS, ops)
+        if not result.get("ok"):
+            raise FusedRunRejected(result.get("reason"))
+
+    def fused_ops(self, steps, amount=None):
+        """
+        DOM ops for a fused run. `amount` is the already resolved amount
+        string, if the caller has it.
+        """
+        ops = []
+        for step in steps:
+            action = step["action"]
+            if action == "click":
+                ops.append({"op": "click", "selector": self.selector_map[step["target"]]})
+            elif action == "enter_amount":
+                ops.append({"op": "fill", "selector": "input#amount",
+                            "value": amount or self.resolve_amount(step)})
+            elif action == "select_biller":
+                ops.append({"op": "select", "selector": "#biller", "value": step["entity"]})
+            elif action == "select_beneficiary":
+                ops.append({"op": "fill", "selector": "#recipient", "value": step["entity"]})
+        return ops
+
+    def _fused_rejected(self, error) -> bool:
+        self.memory.push_log(f"Fused steps rejected ({error}), running them one by one")
+        metrics.incr("plan_fusion.fallbacks")
+        return False
+
+    def _fused_done(self, run):
+        for line in self.fused_log_lines(run.steps):
+            self.memory.push_log(line)
+        self._count_fused(run)
+
+    def fused_log_lines(self, steps, amount=None):
+        # Same log lines the single-step handlers write
+        lines = []
+        for step in steps:
+            action = step["action"]
+            if action == "click":
+                lines.append(f"Clicking {step['target']}")
+            elif action == "enter_amount":
+                lines.append(f"Typed amount (human-like): {amount or self.resolve_amount(step)}")
+            elif action == "select_biller":
+                lines.append(f"Selecting biller: {step['entity']}")
+        return lines
+
+    def _count_fused(self, run):
+        metrics.incr("plan_fusion.runs")
+        metrics.incr("plan_fusion.steps", len(run.steps))
 
     # ---------------------------------------------
     # Navigation Step
@@ -250,23 +334,36 @@ class ExecutorAgent:
     def handle_navigate(self, step):
         page = step["page"]
         url = f"{DUMMY_BANK_BASE_URL}/{page}.html"
-        self.browser.navigate(url)
+        self.browser.navigate(url, ready_selector=PAGE_READY_SELECTOR)
 
     # ---------------------------------------------
     # Click Step (DOM → Vision fallback)
     # ---------------------------------------------
+    def click_selector(self, target):
+        """
+        The selector to click for `target` on the current page, or None
+        when the selector index knows it isn't there (vision fallback).
+        Pages the index hasn't crawled get the DOM path.
+        """
+        selector = self.selector_map.get(target)
+        if selector is None:
+            return None
+        if self.selectors.expects(page_from_url(self.page.url), selector) is False:
+            return None
+        return selector
+
     def handle_click(self, step):
         target = step["target"]
 
-        selector = self.selector_map.get(target)
-
-        if selector and self.browser.selector_exists(selector):
-            redis_memory.push_log(f"Clicking {target}")
-            self.browser.click(selector)
+        # One actionability wait inside click(), no separate existence probe
+        selector = self.click_selector(target)
+        if selector:
+            self.memory.push_log(f"Clicking {target}")
+            self.waits.click(selector, navigates=target in self.navigating_targets)
             return
 
-
         # Fallback to Vision model
+        metrics.incr("executor.vision_clicks")
         screenshot = self.browser.screenshot()
         bbox = self.vision.locate_element(screenshot, target)
 
@@ -274,7 +371,7 @@ class ExecutorAgent:
             x, y = bbox
             self.page.mouse.click(x, y)
         else:
-            redis_memory.push_log(f"Failed to locate {target}.")
+            self.memory.push_log(f"Failed to locate {target}.")
             raise RuntimeError("Executor could not find element.")
 
     # ---------------------------------------------
@@ -283,13 +380,86 @@ class ExecutorAgent:
     def handle_final_submit(self):
         # On gold_confirm.html or bill_confirm.html
         buttons = self.page.locator("button")
-        buttons.nth(0).click()
+        with self.waits.navigation():
+            buttons.nth(0).click()
 
     def trigger_pause(self, step):
         img = self.browser.screenshot()
-        redis_memory.set_screenshot(base64.b64encode(img).decode())
+        self.memory.set_screenshot(img)
 
-        redis_memory.set_paused(True)
-        redis_memory.set_risk("High-risk action requires approval")
+        self.memory.set_paused(True)
+        self.memory.set_risk("High-risk action requires approval")
 
-        redis_memory.push_log(f"Paused before executing step: {step['action']}")
+        self.memory.push_log(f"Paused before executing step: {step['action']}")
+
+    # ---------------------------------------------
+    # Profile-only steps (no browser, shared with AsyncExecutorAgent)
+    # ---------------------------------------------
+    def resolve_amount(self, step) -> str:
+        amt = step["amount"]
+
+        if amt is None:
+            amt = self.memory.get_temp("current_bill_amount")
+
+        return format_amount(amt)
+
+    def resolve_bill(self, step):
+        biller = step.get("entity")
+
+        bill = self.memory.ledger.bill(biller)
+
+        if bill is None:
+            raise RuntimeError("Unable to resolve bill amount")
+
+        self.memory.set_temp("current_bill_amount", bill)
+
+        self.memory.push_log(
+            f"📄 Found ₹{bill} due for {biller}. Awaiting user approval."
+        )
+
+    def record_deposit(self, step):
+        amount = step.get("amount")
+
+        if not amount or amount <= 0:
+            raise RuntimeError("Invalid deposit amount")
+
+        self.settle("deposit_funds", amount)
+
+        self.memory.push_log(f"💰 Deposited ₹{amount} successfully")
+        self.memory.push_narration(
+            f"I have deposited {amount} rupees into your account."
+        )
+
+    def record_completion(self, step):
+        intent = self.memory.get_intent()
+        action = intent["action"]
+        entity = intent.get("entity")
+
+        if action == "pay_bill":
+            # The amount the user approved and the bank page was given
+            result = self.settle(action, self.memory.get_temp("current_bill_amount"), entity)
+            self.memory.push_log(f"✅ Bill for {entity} paid successfully (₹{result.amount})")
+        elif action == "buy_gold":
+            # log_completion carries no amount; the intent holds what was entered
+            result = self.settle(action, intent.get("amount"))
+            self.memory.push_log(f"✅ Bought digital gold for ₹{result.amount}")
+        elif action == "transfer_money":
+            result = self.settle(action, intent.get("amount"), entity)
+            self.memory.push_log(f"✅ Transferred ₹{result.amount} to {entity}")
+
+        self.memory.push_log("Transaction completed successfully")
+
+    def settle(self, action, amount, entity=None):
+        """
+        Applies the workflow's ledger transaction, keyed by session run and
+        step, so a retried or resumed step never moves money twice.
+        """
+        txn_id = self.memory.transaction_id(self.memory.get_current_step())
+        result = apply_transaction(action, amount, entity, txn_id=txn_id, memory=self.memory)
+
+        if result.status == "duplicate":
+            self.memory.push_log(f"Ledger transaction {txn_id} was already recorded")
+        elif not result.applied:
+            self.memory.push_log(f"🟥 Ledger refused {action}: {result.status} (balance ₹{result.balance})")
+            raise RuntimeError(f"Ledger refused {action}: {result.status}")
+        return result
@@ -88,6 +88,9 @@
 
 
 
+import hashlib
+import json
+
 from pydantic import BaseModel
 from pydantic_ai import Agent
 from typing import Optional, Literal
@@ -103,9 +106,9 @@ class IntentOutput(BaseModel):
     entity: Optional[str] = None
 
 
-intent_agent = Agent(
-        "openai:gpt-4o-mini",
-        instructions="""
+INTENT_MODEL = "openai:gpt-4o-mini"
+
+INTENT_INSTRUCTIONS = """
     You are an intent extraction system.
 
     Rules:
@@ -136,7 +139,18 @@ intent_agent = Agent(
 
     "Pay electricity bill to Tata for 900"
     → {"action":"pay_bill","amount":900,"entity":"tata"}
-    """,
+    """
+
+# Changes whenever the model, instructions or output schema change; cached
+# intents from another version are never served
+INTENT_AGENT_VERSION = hashlib.sha256(
+    (INTENT_MODEL + INTENT_INSTRUCTIONS + json.dumps(IntentOutput.schema(), sort_keys=True)).encode()
+).hexdigest()[:12]
+
+
+intent_agent = Agent(
+        INTENT_MODEL,
+        instructions=INTENT_INSTRUCTIONS,
         output_type=IntentOutput,
     )
 
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import AsyncIterable, Optional, Tuple
+
+from agents.intent_agent import IntentOutput, intent_agent
+from agents.intent_rules import parse_intent
+from services.intent_cache import intent_cache
+from services.metrics import metrics
+
+# LLM calls in flight per batch
+INTENT_BATCH_CONCURRENCY = int(os.getenv("INTENT_BATCH_CONCURRENCY", "8"))
+
+
+async def resolve_fast(text: str) -> Optional[Tuple[IntentOutput, str]]:
+    """
+    Rule fast path, then the intent cache. Returns (intent, source) or
+    None when only the LLM can answer.
+    """
+    start = time.perf_counter()
+    intent = parse_intent(text)
+    metrics.observe("intent.rules", (time.perf_counter() - start) * 1000)
+    if intent is not None:
+        metrics.incr("intent.rules_hits")
+        print(f"🟩 [Intent] Rule fast path: {intent.dict()}")
+        return intent, "rules"
+
+    intent = await intent_cache.get_async(text)
+    if intent is not None:
+        print(f"🟩 [Intent] Cache hit: {intent.dict()}")
+        return intent, "cache"
+
+    return None
+
+
+async def resolve_llm(text: str) -> IntentOutput:
+    metrics.incr("intent.llm_fallbacks")
+    start = time.perf_counter()
+    result = await intent_agent.run(text)
+    metrics.observe("intent.llm", (time.perf_counter() - start) * 1000)
+
+    await intent_cache.put_async(text, result.output)
+    return result.output
+
+
+async def resolve_intent(text: str) -> IntentOutput:
+    """
+    Cheapest source first: rule fast path, then the intent cache, and the
+    LLM only for commands neither can answer. LLM answers are cached.
+    """
+    hit = await resolve_fast(text)
+    if hit is not None:
+        return hit[0]
+    return await resolve_llm(text)
+
+
+# ---------------------------------------------
+# Batch
+# ---------------------------------------------
+def parse_batch_line(line: str, field: str = "text") -> str:
+    """
+    A JSONL line is either an object carrying the command under `field`
+    or a bare JSON string.
+    """
+    item = json.loads(line)
+    text = item.get(field) if isinstance(item, dict) else item
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError(f"missing '{field}'")
+    return text
+
+
+async def resolve_batch(lines: AsyncIterable[str], field: str = "text",
+                        concurrency: int = INTENT_BATCH_CONCURRENCY):
+    """
+    Yields one result dict per non-blank input line, in input order:
+    {"index", "intent", "source"} or {"index", "error"}, then a final
+    {"summary": {...}} with throughput.
+
+    Rules and cache answer inline; the rest go to the LLM with at most
+    `concurrency` calls in flight. At most a few windows of results are
+    held back waiting for a slow earlier line.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    window = concurrency * 4
+    pending = deque()
+    sources = {"rules": 0, "cache": 0, "llm": 0}
+    errors = 0
+    start = time.perf_counter()
+
+    async def one(index: int, line: str) -> dict:
+        try:
+            text = parse_batch_line(line, field)
+            hit = await resolve_fast(text)
+            if hit is None:
+                async with semaphore:
+                    hit = (await resolve_llm(text), "llm")
+        except Exception as e:
+            return {"index": index, "error": repr(e)}
+        return {"index": index, "intent": hit[0].dict(), "source": hit[1]}
+
+    def tally(result: dict) -> dict:
+        nonlocal errors
+        if "error" in result:
+            errors += 1
+        else:
+            sources[result["source"]] += 1
+        return result
+
+    index = 0
+    try:
+        async for line in lines:
+            if not line.strip():
+                continue
+            pending.append(asyncio.create_task(one(index, line)))
+            index += 1
+            while len(pending) > window:
+                yield tally(await pending.popleft())
+        while pending:
+            yield tally(await pending.popleft())
+    finally:
+        for task in pending:
+            task.cancel()
+
+    elapsed = time.perf_counter() - start
+    metrics.incr("intent.batch_items", index)
+    metrics.set_gauge("intent.batch_intents_per_sec", index / elapsed if elapsed else 0.0)
+    yield {"summary": {
+        "count": index,
+        "errors": errors,
+        "sources": sources,
+        "elapsed_s": round(elapsed, 3),
+        "intents_per_sec": round(index / elapsed, 2) if elapsed else 0.0,
+    }}
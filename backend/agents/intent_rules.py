@@ -0,0 +1,126 @@
+import re
+from typing import Optional
+
+from agents.intent_agent import IntentOutput
+
+# ---------------------------------------------
+# Gazetteer
+# ---------------------------------------------
+BILLERS = {
+    "adani": ("adani", "adani power", "adani electricity"),
+    "tata": ("tata", "tata power", "tata electricity"),
+}
+
+ACTION_WORDS = {
+    "buy_gold": r"\b(?:buy|purchase|invest|get)\b",
+    "pay_bill": r"\b(?:pay|settle|clear)\b",
+    "transfer_money": r"\b(?:send|transfer|pay|wire)\b",
+    "deposit_funds": r"\b(?:deposit|add|top\s?up|load)\b",
+}
+
+# Anything that makes a command conditional, negated or a question
+HEDGE_RE = re.compile(
+    r"\b(?:not|don'?t|do not|never|cancel|undo|if|maybe|should i|how much|what|why|can you tell)\b|\?"
+)
+
+_BILLER_RE = re.compile(
+    r"\b(" + "|".join(sorted({a for names in BILLERS.values() for a in names}, key=len, reverse=True)) + r")\b"
+)
+_BILL_RE = re.compile(r"\b(?:bill|electricity|power)\b")
+_GOLD_RE = re.compile(r"\bgold\b")
+_DEPOSIT_TARGET_RE = re.compile(r"\b(?:account|wallet|balance|funds|money)\b")
+
+# "1,200" / "1,20,000" / "1200" / "1.2k" / "₹500" / "rs. 500" / "2 lakh"
+_AMOUNT_RE = re.compile(
+    r"(?:₹|\brs\.?|\binr)?\s*"
+    r"(?P<num>\d{1,3}(?:,\d{2,3})+|\d+(?:\.\d+)?)"
+    r"\s*(?P<unit>k\b|thousand\b|lakhs?\b|lacs?\b|l\b)?"
+)
+# Quantities ("2 grams", "2g", "10 units", "5 coins", "3 shares") are not
+# rupee amounts; only the LLM may decide what such a command means
+_QUANTITY_RE = re.compile(
+    r"\d\s*(?:g|gm|gms|kg|mg)\b"
+    r"|\b(?:grams?|grammes?|kgs?|kilos?|kilograms?|tolas?|ounces?|oz|units?|coins?|shares?|qty|quantity)\b"
+)
+_UNITS = {"k": 1_000, "thousand": 1_000, "lakh": 100_000, "lakhs": 100_000,
+          "lac": 100_000, "lacs": 100_000, "l": 100_000}
+
+# Recipient: "to rahul", "to my mom"; billers are excluded by the caller
+_RECIPIENT_RE = re.compile(r"\bto\s+(?:my\s+)?(?P<name>[a-z][a-z]*)\b")
+_RECIPIENT_STOPWORDS = {"account", "wallet", "balance", "the", "a", "an", "me", "self", "gold"}
+
+
+def _amounts(text: str):
+    amounts = set()
+    for m in _AMOUNT_RE.finditer(text):
+        value = float(m.group("num").replace(",", "")) * _UNITS.get(m.group("unit") or "", 1)
+        if value != int(value) or value <= 0:
+            return None  # paise or nonsense: not a whole-rupee command
+        amounts.add(int(value))
+    return amounts
+
+
+_CURRENCY_WORDS_RE = re.compile(r"₹|\b(?:rs\.?|inr|rupees?)(?=\s|$|\d)")
+# "?" is kept: "buy gold for 500?" is a question, not a command
+_PUNCT_RE = re.compile(r"[^\w\s.?]|(?<!\d)\.|\.(?!\d)")
+
+
+def normalize_utterance(text: str) -> str:
+    """
+    Canonical form of a command for cache keys: lower case, single spaces,
+    no punctuation (except "?") or currency words, and every amount as a plain integer
+    ("Rs. 1,200" / "1.2k" / "₹1200" -> "1200").
+    """
+    text = " ".join(text.lower().replace("₹", " ₹").split())
+
+    def canonical(m):
+        value = float(m.group("num").replace(",", "")) * _UNITS.get(m.group("unit") or "", 1)
+        return f" {int(value) if value == int(value) else value} "
+
+    text = _AMOUNT_RE.sub(canonical, text)
+    text = _CURRENCY_WORDS_RE.sub(" ", text)
+    return " ".join(_PUNCT_RE.sub(" ", text).split())
+
+
+def parse_intent(text: str) -> Optional[IntentOutput]:
+    """
+    Deterministic parser for regular commands.
+
+    Returns an IntentOutput only when exactly one action matches and every
+    field it needs is present and unambiguous; otherwise None, and the
+    caller falls back to the LLM.
+    """
+    text = " ".join(text.lower().replace("₹", " ₹").split())
+    if not text or HEDGE_RE.search(text) or _QUANTITY_RE.search(text):
+        return None
+
+    amounts = _amounts(text)
+    if amounts is None or len(amounts) != 1:
+        return None
+    amount = amounts.pop()
+
+    billers = {
+        canonical
+        for m in _BILLER_RE.finditer(text)
+        for canonical, names in BILLERS.items()
+        if m.group(1) in names
+    }
+    recipient = None
+    m = _RECIPIENT_RE.search(text)
+    if m and m.group("name") not in _RECIPIENT_STOPWORDS and not _BILLER_RE.fullmatch(m.group("name")):
+        recipient = m.group("name")
+
+    candidates = []
+    if re.search(ACTION_WORDS["buy_gold"], text) and _GOLD_RE.search(text):
+        candidates.append(IntentOutput(action="buy_gold", amount=amount, entity="digital_gold"))
+    if re.search(ACTION_WORDS["pay_bill"], text) and _BILL_RE.search(text) and len(billers) == 1:
+        candidates.append(IntentOutput(action="pay_bill", amount=amount, entity=billers.pop()))
+    if (re.search(ACTION_WORDS["transfer_money"], text) and recipient
+            and not _BILL_RE.search(text) and not _GOLD_RE.search(text)):
+        candidates.append(IntentOutput(action="transfer_money", amount=amount, entity=recipient))
+    if (re.search(ACTION_WORDS["deposit_funds"], text) and _DEPOSIT_TARGET_RE.search(text)
+            and not recipient and not _GOLD_RE.search(text)):
+        candidates.append(IntentOutput(action="deposit_funds", amount=amount, entity="self"))
+
+    return candidates[0] if len(candidates) == 1 else None
+
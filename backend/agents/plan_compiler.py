@@ -0,0 +1,127 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# PLAN_FUSION=0 runs every step on its own, as before
+PLAN_FUSION = os.getenv("PLAN_FUSION", "1") == "1"
+
+# In-page DOM steps that can share one page.evaluate
+FUSABLE_ACTIONS = ("click", "enter_amount", "select_biller", "select_beneficiary")
+
+
+@dataclass(frozen=True)
+class FusedRun:
+    """
+    Consecutive plan steps executed as one browser round trip.
+    `navigates` is set when the last step is a click that leaves the page.
+    """
+    start: int
+    steps: Tuple[dict, ...]
+    navigates: bool
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.steps)
+
+
+class FusedRunRejected(Exception):
+    """
+    The page did not look as the run expected; nothing was changed, run
+    the steps one by one instead.
+    """
+
+
+def is_safety_boundary(step: dict) -> bool:
+    """
+    Steps that gate irreversible actions always run on their own.
+    """
+    action = step["action"]
+    return (
+        step.get("requires_pause")
+        or action == "pause_for_approval"
+        or action.startswith("confirm_")
+        or action.startswith("submit_")
+        or action == "fetch_bill_amount"
+    )
+
+
+def compile_plan_runs(plan: List[dict], selector_map: dict, navigating_targets) -> Dict[int, FusedRun]:
+    """
+    Lowers runs of two or more safe DOM steps into FusedRuns, keyed by the
+    index of their first step. A run ends at any safety boundary, any step
+    that is not a plain DOM action, or after a click that navigates
+    (the next page needs its own round trip).
+    """
+    runs: Dict[int, FusedRun] = {}
+    current: List[int] = []
+
+    def flush(navigates=False):
+        if len(current) >= 2:
+            runs[current[0]] = FusedRun(
+                start=current[0],
+                steps=tuple(plan[i] for i in current),
+                navigates=navigates,
+            )
+        current.clear()
+
+    for idx, step in enumerate(plan):
+        fusable = (
+            step["action"] in FUSABLE_ACTIONS
+            and not is_safety_boundary(step)
+            and (step["action"] != "click" or step.get("target") in selector_map)
+        )
+        if not fusable:
+            flush()
+            continue
+
+        current.append(idx)
+        if step["action"] == "click" and step["target"] in navigating_targets:
+            flush(navigates=True)
+
+    flush()
+    return runs
+
+
+# Validates every op first and only then applies them, so a rejected run
+# leaves the page untouched. Fills mimic typing (input/change) and the
+# blur the single-step path gets from pressing Tab.
+FUSED_DOM_JS = """
+(ops) => {
+    const actionable = (el) => {
+        const r = el.getBoundingClientRect();
+        const st = getComputedStyle(el);
+        return r.width > 0 && r.height > 0 && st.visibility !== "hidden" && !el.disabled;
+    };
+    const resolved = [];
+    for (const [i, op] of ops.entries()) {
+        const el = document.querySelector(op.selector);
+        if (!el) return {ok: false, reason: `step ${i}: ${op.selector} not found`};
+        if (!actionable(el)) return {ok: false, reason: `step ${i}: ${op.selector} not actionable`};
+        let value = op.value;
+        if (op.op === "select") {
+            const opt = Array.from(el.options).find(
+                (o) => o.value === op.value || o.label.trim() === op.value);
+            if (!opt) return {ok: false, reason: `step ${i}: no option ${op.value}`};
+            value = opt.value;
+        }
+        resolved.push([op, el, value]);
+    }
+    const setValue = (el, value) => {
+        const proto = el instanceof HTMLSelectElement ? HTMLSelectElement.prototype
+            : HTMLInputElement.prototype;
+        Object.getOwnPropertyDescriptor(proto, "value").set.call(el, value);
+        el.dispatchEvent(new Event("input", {bubbles: true}));
+        el.dispatchEvent(new Event("change", {bubbles: true}));
+    };
+    for (const [op, el, value] of resolved) {
+        if (op.op === "click") {
+            el.click();
+        } else {
+            el.focus();
+            setValue(el, value);
+            el.blur();
+        }
+    }
+    return {ok: true};
+}
+"""
@@ -150,15 +150,23 @@
 # planner_agent = PlannerAgent()
 
 
-from typing import List, Optional, Literal
-from pydantic import BaseModel, Field
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Literal, Tuple
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_ai import Agent
 
+from services.metrics import metrics
+
 # =========================
 # 1. STEP + PLAN SCHEMAS
 # =========================
 
 class PlanStep(BaseModel):
+    # Compiled steps are shared between plans, so they must not change
+    model_config = ConfigDict(frozen=True)
+
     step_id: int
     action: Literal[
         "navigate",
@@ -235,14 +243,140 @@ PLAN_TEMPLATES = {
 }
 
 
+# Which intent field each action is parameterized with
+AMOUNT_ACTIONS = ("enter_amount", "deposit_funds")
+ENTITY_ACTIONS = ("select_biller", "select_beneficiary", "fetch_bill_amount")
+
+PLAN_CACHE_SIZE = 1024
+
+
+def _dumps(value) -> str:
+    # Byte-for-byte what FastAPI / pydantic render: compact, UTF-8 as is
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+# =========================
+# 3. COMPILED TEMPLATES
+# =========================
+
+@dataclass(frozen=True)
+class CompiledStep:
+    """
+    One template step with its JSON pre-serialized around the single
+    parameter slot: head + json(param) + tail.
+    """
+    template: PlanStep
+    param: Optional[str]  # "amount" | "entity" | None
+    head: str
+    tail: str
+
+
+def _compile_template(steps: List[dict]) -> Tuple[CompiledStep, ...]:
+    compiled = []
+    for idx, base in enumerate(steps, start=1):
+        # Validates the template once, at import
+        template = PlanStep(step_id=idx, **base)
+        param = (
+            "amount" if template.action in AMOUNT_ACTIONS
+            else "entity" if template.action in ENTITY_ACTIONS
+            else None
+        )
+        fields = template.dict()
+        if param:
+            marker = "\x00"
+            fields[param] = marker
+            head, tail = _dumps(fields).split(_dumps(marker))
+        else:
+            head, tail = _dumps(fields), ""
+        compiled.append(CompiledStep(template=template, param=param, head=head, tail=tail))
+    return tuple(compiled)
+
+
+COMPILED_TEMPLATES = {
+    action: _compile_template(steps) for action, steps in PLAN_TEMPLATES.items()
+}
+
+
+@dataclass(frozen=True)
+class CompiledPlan:
+    steps: Tuple[PlanStep, ...]
+    steps_json: str  # what set_plan stores
+
+    @property
+    def response_json(self) -> str:
+        # Same body FastAPI would render for PlanOutput
+        return '{"steps":' + self.steps_json + "}"
+
+
+EMPTY_PLAN = CompiledPlan(steps=(), steps_json="[]")
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def compile_plan(action: str, amount: Optional[int], entity: Optional[str]) -> CompiledPlan:
+    """
+    Substitutes intent parameters into a compiled template. Cached per
+    (action, amount, entity); the result is immutable.
+    """
+    template = COMPILED_TEMPLATES.get(action)
+    if template is None:
+        return EMPTY_PLAN
+
+    values = {"amount": amount, "entity": entity}
+    steps, fragments = [], []
+    for step in template:
+        if step.param is None:
+            steps.append(step.template)
+            fragments.append(step.head)
+        else:
+            value = values[step.param]
+            steps.append(step.template.model_copy(update={step.param: value}))
+            fragments.append(step.head + _dumps(value) + step.tail)
+
+    return CompiledPlan(steps=tuple(steps), steps_json="[" + ",".join(fragments) + "]")
+
+
+def plan_for_intent(intent: dict) -> CompiledPlan:
+    """
+    Raises ValueError when the intent's amount or entity can't go into a
+    plan step.
+    """
+    amount = intent.get("amount")
+    if amount is not None:
+        # Same coercion PlanStep(amount=...) would apply
+        try:
+            whole = int(float(amount))
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"Amount must be a whole number: {amount}")
+        if float(amount) != whole:
+            raise ValueError(f"Amount must be a whole number: {amount}")
+        amount = whole
+
+    entity = intent.get("entity")
+    if entity is not None and not isinstance(entity, str):
+        raise ValueError(f"Entity must be a string: {entity}")
+
+    return compile_plan(intent.get("action"), amount, entity)
+
+
+def plan_cache_stats() -> dict:
+    info = compile_plan.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+    }
+
+
+metrics.register_collector("plan_cache", plan_cache_stats)
+
+
 # =========================
-# 3. PLANNER AGENT
+# 4. PLANNER AGENT (LLM, unused by the deterministic path)
 # =========================
 
-planner_agent = Agent(
-    "openai:gpt-4o-mini",
-    output_type=PlanOutput,
-    instructions="""
+PLANNER_INSTRUCTIONS = """
 You are a FINANCIAL WORKFLOW PLANNER.
 
 CRITICAL RULES (MUST FOLLOW):
@@ -259,11 +393,29 @@ CRITICAL RULES (MUST FOLLOW):
 This system is used in a banking environment.
 Failure to follow rules is a critical error.
 """
-)
+
+
+@lru_cache(maxsize=1)
+def get_planner_agent():
+    """
+    Builds the LLM planner on first use instead of at import.
+    """
+    return Agent(
+        "openai:gpt-4o-mini",
+        output_type=PlanOutput,
+        instructions=PLANNER_INSTRUCTIONS,
+    )
+
+
+def __getattr__(name):
+    # `from agents.planner_agent import planner_agent` keeps working, lazily
+    if name == "planner_agent":
+        return get_planner_agent()
+    raise AttributeError(name)
 
 
 # =========================
-# 4. PLANNER RUN FUNCTION
+# 5. PLANNER RUN FUNCTION
 # =========================
 
 async def generate_plan(intent: dict) -> PlanOutput:
@@ -272,35 +424,4 @@ async def generate_plan(intent: dict) -> PlanOutput:
     - selecting a predefined template
     - parameterizing it with intent data
     """
-
-    action = intent.get("action")
-    if action not in PLAN_TEMPLATES:
-        return PlanOutput(steps=[])
-
-    base_steps = PLAN_TEMPLATES[action]
-    steps: List[PlanStep] = []
-
-    for idx, base in enumerate(base_steps, start=1):
-        step = PlanStep(
-            step_id=idx,
-            action=base["action"],
-            page=base.get("page"),
-            target=base.get("target"),
-            requires_pause=base.get("requires_pause", False),
-        )
-
-        # Parameter injection (safe)
-        if step.action == "enter_amount":
-            step.amount = intent.get("amount")
-
-        if step.action in ("select_biller", "select_beneficiary", "fetch_bill_amount"):
-            step.entity = intent.get("entity")
-
-        if step.action == "deposit_funds":
-            step.amount = intent.get("amount")
-
-
-
-        steps.append(step)
-
-    return PlanOutput(steps=steps)
+    return PlanOutput(steps=list(plan_for_intent(intent).steps))
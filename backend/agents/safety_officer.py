@@ -27,19 +27,34 @@
 #         redis_memory.set_paused(True)
 #         redis_memory.set_risk(reason)
 
-import base64
+from typing import Optional
+
+from services.async_redis_memory import async_redis_memory
 from services.redis_memory import redis_memory
 from services.vision_engine import VisionEngine
+from services.screen_verifier import TieredVerifier, SCREEN_FOR_ACTION
+
+# Steps that must pass confirmation-screen verification before submit
+VERIFIED_ACTIONS = ("confirm_payment", "submit_payment")
+
 
 class SafetyOfficer:
     """
     Independent safety evaluator.
     Has authority to pause execution.
+
+    `browser` is either a PlaywrightEngine (use evaluate) or an
+    AsyncPlaywrightEngine (use evaluate_async); the rules are shared.
     """
 
-    def __init__(self, browser):
-        self.vision = VisionEngine()
+    def __init__(self, browser, vision=None):
+        self.vision = vision or VisionEngine()
+        self.verifier = TieredVerifier(self.vision)
         self.browser = browser
+        # Rebound per run by ExecutorAgent to the workflow session;
+        # evaluate_async uses async_memory, evaluate uses memory
+        self.memory = redis_memory
+        self.async_memory = async_redis_memory
 
         # Configurable risk thresholds
         self.MAX_SAFE_AMOUNT = 1000
@@ -49,6 +64,62 @@ class SafetyOfficer:
         Returns True if execution may proceed.
         Returns False if execution must pause.
         """
+        reason = self._check_rules(step)
+        if reason:
+            return self._pause(reason)
+
+        # -------------------------------
+        # 3. Confirmation screen validation
+        # -------------------------------
+        if step["action"] in VERIFIED_ACTIONS:
+            self.memory.push_narration(
+                "I am verifying the confirmation screen."
+            )
+
+            intent = self.memory.get_intent()
+            verdict = self.verifier.verify(self.browser, **self._expected(step, intent))
+
+            reason = self._judge_verdict(verdict)
+            if reason:
+                return self._pause(reason)
+
+        print("🟩 [Safety] Safety check passed")
+        return True
+
+    async def evaluate_async(self, step: dict) -> bool:
+        """
+        evaluate() for AsyncPlaywrightEngine, on async_memory. A VLM
+        escalation runs in a worker thread so the event loop keeps
+        driving other pages.
+        """
+        reason = self._check_rules(step)
+        if reason:
+            return await self._pause_async(reason)
+
+        if step["action"] in VERIFIED_ACTIONS:
+            await self.async_memory.push_narration(
+                "I am verifying the confirmation screen."
+            )
+
+            intent = await self.async_memory.get_intent()
+            verdict = await self.verifier.verify_async(self.browser, **self._expected(step, intent))
+
+            reason, narration = self._verdict_outcome(verdict)
+            await self.async_memory.push_log(f"Verification result ({verdict.get('tier')}): {verdict}")
+            await self.async_memory.push_narration(narration)
+            if reason:
+                return await self._pause_async(reason)
+
+        print("🟩 [Safety] Safety check passed")
+        return True
+
+    # ------------------------------------
+    # Rules (no browser I/O)
+    # ------------------------------------
+    def _check_rules(self, step: dict):
+        """
+        Returns a pause reason, or None if the step passes the rules.
+        """
 
         # -------------------------------
         # 1. High-risk step check
@@ -56,80 +127,79 @@ class SafetyOfficer:
         if step.get("requires_pause"):
             print("🟨 [Safety] Step marked requires_pause=True")
 
-            return self._pause("High-risk action detected")
+            return "High-risk action detected"
 
         # -------------------------------
         # 2. Amount threshold check
         # -------------------------------
-        # amount = step.get("amount")
-        # if amount and amount > self.MAX_SAFE_AMOUNT:
-        #     return self._pause(f"Amount ₹{amount} exceeds safe threshold")
         amount = step.get("amount")
         if amount:
             print("🟨 [Safety] Amount detected:", amount)
 
         if amount and amount > self.MAX_SAFE_AMOUNT:
             print("🟥 [Safety] Amount exceeds threshold")
-            return self._pause(f"Amount ₹{amount} exceeds safe limit")
-        # -------------------------------
-        # 3. Confirmation screen validation
-        # -----------------------r--------
-        if step["action"] in ("confirm_payment", "submit_payment"):
-            redis_memory.push_narration(
-                "I am verifying the confirmation screen using vision."
-            )
-
-            screenshot = self.browser.screenshot()
-
-            vision_result = self.vision.verify_confirmation_screen(
-                screenshot_bytes=screenshot,
-                expected_amount=int(
-                    step.get("amount") 
-                    or redis_memory.get_intent().get("amount")
-                ),
-                expected_entity=step.get("entity") or "digital_gold",
-            )
-
-            redis_memory.push_log(f"Vision result: {vision_result}")
-
-            if not vision_result.get("screen_valid"):
-                redis_memory.push_narration(
-                    "This does not appear to be a valid confirmation screen."
-                )
-                return self._pause("Invalid confirmation screen")
-
-            if not vision_result.get("amount_match"):
-                redis_memory.push_narration(
-                    "The amount shown does not match your request."
-                )
-                return self._pause("Amount mismatch")
+            return f"Amount ₹{amount} exceeds safe limit"
+
+        return None
+
+    def _expected(self, step: dict, intent: Optional[dict]) -> dict:
+        intent = intent or {}
+        return {
+            "expected_screen": SCREEN_FOR_ACTION.get(intent.get("action"), "gold_confirm"),
+            "expected_amount": int(
+                step.get("amount")
+                or intent.get("amount")
+            ),
+            "expected_entity": step.get("entity") or intent.get("entity") or "digital_gold",
+        }
+
+    def _judge_verdict(self, verdict: dict):
+        """
+        Narrates the verdict; returns a pause reason or None.
+        """
+        self.memory.push_log(f"Verification result ({verdict.get('tier')}): {verdict}")
+        reason, narration = self._verdict_outcome(verdict)
+        self.memory.push_narration(narration)
+        return reason
 
-            if not vision_result.get("entity_match"):
-                redis_memory.push_narration(
-                    "The product shown does not match your request."
-                )
-                return self._pause("Entity mismatch")
+    @staticmethod
+    def _verdict_outcome(verdict: dict):
+        """
+        (pause reason or None, narration line) for a verdict.
+        """
+        if not verdict.get("screen_valid"):
+            return "Invalid confirmation screen", "This does not appear to be a valid confirmation screen."
 
-            redis_memory.push_narration(
-                "Vision verification passed. It is safe to proceed."
-            )
+        if not verdict.get("amount_match"):
+            return "Amount mismatch", "The amount shown does not match your request."
 
+        if not verdict.get("entity_match"):
+            return "Entity mismatch", "The product shown does not match your request."
 
-        print("🟩 [Safety] Safety check passed")
-        return True
+        return None, "Screen verification passed. It is safe to proceed."
 
     # ------------------------------------
     # Pause logic (single source of truth)
     # ------------------------------------
     def _pause(self, reason: str) -> bool:
         print("⛔ [Safety] PAUSING EXECUTION:", reason)
+        self._record_pause(reason, self.browser.screenshot())
+        return False
 
-        img = self.browser.screenshot()
-        redis_memory.set_screenshot(base64.b64encode(img).decode())
-
-        redis_memory.set_paused(True)
-        redis_memory.set_risk(reason)
+    async def _pause_async(self, reason: str) -> bool:
+        print("⛔ [Safety] PAUSING EXECUTION:", reason)
+        img = await self.browser.screenshot()
 
-        redis_memory.push_log(f"⛔ Safety pause: {reason}")
+        await self.async_memory.set_screenshot(img)
+        await self.async_memory.set_paused(True)
+        await self.async_memory.set_risk(reason)
+        await self.async_memory.push_log(f"⛔ Safety pause: {reason}")
         return False
 
+    def _record_pause(self, reason: str, img: bytes):
+        self.memory.set_screenshot(img)
+
+        self.memory.set_paused(True)
+        self.memory.set_risk(reason)
+
+        self.memory.push_log(f"⛔ Safety pause: {reason}")
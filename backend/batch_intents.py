@@ -0,0 +1,50 @@
+"""
+Bulk intent extraction from a JSONL file (or stdin), same pipeline as
+POST /intent/batch: rules, then cache, then the LLM concurrently.
+
+    python batch_intents.py commands.jsonl > intents.ndjson
+    python batch_intents.py ../requests.jsonl --field body --concurrency 16
+
+Results go to stdout as NDJSON in input order; the throughput summary
+goes to stderr.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import sys
+
+from agents.intent_resolver import INTENT_BATCH_CONCURRENCY, resolve_batch
+
+
+async def _lines(stream):
+    for line in stream:
+        yield line
+
+
+async def run(stream, out, field, concurrency):
+    async for result in resolve_batch(_lines(stream), field=field, concurrency=concurrency):
+        if "summary" in result:
+            print(json.dumps(result["summary"]), file=sys.stderr)
+        else:
+            out.write(json.dumps(result) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", nargs="?", default="-", help="JSONL file, - for stdin")
+    parser.add_argument("--field", default="text")
+    parser.add_argument("--concurrency", type=int, default=INTENT_BATCH_CONCURRENCY)
+    parser.add_argument("--quiet", action="store_true", help="hide per-item debug prints")
+    args = parser.parse_args()
+
+    stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+    # The agents print debug lines to stdout; keep stdout pure NDJSON
+    out = sys.stdout
+    with contextlib.redirect_stdout(io.StringIO() if args.quiet else sys.stderr):
+        asyncio.run(run(stream, out, args.field, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Run benchmarks from the backend/ directory, e.g.
+
+    python -m benchmarks.bench_sessions --workflows 200
+"""
+import argparse
+import statistics
+import time
+
+import redis
+import redis.asyncio as aioredis
+
+
+def add_redis_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="use an in-process fakeredis server instead of a local Redis",
+    )
+
+
+def make_redis(args, decode_responses=True):
+    if args.fake:
+        import fakeredis
+
+        if not hasattr(args, "_fake_server"):
+            args._fake_server = fakeredis.FakeServer()
+        return fakeredis.FakeRedis(
+            server=args._fake_server, decode_responses=decode_responses
+        )
+    return redis.Redis(host=args.host, port=args.port, decode_responses=decode_responses)
+
+
+def make_async_redis(args, decode_responses=True):
+    """
+    redis.asyncio counterpart of make_redis, on the same (fake) server.
+    """
+    if args.fake:
+        import fakeredis
+
+        if not hasattr(args, "_fake_server"):
+            args._fake_server = fakeredis.FakeServer()
+        return fakeredis.FakeAsyncRedis(
+            server=args._fake_server, decode_responses=decode_responses
+        )
+    return aioredis.Redis(host=args.host, port=args.port, decode_responses=decode_responses)
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def summarize(label: str, samples_ms):
+    print(
+        f"{label:<28} n={len(samples_ms):<6} "
+        f"p50={percentile(samples_ms, 50):8.3f}ms "
+        f"p99={percentile(samples_ms, 99):8.3f}ms "
+        f"mean={statistics.fmean(samples_ms) if samples_ms else 0:8.3f}ms"
+    )
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
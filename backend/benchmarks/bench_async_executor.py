@@ -0,0 +1,85 @@
+"""
+Concurrency benchmark for AsyncExecutorAgent.
+
+Runs many dummy_bank workflows in parallel on ONE event loop sharing one
+Chromium (one isolated context each) and reports throughput at several
+concurrency levels.
+
+    python -m benchmarks.bench_async_executor --fake --workflows 24 --concurrency 1 8 24
+"""
+import argparse
+import asyncio
+import itertools
+import time
+
+from benchmarks._bank import (
+    SAMPLE_INTENTS, SEED_PROFILE, AutoApprover, PassVision, prepare_session, serve_dummy_bank,
+)
+from benchmarks._common import add_redis_args, make_async_redis, make_redis
+
+# transfer.html is an empty stub, so only the runnable UI workflows
+WORKFLOWS = ("buy_gold", "pay_bill")
+
+
+async def run_batch(workflows: int, concurrency: int, shared_browser) -> float:
+    from agents.async_executor_agent import AsyncExecutorAgent
+    from services.redis_memory import redis_memory
+
+    semaphore = asyncio.Semaphore(concurrency)
+    actions = itertools.cycle(WORKFLOWS)
+
+    async def one(i: int, action: str):
+        memory = redis_memory.for_session(f"bench-async-{i}")
+        # prepare_session drives the planner with asyncio.run
+        await asyncio.to_thread(prepare_session, memory, action)
+        executor = AsyncExecutorAgent(shared_browser)
+        executor.safety.verifier.vision = PassVision()
+        async with semaphore:
+            with AutoApprover(memory):
+                await executor.run(memory.session_id)
+        memory.clear_session()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i, next(actions)) for i in range(workflows)))
+    return time.perf_counter() - start
+
+
+async def main_async(args):
+    from services.async_playwright_engine import AsyncBrowser
+
+    shared_browser = AsyncBrowser()
+    await shared_browser.get()  # exclude the one-off browser launch
+
+    for concurrency in args.concurrency:
+        elapsed = await run_batch(args.workflows, concurrency, shared_browser)
+        print(
+            f"concurrency={concurrency:<4} workflows={args.workflows:<4} "
+            f"wall={elapsed:7.2f}s throughput={args.workflows / elapsed:6.2f} workflows/s"
+        )
+
+    await shared_browser.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_redis_args(parser)
+    parser.add_argument("--workflows", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 24])
+    args = parser.parse_args()
+
+    serve_dummy_bank()
+
+    from services.async_redis_memory import async_redis_memory
+    from services.redis_memory import redis_memory
+    from services.screenshot_store import screenshot_store
+
+    redis_memory.r = make_redis(args)
+    async_redis_memory.r = make_async_redis(args)
+    screenshot_store.r = make_redis(args, decode_responses=False)
+    redis_memory.set_profile(SEED_PROFILE)
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
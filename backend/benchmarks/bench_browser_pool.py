@@ -0,0 +1,60 @@
+"""
+Cold vs. warm start latency of PlaywrightEngine.
+
+cold: new engine per run (driver + browser launch + context), closed after.
+warm: one engine whose BrowserPool hands out pre-warmed contexts.
+
+Both report time-to-page (launch) and time to first dummy_bank page load.
+
+    python -m benchmarks.bench_browser_pool --runs 10
+"""
+import argparse
+import time
+
+from benchmarks._bank import serve_dummy_bank
+from benchmarks._common import summarize
+from services.playwright_engine import PlaywrightEngine
+
+
+def one_run(engine: PlaywrightEngine, url: str):
+    start = time.perf_counter()
+    engine.launch()
+    launched = time.perf_counter()
+    engine.navigate(url)
+    loaded = time.perf_counter()
+    engine.release()
+    return (launched - start) * 1000, (loaded - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    url = f"{serve_dummy_bank()}/index.html"
+
+    cold_launch, cold_total = [], []
+    for _ in range(args.runs):
+        engine = PlaywrightEngine()
+        launch_ms, total_ms = one_run(engine, url)
+        engine.close()
+        cold_launch.append(launch_ms)
+        cold_total.append(total_ms)
+
+    engine = PlaywrightEngine()
+    engine.start()
+    warm_launch, warm_total = [], []
+    for _ in range(args.runs):
+        launch_ms, total_ms = one_run(engine, url)
+        warm_launch.append(launch_ms)
+        warm_total.append(total_ms)
+    engine.close()
+
+    summarize("cold: launch", cold_launch)
+    summarize("cold: launch + first page", cold_total)
+    summarize("warm: launch", warm_launch)
+    summarize("warm: launch + first page", warm_total)
+
+
+if __name__ == "__main__":
+    main()
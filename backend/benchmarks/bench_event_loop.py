@@ -0,0 +1,168 @@
+"""
+Event-loop latency under concurrent /intent + /plan requests: the
+blocking RedisMemory vs. AsyncRedisMemory (services/async_redis_memory.py).
+
+`--concurrency` clients post /intent then /plan through the ASGI app on
+one event loop while a ticker coroutine sleeps `--tick-ms` in a loop and
+records how late it wakes up (event-loop lag: what every other request on
+the loop waits on top of its own work). "blocking" serves the two routes
+as they were before (async def handlers calling redis.Redis); "async"
+serves routes/api.py.
+
+A local fakeredis answers in microseconds, which hides the stall, so with
+--fake every Redis round trip also waits `--rtt-ms` (a LAN-ish hop).
+
+    python -m benchmarks.bench_event_loop --fake --rtt-ms 1 --requests 400 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import APIRouter, FastAPI, Response
+
+from benchmarks._common import add_redis_args, make_async_redis, make_redis, summarize
+from services.redis_memory import DEFAULT_SESSION
+
+# Rule fast path commands: no LLM call, so the routes only wait on Redis
+COMMANDS = ("buy gold worth {n}", "add {n} to my account", "transfer {n} to mom")
+
+
+def blocking_router() -> APIRouter:
+    """
+    /intent and /plan as they were before AsyncRedisMemory.
+    """
+    from agents.intent_resolver import resolve_intent
+    from agents.planner_agent import plan_for_intent
+    from services.redis_memory import redis_memory
+
+    router = APIRouter()
+
+    @router.post("/intent")
+    async def extract_intent(payload: dict, session_id: str = DEFAULT_SESSION):
+        memory = redis_memory.for_session(session_id)
+        intent = await resolve_intent(payload["text"])
+        memory.set_intent(intent.dict())
+        memory.push_log(f"Intent extracted: {intent.dict()}")
+        return intent
+
+    @router.post("/plan")
+    async def create_plan(session_id: str = DEFAULT_SESSION):
+        memory = redis_memory.for_session(session_id)
+        plan = plan_for_intent(memory.get_intent())
+        memory.set_plan_json(plan.steps_json)
+        memory.set_current_step(0)
+        return Response(content=plan.response_json, media_type="application/json")
+
+    return router
+
+
+def slow_clients(args):
+    """
+    (sync, async) clients on the same server; with --fake each round
+    trip (one command, or one whole pipeline) sleeps `--rtt-ms` first.
+    """
+    if not args.fake:
+        return make_redis(args), make_async_redis(args)
+
+    import fakeredis
+
+    rtt = args.rtt_ms / 1000
+    make_redis(args)  # creates args._fake_server
+
+    class SlowConnection(fakeredis.FakeRedisConnection):
+        def send_packed_command(self, *a, **kw):
+            time.sleep(rtt)
+            return super().send_packed_command(*a, **kw)
+
+    class SlowAsyncConnection(fakeredis.FakeAsyncRedisConnection):
+        async def send_packed_command(self, *a, **kw):
+            await asyncio.sleep(rtt)
+            return await super().send_packed_command(*a, **kw)
+
+    return (
+        fakeredis.FakeRedis(server=args._fake_server, decode_responses=True,
+                            connection_class=SlowConnection),
+        fakeredis.FakeAsyncRedis(server=args._fake_server, decode_responses=True,
+                                 connection_class=SlowAsyncConnection),
+    )
+
+
+async def run(app: FastAPI, args):
+    """
+    Returns (elapsed, request latencies ms, loop lags ms).
+    """
+    lags, latencies = [], []
+    done = asyncio.Event()
+    tick = args.tick_ms / 1000
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(tick)
+            lags.append((time.perf_counter() - start - tick) * 1000)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(i: int):
+            session = {"session_id": f"bench-loop-{i % args.concurrency}"}
+            text = COMMANDS[i % len(COMMANDS)].format(n=100 + i)
+            async with semaphore:
+                start = time.perf_counter()
+                await client.post("/intent", params=session, json={"text": text})
+                response = await client.post("/plan", params=session)
+                latencies.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+
+        ticking = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await ticking
+
+    return elapsed, latencies, lags
+
+
+async def main_async(args):
+    from routes.api import router
+    from services.async_redis_memory import async_redis_memory
+    from services.redis_memory import redis_memory
+
+    sync_r, async_r = slow_clients(args)
+    redis_memory.r = sync_r
+    async_redis_memory.r = async_r
+
+    print(f"{args.requests} x (/intent + /plan), concurrency {args.concurrency}, "
+          f"tick {args.tick_ms}ms" + (f", simulated rtt {args.rtt_ms}ms" if args.fake else "") + "\n")
+
+    for label, routes in (("blocking", blocking_router()), ("async", router)):
+        app = FastAPI()
+        app.include_router(routes)
+        elapsed, latencies, lags = await run(app, args)
+        print(f"{label}: {args.requests / elapsed:7.1f} req pairs/s, wall {elapsed:.2f}s")
+        summarize(f"  {label} request", latencies)
+        summarize(f"  {label} loop lag", lags)
+        print(f"{'':<28} max loop lag {max(lags, default=0):8.3f}ms\n")
+
+    for i in range(args.concurrency):
+        await async_redis_memory.for_session(f"bench-loop-{i}").clear_session()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_redis_args(parser)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--tick-ms", type=float, default=5)
+    parser.add_argument("--rtt-ms", type=float, default=1,
+                        help="simulated round trip per Redis command (--fake only)")
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
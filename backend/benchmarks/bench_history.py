@@ -0,0 +1,141 @@
+"""
+/profile/history queries against a large synthetic transaction history.
+
+Loads `--entries` entries spread over the last year into the ledger's
+history stream and per-type index streams, then times the first page,
+deep cursor pagination, a rare-type filter and a one-day time range. The
+filters are also run as a scan of the full stream (what a query without
+the type index would do), and the old /profile cost is shown as the JSON
+size of the whole history.
+
+    python -m benchmarks.bench_history --fake --entries 1000000
+"""
+import argparse
+import json
+import time
+from types import SimpleNamespace
+
+from benchmarks._common import Timer, add_redis_args, make_redis, summarize
+from services.ledger import (
+    ACCOUNT_KEY, BILLS_KEY, HISTORY_KEY, HISTORY_TYPE_PREFIX, Ledger,
+    decode_entry, encode_entry, history_type_key,
+)
+
+# Share of each type in the synthetic history; deposits are the rare filter
+MIX = (("gold_purchase", 50), ("transfer", 30), ("bill_payment", 19), ("deposit", 1))
+YEAR_MS = 365 * 24 * 3600 * 1000
+PAGE = 20
+
+
+def load(r, entries: int, batch: int = 10000) -> int:
+    """
+    Writes the history with explicit ids (evenly spaced timestamps) so
+    it loads in pipelines. Returns the first timestamp in ms.
+    """
+    cycle = [name for name, share in MIX for _ in range(share)]
+    start_ms = int(time.time() * 1000) - YEAR_MS
+    step_ms = max(1, YEAR_MS // entries)
+
+    pipe = r.pipeline(transaction=False)
+    for i in range(entries):
+        entry_type = cycle[i % len(cycle)]
+        entry_id = f"{start_ms + i * step_ms}-0"
+        fields = encode_entry({
+            "type": entry_type, "amount": 100 + i % 900,
+            "details": "bench", "txn_id": f"bench:{i}",
+        })
+        pipe.xadd(HISTORY_KEY, fields, id=entry_id)
+        pipe.xadd(history_type_key(entry_type), fields, id=entry_id)
+        if (i + 1) % batch == 0:
+            pipe.execute()
+    pipe.execute()
+    return start_ms
+
+
+def scan(r, want: int, match, newest="+", oldest="-", chunk: int = 1000):
+    """
+    Filtered page without an index: walk the full stream newest-first.
+    """
+    found, scanned = [], 0
+    while len(found) < want:
+        rows = r.xrevrange(HISTORY_KEY, newest, oldest, count=chunk)
+        if not rows:
+            break
+        scanned += len(rows)
+        found += [e for e in (decode_entry(*row) for row in rows) if match(e)]
+        newest = f"({rows[-1][0]}"
+    return found[:want], scanned
+
+
+def timed(runs, fn):
+    samples = []
+    for _ in range(runs):
+        with Timer() as t:
+            result = fn()
+        samples.append(t.elapsed * 1000)
+    return samples, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_redis_args(parser)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=50, help="pages walked by the deep pagination run")
+    args = parser.parse_args()
+
+    r = make_redis(args)
+    ledger = Ledger(SimpleNamespace(r=r))
+    ledger.reset({"balance": 0})
+
+    with Timer() as t:
+        start_ms = load(r, args.entries)
+    print(f"loaded {r.xlen(HISTORY_KEY)} entries in {t.elapsed:.1f}s\n")
+
+    samples, _ = timed(args.runs, lambda: ledger.summary())
+    summarize("/profile summary", samples)
+
+    samples, _ = timed(args.runs, lambda: ledger.history(limit=PAGE))
+    summarize("first page", samples)
+
+    def walk():
+        cursor = None
+        for _ in range(args.pages):
+            _, cursor = ledger.history(limit=PAGE, before=cursor)
+        return cursor
+    samples, _ = timed(max(1, args.runs // 5), walk)
+    summarize(f"{args.pages} pages (per page)", [s / args.pages for s in samples])
+
+    # Rare type: index stream vs scanning everything
+    samples, _ = timed(args.runs, lambda: ledger.history(limit=PAGE, entry_type="deposit"))
+    summarize("type=deposit (index)", samples)
+    samples, (_, scanned) = timed(
+        max(1, args.runs // 5), lambda: scan(r, PAGE, lambda e: e["type"] == "deposit")
+    )
+    summarize("type=deposit (scan)", samples)
+    print(f"{'':<28} scan read {scanned} entries for {PAGE} results")
+
+    # One day in the middle of the year
+    since = (start_ms + YEAR_MS // 2) / 1000
+    until = since + 24 * 3600
+    samples, (page, _) = timed(args.runs, lambda: ledger.history(limit=PAGE, since=since, until=until))
+    summarize("one day (id range)", samples)
+    samples, _ = timed(
+        max(1, args.runs // 5),
+        lambda: scan(r, PAGE, lambda e: since <= e["ts"] <= until),
+    )
+    summarize("one day (scan)", samples)
+
+    # What the old /profile returned on every load
+    entry = {"type": "gold_purchase", "details": "bench", "amount": 500}
+    with Timer() as t:
+        body = json.dumps({"balance": 0, "bills": {}, "history": [entry] * args.entries})
+    print(f"\nold /profile body: {len(body) / 2 ** 20:.1f} MiB, "
+          f"{t.elapsed * 1000:.0f} ms just to serialize")
+
+    r.delete(ACCOUNT_KEY, BILLS_KEY, HISTORY_KEY,
+             *r.scan_iter(match=f"{HISTORY_TYPE_PREFIX}*", count=500))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Intent extraction: rule fast path vs the LLM, on benchmarks/intent_corpus.jsonl.
+
+Reports how much of the corpus the rules answer (coverage), how often those
+answers are right (precision) and per-command latency. With --llm (needs a
+real OPENAI_API_KEY) the LLM runs on every command as well, for accuracy
+and latency on the same corpus. Importing the agents needs OPENAI_API_KEY
+set even for a rules-only run.
+
+    python -m benchmarks.bench_intent --rounds 1000
+    python -m benchmarks.bench_intent --llm
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from agents.intent_rules import parse_intent
+from benchmarks._common import summarize
+
+CORPUS = os.path.join(os.path.dirname(__file__), "intent_corpus.jsonl")
+
+
+def load_corpus():
+    with open(CORPUS, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def bench_rules(corpus, rounds):
+    answered = correct = 0
+    for row in corpus:
+        intent = parse_intent(row["text"])
+        if intent is not None:
+            answered += 1
+            correct += intent.dict() == row["expected"]
+
+    samples = []
+    for _ in range(rounds):
+        for row in corpus:
+            start = time.perf_counter()
+            parse_intent(row["text"])
+            samples.append((time.perf_counter() - start) * 1000)
+
+    print(f"rules: coverage={answered}/{len(corpus)}  precision={correct}/{answered}")
+    summarize("rules", samples)
+
+
+async def bench_llm(corpus):
+    from agents.intent_agent import intent_agent
+
+    correct = scored = 0
+    samples = []
+    for row in corpus:
+        start = time.perf_counter()
+        result = await intent_agent.run(row["text"])
+        samples.append((time.perf_counter() - start) * 1000)
+        if row["expected"] is not None:
+            scored += 1
+            correct += result.output.dict() == row["expected"]
+
+    print(f"llm:   accuracy={correct}/{scored}")
+    summarize("llm", samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=1000)
+    parser.add_argument("--llm", action="store_true")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    bench_rules(corpus, args.rounds)
+    if args.llm:
+        asyncio.run(bench_llm(corpus))
+
+
+if __name__ == "__main__":
+    main()
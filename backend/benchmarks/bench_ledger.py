@@ -0,0 +1,166 @@
+"""
+Concurrent debits against one account: the old read-modify-write of the
+profile JSON blob vs. the Lua ledger (services/ledger.py).
+
+Contention: every worker debits `--amount` `--debits` times and retries each debit once
+with the same transaction id. The starting balance only covers
+`--cover` of the debits, so the ledger also has to refuse overdrafts.
+The final balance must equal start - amount * successful debits.
+
+History: cost of one more history entry once `--history` entries exist,
+re-serializing the blob vs. XADD to the history stream.
+
+    python -m benchmarks.bench_ledger --fake --workers 16 --debits 500
+"""
+import argparse
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+from benchmarks._common import Timer, add_redis_args, make_redis
+from services.ledger import ACCOUNT_KEY, BILLS_KEY, HISTORY_KEY, Ledger
+
+BLOB_KEY = "bench:profile"
+
+
+def blob_debit(r, amount: int) -> bool:
+    # What apply_transaction / record_completion used to do
+    profile = json.loads(r.get(BLOB_KEY))
+    if profile["balance"] < amount:
+        return False
+    profile["balance"] -= amount
+    profile["history"].append({"type": "bench", "amount": amount})
+    r.set(BLOB_KEY, json.dumps(profile))
+    return True
+
+
+def run(workers, work):
+    """
+    Runs `work(worker_id)` on `workers` threads; returns (elapsed, results).
+    """
+    results = [None] * workers
+    barrier = threading.Barrier(workers)
+
+    def target(i):
+        barrier.wait()
+        results[i] = work(i)
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(workers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, results
+
+
+def report(label, elapsed, ops, start, final, applied, amount, history):
+    expected = start - amount * applied
+    ok = final == expected and final >= 0 and history == applied
+    print(
+        f"{label:<10} {ops / elapsed:9.0f} ops/s  applied={applied:<6} "
+        f"final={final:<9} expected={expected:<9} history={history:<6} "
+        f"{'OK' if ok else 'WRONG'}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_redis_args(parser)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--debits", type=int, default=500, help="debits per worker")
+    parser.add_argument("--amount", type=int, default=7)
+    parser.add_argument("--cover", type=float, default=0.75,
+                        help="fraction of all debits the starting balance covers")
+    parser.add_argument("--history", type=int, default=20000,
+                        help="existing history entries for the append benchmark")
+    parser.add_argument("--appends", type=int, default=200)
+    args = parser.parse_args()
+
+    bench_contention(args)
+    bench_history(args)
+
+
+def bench_contention(args):
+    total = args.workers * args.debits
+    start_balance = int(total * args.cover) * args.amount
+    print(f"{args.workers} workers x {args.debits} debits of {args.amount}, "
+          f"start balance {start_balance} covers {int(total * args.cover)}/{total}\n")
+
+    # Read-modify-write of the JSON blob
+    r = make_redis(args)
+    r.set(BLOB_KEY, json.dumps({"balance": start_balance, "bills": {}, "history": []}))
+
+    def blob_work(i):
+        client = make_redis(args)
+        return sum(blob_debit(client, args.amount) for _ in range(args.debits))
+
+    elapsed, results = run(args.workers, blob_work)
+    profile = json.loads(r.get(BLOB_KEY))
+    report("blob", elapsed, total, start_balance, profile["balance"], sum(results),
+           args.amount, len(profile["history"]))
+    r.delete(BLOB_KEY)
+
+    # Lua ledger, every debit retried once with the same id
+    ledger = Ledger(SimpleNamespace(r=r))
+    ledger.reset({"balance": start_balance})
+
+    def ledger_work(i):
+        worker = Ledger(SimpleNamespace(r=make_redis(args)))
+        applied = duplicates = 0
+        for n in range(args.debits):
+            txn_id = f"bench:{i}:{n}"
+            first = worker.debit(args.amount, txn_id, {"type": "bench"})
+            retry = worker.debit(args.amount, txn_id, {"type": "bench"})
+            applied += first.status == "ok"
+            duplicates += retry.status == "duplicate"
+        return applied, duplicates
+
+    elapsed, results = run(args.workers, ledger_work)
+    applied = sum(a for a, _ in results)
+    duplicates = sum(d for _, d in results)
+    report("ledger", elapsed, total * 2, start_balance, ledger.balance(), applied,
+           args.amount, r.xlen(HISTORY_KEY))
+    print(f"{'':<10} retries answered as duplicate: {duplicates}/{applied}")
+
+    r.delete(ACCOUNT_KEY, BILLS_KEY, HISTORY_KEY)
+    for key in r.scan_iter(match="ledger:txn:bench:*", count=1000):
+        r.delete(key)
+
+
+def bench_history(args):
+    r = make_redis(args)
+    entry = {"type": "gold_purchase", "details": "Digital Gold", "amount": 500}
+    print(f"\nappending {args.appends} entries to a history of {args.history}")
+
+    r.set(BLOB_KEY, json.dumps({"balance": 0, "bills": {}, "history": [entry] * args.history}))
+    with Timer() as blob:
+        for _ in range(args.appends):
+            profile = json.loads(r.get(BLOB_KEY))
+            profile["history"].append(entry)
+            r.set(BLOB_KEY, json.dumps(profile))
+    blob_bytes = r.strlen(BLOB_KEY)
+    r.delete(BLOB_KEY)
+
+    ledger = Ledger(SimpleNamespace(r=r))
+    ledger.reset({"balance": 0})
+    pipe = r.pipeline(transaction=False)
+    for _ in range(args.history):
+        pipe.xadd(HISTORY_KEY, {"t": "g", "d": "Digital Gold", "a": "500"})
+    pipe.execute()
+    with Timer() as stream:
+        for _ in range(args.appends):
+            ledger.append_history(entry)
+    with Timer() as latest:
+        ledger.profile()
+
+    print(f"{'blob':<10} {blob.elapsed / args.appends * 1000:9.3f} ms/append  "
+          f"profile key {blob_bytes / 1024:.0f} KiB")
+    print(f"{'stream':<10} {stream.elapsed / args.appends * 1000:9.3f} ms/append  "
+          f"/profile read {latest.elapsed * 1000:.3f} ms")
+    r.delete(ACCOUNT_KEY, BILLS_KEY, HISTORY_KEY)
+
+
+if __name__ == "__main__":
+    main()
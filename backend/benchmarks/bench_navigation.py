@@ -0,0 +1,51 @@
+"""
+Navigation latency across the dummy_bank pages, before and after request
+routing.
+
+before: no routing, wait_until="networkidle" (the old navigate)
+after:  images/fonts/analytics blocked, assets served from memory,
+        wait_until="domcontentloaded" + .container readiness
+
+    python -m benchmarks.bench_navigation --rounds 5
+"""
+import argparse
+import time
+
+from benchmarks._bank import serve_dummy_bank
+from benchmarks._common import summarize
+from services.browser_pool import BrowserPool
+from services.playwright_engine import PlaywrightEngine
+
+PAGES = ("index", "gold", "gold_confirm", "pay_bill", "pay_bill_confirm", "profile")
+
+
+def measure(engine: PlaywrightEngine, base_url: str, rounds: int, ready_selector):
+    samples = []
+    engine.launch()
+    for _ in range(rounds):
+        for page in PAGES:
+            start = time.perf_counter()
+            engine.navigate(f"{base_url}/{page}.html", ready_selector=ready_selector)
+            samples.append((time.perf_counter() - start) * 1000)
+    engine.close()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    base_url = serve_dummy_bank()
+
+    before = PlaywrightEngine(pool=BrowserPool(size=1, route_requests=False))
+    before.wait_until = "networkidle"
+
+    after = PlaywrightEngine(pool=BrowserPool(size=1, route_requests=True))
+
+    summarize("before (networkidle)", measure(before, base_url, args.rounds, None))
+    summarize("after (routed + DOM ready)", measure(after, base_url, args.rounds, ".container"))
+
+
+if __name__ == "__main__":
+    main()
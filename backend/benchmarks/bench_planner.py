@@ -0,0 +1,75 @@
+"""
+Planning throughput: the old per-call PlanStep rebuild + .dict() + json
+versus precompiled templates with pre-serialized fragments.
+
+before: build PlanStep objects from PLAN_TEMPLATES, then serialize with
+        .dict() and json.dumps, as /plan used to
+after:  plan_for_intent() (cached compiled plan) + its steps_json
+
+    python -m benchmarks.bench_planner --plans 20000 --distinct 200
+"""
+import argparse
+import itertools
+import json
+import time
+
+from agents.planner_agent import PLAN_TEMPLATES, PlanStep, compile_plan, plan_for_intent
+
+ACTIONS = ("buy_gold", "pay_bill", "transfer_money", "deposit_funds")
+ENTITIES = {"buy_gold": "digital_gold", "pay_bill": "tata", "transfer_money": "mom", "deposit_funds": "self"}
+
+
+def legacy_plan_json(intent: dict) -> str:
+    steps = []
+    for idx, base in enumerate(PLAN_TEMPLATES[intent["action"]], start=1):
+        step = PlanStep(
+            step_id=idx,
+            action=base["action"],
+            page=base.get("page"),
+            target=base.get("target"),
+            requires_pause=base.get("requires_pause", False),
+        )
+        if step.action in ("enter_amount", "deposit_funds"):
+            step = step.model_copy(update={"amount": intent.get("amount")})
+        if step.action in ("select_biller", "select_beneficiary", "fetch_bill_amount"):
+            step = step.model_copy(update={"entity": intent.get("entity")})
+        steps.append(step)
+    return json.dumps([s.dict() for s in steps])
+
+
+def intents(distinct: int):
+    pool = [
+        {"action": action, "amount": 100 + i, "entity": ENTITIES[action]}
+        for i, action in zip(range(distinct), itertools.cycle(ACTIONS))
+    ]
+    return itertools.cycle(pool)
+
+
+def run(label, fn, n, distinct):
+    source = intents(distinct)
+    start = time.perf_counter()
+    for _ in range(n):
+        fn(next(source))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {n / elapsed:12,.0f} plans/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--plans", type=int, default=20000)
+    parser.add_argument("--distinct", type=int, default=200, help="distinct (action, amount, entity)")
+    args = parser.parse_args()
+
+    for intent in itertools.islice(intents(len(ACTIONS)), len(ACTIONS)):
+        assert json.loads(legacy_plan_json(intent)) == json.loads(plan_for_intent(intent).steps_json)
+
+    run("before (rebuild + dict)", legacy_plan_json, args.plans, args.distinct)
+    compile_plan.cache_clear()
+    run("after (compiled + cached)", lambda i: plan_for_intent(i).steps_json, args.plans, args.distinct)
+    compile_plan.cache_clear()
+    run("after (cache miss every call)", lambda i: compile_plan.__wrapped__(
+        i["action"], i["amount"], i["entity"]).steps_json, args.plans, args.distinct)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Load benchmark for the session-scoped RedisMemory keyspace.
+
+Runs N fake workflows concurrently (one thread each, one session each)
+against the same Redis. Each workflow walks a plan the way ExecutorAgent
+does (read step + pause flag, log, increment) and the run fails if any
+session ends up with another session's state.
+
+    python -m benchmarks.bench_sessions --workflows 200 --concurrency 50
+    python -m benchmarks.bench_sessions --fake
+"""
+import argparse
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._common import Timer, add_redis_args, make_redis
+from services.redis_memory import RedisMemory
+
+
+def fake_workflow(root: RedisMemory, session_id: str, steps: int) -> int:
+    memory = root.for_session(session_id)
+    ops = 0
+
+    memory.set_intent({"action": "buy_gold", "amount": 500, "entity": session_id})
+    memory.set_plan([{"step_id": i + 1, "action": "click"} for i in range(steps)])
+    memory.set_current_step(0)
+    memory.set_paused(False)
+    ops += 4
+
+    plan = memory.get_plan()
+    ops += 1
+    while True:
+        step_id = memory.get_current_step()
+        paused = memory.is_paused()
+        ops += 2
+        if step_id >= len(plan):
+            break
+        if paused:
+            continue
+        memory.push_log(f"About to execute step {step_id + 1}")
+        memory.increment_step()
+        ops += 2
+
+    # Isolation check: nobody else may have touched this session
+    intent = memory.get_intent()
+    ops += 1
+    if intent["entity"] != session_id or memory.get_current_step() != steps:
+        raise AssertionError(f"session {session_id} was clobbered")
+    return ops
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_redis_args(parser)
+    parser.add_argument("--workflows", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    root = RedisMemory(client=make_redis(args))
+    sessions = [f"bench-{uuid.uuid4().hex[:12]}" for _ in range(args.workflows)]
+
+    with Timer() as t, ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        total_ops = sum(
+            pool.map(lambda sid: fake_workflow(root, sid, args.steps), sessions)
+        )
+
+    for sid in sessions:
+        root.for_session(sid).clear_session()
+
+    print(f"workflows:   {args.workflows} ({args.concurrency} concurrent, {args.steps} steps each)")
+    print(f"wall time:   {t.elapsed:.3f}s")
+    print(f"throughput:  {args.workflows / t.elapsed:.1f} workflows/s")
+    print(f"redis ops:   {total_ops} ({total_ops / t.elapsed:.0f} ops/s)")
+    print("isolation:   ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark for the /state read path.
+
+Compares the legacy six-getter path (six round trips) with the pipelined
+RedisMemory.snapshot() (one round trip), reporting p50/p99 latency, and
+the full snapshot with an idle `since` poll (no new logs or narration).
+
+    python -m benchmarks.bench_state --iterations 5000
+"""
+import argparse
+import json
+import os
+import time
+
+from benchmarks._common import add_redis_args, make_redis, summarize
+from services.redis_memory import RedisMemory
+from services.screenshot_store import ScreenshotStore
+
+
+def legacy_state(memory: RedisMemory) -> dict:
+    return {
+        "paused": memory.is_paused(),
+        "risk": memory.get_risk(),
+        "logs": memory.get_logs(),
+        "narration": memory.get_narration(),
+        "screenshot": memory.get_screenshot(),
+        "current_step": memory.get_current_step(),
+    }
+
+
+def seed(memory: RedisMemory):
+    memory.clear_session()
+    memory.set_paused(True)
+    memory.set_risk("High-risk action requires approval")
+    memory.set_current_step(4)
+    memory.set_screenshot(os.urandom(64 * 1024))
+    for i in range(60):
+        memory.push_log(f"About to execute step {i}")
+    for i in range(5):
+        memory.push_narration(f"Narration line {i}")
+
+
+def measure(fn, iterations: int):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_redis_args(parser)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    memory = RedisMemory(
+        client=make_redis(args),
+        screenshots=ScreenshotStore(client=make_redis(args, decode_responses=False)),
+    ).for_session("bench-state")
+    seed(memory)
+
+    # Same data either way
+    full = memory.snapshot()
+    assert legacy_state(memory) == full.dict(exclude={"cursor"})
+
+    # Warm up connections / caches
+    measure(lambda: legacy_state(memory), 100)
+    measure(memory.snapshot, 100)
+
+    summarize("legacy (6 round trips)", measure(lambda: legacy_state(memory), args.iterations))
+    summarize("snapshot (1 round trip)", measure(memory.snapshot, args.iterations))
+    summarize("snapshot since (idle)", measure(lambda: memory.snapshot(since=full.cursor), args.iterations))
+
+    idle = memory.snapshot(since=full.cursor)
+    print(f"\npayload: full {len(json.dumps(full.dict()))} bytes, "
+          f"idle since-poll {len(json.dumps(idle.dict()))} bytes")
+
+    memory.clear_session()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Vision upload size and latency, raw PNG vs preprocessed.
+
+raw:  full-viewport PNG, as uploaded before
+prep: cropped to .container, downsized to VISION_MAX_DIM, re-encoded
+
+Screenshots are taken from the dummy_bank confirmation pages. With --live
+(needs GOOGLE_API_KEY) each image is also sent to the vision model to
+measure end-to-end verification latency; the verdict cache is disabled.
+
+    python -m benchmarks.bench_vision_prep --rounds 3 --format webp
+"""
+import argparse
+import base64
+import time
+
+from benchmarks._bank import serve_dummy_bank
+from benchmarks._common import summarize
+from services.browser_pool import BrowserPool
+from services.image_prep import VISION_CROP_SELECTOR, prepare_for_vision
+from services.playwright_engine import PlaywrightEngine
+
+PAGES = {
+    "gold_confirm": "gold_confirm.html?amount=500",
+    "pay_bill_confirm": "pay_bill_confirm.html",
+}
+
+
+def capture(base_url):
+    """
+    Returns [(screen, full_png, container_box, element_png)].
+    """
+    engine = PlaywrightEngine(pool=BrowserPool(size=1))
+    engine.launch()
+    shots = []
+    for screen, path in PAGES.items():
+        engine.navigate(f"{base_url}/{path}", ready_selector=VISION_CROP_SELECTOR)
+        box = engine.page.locator(VISION_CROP_SELECTOR).first.bounding_box()
+        shots.append((
+            screen,
+            engine.screenshot(),
+            box,
+            engine.screenshot(selector=VISION_CROP_SELECTOR),
+        ))
+    engine.close()
+    return shots
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--format", default="jpeg", choices=("jpeg", "webp", "png"))
+    parser.add_argument("--max-dim", type=int, default=1024)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    shots = capture(serve_dummy_bank())
+
+    for screen, full, box, element in shots:
+        prepped, _ = prepare_for_vision(full, crop_box=box, max_dim=args.max_dim, fmt=args.format)
+        clipped, _ = prepare_for_vision(element, max_dim=args.max_dim, fmt=args.format)
+        print(
+            f"{screen:<18} raw={len(full):>8}B  element={len(element):>8}B  "
+            f"prep={len(prepped):>7}B  element+prep={len(clipped):>7}B  "
+            f"saved={100 * (1 - len(prepped) / len(full)):5.1f}%"
+        )
+
+    prep_ms = []
+    for _ in range(args.rounds):
+        for _, full, box, _ in shots:
+            start = time.perf_counter()
+            prepare_for_vision(full, crop_box=box, max_dim=args.max_dim, fmt=args.format)
+            prep_ms.append((time.perf_counter() - start) * 1000)
+    summarize("preprocess", prep_ms)
+
+    if not args.live:
+        return
+
+    from services.vision_engine import VisionEngine
+
+    vision = VisionEngine(cache=None)
+    for label, use_prep in (("vlm raw png", False), ("vlm preprocessed", True)):
+        samples = []
+        for _ in range(args.rounds):
+            for screen, full, box, _ in shots:
+                start = time.perf_counter()
+                if use_prep:
+                    vision.verify_confirmation_screen(full, 500, "digital_gold", screen, crop_box=box)
+                else:
+                    # Bypass preprocessing: the model gets the PNG as is
+                    vision.client.generate([
+                        vision._build_prompt(500, "digital_gold", screen),
+                        {"mime_type": "image/png", "data": base64.b64encode(full).decode()},
+                    ])
+                samples.append((time.perf_counter() - start) * 1000)
+        summarize(label, samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+End-to-end wall time of every PLAN_TEMPLATES workflow against a local
+dummy_bank: condition-based waits with and without plan fusion (fused DOM
+steps, see agents/plan_compiler.py), and the human pacing profile.
+
+Pauses are auto-approved and vision verification is replaced by a
+pass-through fake, so the numbers are browser + executor time only.
+
+    python -m benchmarks.bench_workflows --fake --runs 3
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks._bank import (
+    SAMPLE_INTENTS, SEED_PROFILE, AutoApprover, PassVision, prepare_session, serve_dummy_bank,
+)
+from benchmarks._common import add_redis_args, make_redis
+
+
+def run_workflow(executor, memory, action: str) -> float:
+    prepare_session(memory, action)
+    with AutoApprover(memory):
+        start = time.perf_counter()
+        executor.run(memory.session_id)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_redis_args(parser)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workflow", choices=sorted(SAMPLE_INTENTS), action="append")
+    args = parser.parse_args()
+
+    serve_dummy_bank()
+
+    # Imported late so DUMMY_BANK_BASE_URL points at our server
+    from agents.executor_agent import ExecutorAgent
+    from services.redis_memory import redis_memory
+    from services.screenshot_store import screenshot_store
+
+    redis_memory.r = make_redis(args)
+    screenshot_store.r = make_redis(args, decode_responses=False)
+    redis_memory.set_profile(SEED_PROFILE)
+
+    executor = ExecutorAgent()
+    executor.safety.verifier.vision = PassVision()
+
+    modes = (
+        ("condition waits + fusion", False, True),
+        ("condition waits, no fusion", False, False),
+        ("human pacing", True, False),
+    )
+    for label, pacing, fusion in modes:
+        executor.pacing.enabled = pacing
+        executor.fusion = fusion
+        print(f"\n== {label} ==")
+
+        for action in args.workflow or sorted(SAMPLE_INTENTS):
+            memory = redis_memory.for_session(f"bench-{action}")
+            try:
+                samples = [run_workflow(executor, memory, action) for _ in range(args.runs)]
+            except Exception as e:
+                print(f"{action:<16} FAILED: {type(e).__name__}: {e}")
+                continue
+            finally:
+                memory.clear_session()
+            print(
+                f"{action:<16} mean={statistics.fmean(samples):7.3f}s "
+                f"min={min(samples):7.3f}s max={max(samples):7.3f}s"
+            )
+
+    close = getattr(executor, "close", None)
+    if close:
+        close()
+
+
+if __name__ == "__main__":
+    main()
@@ -72,7 +72,7 @@
 from fastapi import FastAPI
 from routes import router
 from fastapi.staticfiles import StaticFiles
-from routes.api import router
+from routes.api import router, executor_pool
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -108,3 +108,13 @@ def dashboard():
 
 app.include_router(router)
 
+
+@app.on_event("startup")
+def start_executor_pool():
+    executor_pool.start()
+
+
+@app.on_event("shutdown")
+def stop_executor_pool():
+    executor_pool.shutdown()
+
@@ -1,71 +1,187 @@
-from fastapi import APIRouter
-from agents.intent_agent import intent_agent
-from agents.planner_agent import planner_agent
+import asyncio
+import json
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from agents.intent_resolver import resolve_batch, resolve_intent
 from agents.executor_agent import ExecutorAgent
-from services.redis_memory import redis_memory
-from agents.planner_agent import generate_plan
+from services.async_redis_memory import async_redis_memory
+from services.redis_memory import redis_memory, DEFAULT_SESSION, SESSION_ID_PATTERN, StateSnapshot
+from services.screenshot_store import screenshot_store
+from services.job_queue import ExecutorPool, QueueFull, SessionBusy
+from services.metrics import metrics
+from agents.planner_agent import plan_for_intent
 
 router = APIRouter()
-executor = ExecutorAgent()
+
+# Workflows run on a bounded pool of executor workers, never on the
+# request thread. Workers are started/stopped by main.py.
+executor_pool = ExecutorPool(executor_factory=ExecutorAgent)
+metrics.register_collector("executor_pool", executor_pool.stats)
+
+# Every workflow endpoint takes ?session_id=... so concurrent workflows
+# get their own Redis keyspace. Omitting it falls back to the shared
+# "default" session the dashboard has always used.
+#
+# `async def` routes run on the event loop and only use
+# async_redis_memory; plain `def` routes run on the threadpool and use
+# redis_memory. One blocking Redis call in an async route stalls every
+# other request.
 
 
 # -----------------------------
 # INTENT
 # -----------------------------
 @router.post("/intent")
-async def extract_intent(payload: dict):
+async def extract_intent(payload: dict, session_id: str = Query(DEFAULT_SESSION, pattern=SESSION_ID_PATTERN)):
+    memory = async_redis_memory.for_session(session_id)
     text = payload.get("text")
     if not text:
         return {"error": "Missing text"}
 
-    result = await intent_agent.run(text)
+    intent = await resolve_intent(text)
+
+    await memory.set_intent(intent.dict())
+    await memory.push_log(f"Intent extracted: {intent.dict()}")
+
+    return intent
+
+
+@router.post("/intent/batch")
+async def extract_intents_batch(request: Request, field: str = "text"):
+    """
+    Bulk intent extraction. Body: JSONL, one command per line (an object
+    with `field`, default "text", or a bare string). Streams NDJSON back
+    in input order, ending with a throughput summary line. Nothing is
+    written to any session.
+    """
+    # Read up front: once streaming starts, StreamingResponse's disconnect
+    # listener owns the receive channel
+    body = (await request.body()).decode("utf-8")
+
+    async def lines():
+        for line in body.splitlines():
+            yield line
 
-    redis_memory.set_intent(result.output.dict())
-    redis_memory.push_log(f"Intent extracted: {result.output.dict()}")
+    async def results():
+        async for result in resolve_batch(lines(), field=field):
+            yield json.dumps(result) + "\n"
 
-    return result.output
+    return StreamingResponse(results(), media_type="application/x-ndjson")
 
 
 # -----------------------------
 # PLAN
 # -----------------------------
 @router.post("/plan")
-async def create_plan():
-    intent = redis_memory.get_intent()
+async def create_plan(session_id: str = Query(DEFAULT_SESSION, pattern=SESSION_ID_PATTERN)):
+    memory = async_redis_memory.for_session(session_id)
+    intent = await memory.get_intent()
     if not intent:
         return {"error": "No intent found"}
 
-    result = await generate_plan(intent)
+    # Precompiled template + pre-serialized JSON: no model building or
+    # re-serialization per request
+    try:
+        plan = plan_for_intent(intent)
+    except ValueError as e:
+        return {"error": str(e)}
 
-    redis_memory.set_plan([step.dict() for step in result.steps])
-    redis_memory.set_current_step(0)
+    await memory.set_plan_json(plan.steps_json)
+    await memory.set_current_step(0)
 
-    return result
+    return Response(content=plan.response_json, media_type="application/json")
 
 
 # -----------------------------
 # EXECUTE
 # -----------------------------
-@router.post("/execute")
-def execute_plan():
-    redis_memory.set_screenshot("")
-    redis_memory.push_log("Execution started")
-    executor.run()
-    return {"status": "execution_started"}
+@router.post("/execute", status_code=202)
+def execute_plan(session_id: str = Query(DEFAULT_SESSION, pattern=SESSION_ID_PATTERN)):
+    memory = redis_memory.for_session(session_id)
+    if not memory.get_plan():
+        return {"error": "No plan found"}
+
+    # A busy session's dashboard belongs to its running job: refuse
+    # before touching it. submit() still checks, for a racing request.
+    active_job = executor_pool.active_job(session_id)
+    if active_job:
+        raise _session_busy(active_job)
+
+    # Reset the dashboard before the job is visible to a worker: one may
+    # pick it up (and push its own screenshot and logs) straight away
+    previous_screenshot = memory.get_screenshot()
+    memory.clear_screenshot()
+    memory.push_log("Execution queued")
+
+    try:
+        job = executor_pool.submit(session_id)
+    except SessionBusy as e:
+        _not_queued(memory, previous_screenshot, "session already has an active job")
+        raise _session_busy(str(e))
+    except QueueFull:
+        # Backpressure: tell the client to come back later
+        _not_queued(memory, previous_screenshot, "executor queue is full")
+        raise HTTPException(
+            status_code=429,
+            detail="Executor queue is full",
+            headers={"Retry-After": "5"},
+        )
+
+    return {"status": "queued", "job_id": job.id}
+
+
+def _session_busy(job_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail={"error": "Session already has an active job", "job_id": job_id},
+    )
+
+
+def _not_queued(memory, previous_screenshot: Optional[str], reason: str):
+    """
+    Undoes execute_plan's dashboard reset when the pool refuses the job.
+    """
+    if previous_screenshot:
+        memory.restore_screenshot(previous_screenshot)
+    memory.push_log(f"Execution not queued: {reason}")
+
+
+# -----------------------------
+# JOBS
+# -----------------------------
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = executor_pool.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    job = executor_pool.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
 
 
 # -----------------------------
 # APPROVE (Conscious Pause)
 # -----------------------------
 @router.post("/approve")
-def approve_action():
-    redis_memory.set_user_approved(True)
-    redis_memory.set_paused(False)
-    redis_memory.clear_risk()
-    # redis_memory.increment_step()
-
-
-    redis_memory.push_log("User approved action")
+def approve_action(session_id: str = Query(DEFAULT_SESSION, pattern=SESSION_ID_PATTERN)):
+    memory = redis_memory.for_session(session_id)
+    memory.set_user_approved(True)
+    memory.set_paused(False)
+    memory.clear_risk()
+    memory.push_log("User approved action")
+    memory.send_control("approve")
 
     return {
         "status": "approved",
@@ -77,11 +193,13 @@ def approve_action():
 # REJECT (Terminate)
 # -----------------------------
 @router.post("/reject")
-def reject_action():
-    redis_memory.set_paused(False)
-    redis_memory.set_current_step(9999)  # force executor exit
-    redis_memory.set_risk("User rejected transaction")
-    redis_memory.push_log("User rejected transaction")
+def reject_action(session_id: str = Query(DEFAULT_SESSION, pattern=SESSION_ID_PATTERN)):
+    memory = redis_memory.for_session(session_id)
+    memory.set_paused(False)
+    memory.set_current_step(9999)  # force executor exit
+    memory.set_risk("User rejected transaction")
+    memory.push_log("User rejected transaction")
+    memory.send_control("reject")
 
     return {
         "status": "rejected",
@@ -92,18 +210,151 @@ def reject_action():
 # -----------------------------
 # STATE (Dashboard polling)
 # -----------------------------
-@router.get("/state")
-def get_state():
+@router.get("/state", response_model=StateSnapshot)
+def get_state(session_id: str = Query(DEFAULT_SESSION, pattern=SESSION_ID_PATTERN), since: Optional[str] = None):
+    """
+    Pass the previous response's `cursor` as `since` to get only the logs
+    and narration added after it.
+    """
+    return redis_memory.for_session(session_id).snapshot(since=since)
 
-    return {
-        "paused": redis_memory.is_paused(),
-        "risk": redis_memory.get_risk(),
-        "logs": redis_memory.get_logs(),
-        "narration": redis_memory.get_narration(),
-        "screenshot": redis_memory.get_screenshot(),
-        "current_step": redis_memory.get_current_step()
+
+def _read_feed(feed: str, session_id: str, since: Optional[str], limit: int) -> dict:
+    entries, cursor = redis_memory.for_session(session_id).read_feed(feed, since, limit)
+    return {"entries": entries, "cursor": cursor}
+
+
+@router.get("/state/logs")
+def get_log_feed(
+    session_id: str = Query(DEFAULT_SESSION, pattern=SESSION_ID_PATTERN),
+    since: Optional[str] = Query(None, pattern=r"^\d+-\d+$"),
+    limit: int = Query(100, ge=1, le=500),
+):
+    """
+    Oldest-first log entries after the id `since`, with the cursor for the
+    next call (the same cursor again when nothing is new).
+    """
+    return _read_feed("logs", session_id, since, limit)
+
+
+@router.get("/state/narration")
+def get_narration_feed(
+    session_id: str = Query(DEFAULT_SESSION, pattern=SESSION_ID_PATTERN),
+    since: Optional[str] = Query(None, pattern=r"^\d+-\d+$"),
+    limit: int = Query(100, ge=1, le=500),
+):
+    return _read_feed("narration", session_id, since, limit)
+
+
+# -----------------------------
+# STATE STREAM (Server-Sent Events)
+# -----------------------------
+STREAM_KEEPALIVE_SECONDS = 15
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/state/stream")
+async def stream_state(session_id: str = Query(DEFAULT_SESSION, pattern=SESSION_ID_PATTERN)):
+    """
+    Pushes one full snapshot, then only the deltas published by
+    RedisMemory (log, narration, paused, risk, screenshot).
+    """
+    memory = async_redis_memory.for_session(session_id)
+
+    # An idle stream waits on the event loop, not on a threadpool thread
+    async def events():
+        # Subscribe before snapshotting so no delta falls in between
+        pubsub = await memory.subscribe_events()
+        loop = asyncio.get_running_loop()
+        try:
+            yield _sse("snapshot", (await memory.snapshot()).dict())
+            last_sent = loop.time()
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=STREAM_KEEPALIVE_SECONDS
+                )
+                if message is None:
+                    # Also returned for the subscribe confirmation, so only
+                    # an actually idle stream gets a keepalive. The comment
+                    # line keeps proxies from closing it.
+                    if loop.time() - last_sent >= STREAM_KEEPALIVE_SECONDS:
+                        yield ": keepalive\n\n"
+                        last_sent = loop.time()
+                    continue
+                delta = json.loads(message["data"])
+                yield _sse(delta["event"], delta["data"])
+                last_sent = loop.time()
+        finally:
+            await pubsub.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# -----------------------------
+# SCREENSHOTS (content-addressed)
+# -----------------------------
+@router.get("/screenshot/{digest}")
+def get_screenshot(
+    digest: str,
+    max_dim: Optional[int] = Query(None, ge=16, le=2048),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Serves raw PNG bytes by content hash. The hash is the ETag, so a
+    client that already has the image gets a 304 with no body.
+    """
+    etag = f'"{digest}"' if not max_dim else f'"{digest}-{max_dim}"'
+    headers = {
+        "ETag": etag,
+        # Content-addressed: the bytes behind a hash never change
+        "Cache-Control": "public, max-age=31536000, immutable",
     }
 
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    if max_dim:
+        img = screenshot_store.thumbnail(digest, max_dim)
+    else:
+        img = screenshot_store.get(digest)
+
+    if img is None:
+        raise HTTPException(status_code=404, detail="Screenshot not found")
+
+    return Response(content=img, media_type="image/png", headers=headers)
+
+
 @router.get("/profile")
 def get_profile():
-    return redis_memory.get_profile()
+    """
+    Balance, bills due and the number of history entries. History itself
+    is paged through /profile/history.
+    """
+    return redis_memory.ledger.summary()
+
+
+@router.get("/profile/history")
+def get_profile_history(
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = Query(None, pattern=r"^\d+-\d+$"),
+    type: Optional[str] = Query(None, pattern=r"^\w+$"),
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+):
+    """
+    Newest-first transaction history. Pass `next_cursor` back as `cursor`
+    for the next page (null when there are no more). `type` (e.g.
+    bill_payment, gold_purchase, transfer, deposit) and `since`/`until`
+    (unix seconds) filter without scanning other entries.
+    """
+    entries, next_cursor = redis_memory.ledger.history(
+        limit=limit, before=cursor, entry_type=type, since=since, until=until
+    )
+    return {"entries": entries, "next_cursor": next_cursor}
@@ -0,0 +1,111 @@
+import asyncio
+
+from playwright.async_api import async_playwright
+
+from services import request_router
+from services.browser_pool import BROWSER_HEADLESS
+from services.playwright_engine import NAVIGATION_WAIT_UNTIL
+
+
+class AsyncBrowser:
+    """
+    One Chromium shared by every AsyncPlaywrightEngine on the event loop.
+    Launched lazily on first use; each engine gets its own isolated
+    BrowserContext on top of it.
+    """
+
+    def __init__(self, headless=BROWSER_HEADLESS):
+        self.headless = headless
+        self.playwright = None
+        self.browser = None
+        self._lock = asyncio.Lock()
+
+    async def get(self):
+        async with self._lock:
+            if self.browser is None or not self.browser.is_connected():
+                if self.playwright is None:
+                    self.playwright = await async_playwright().start()
+                self.browser = await self.playwright.chromium.launch(headless=self.headless)
+            return self.browser
+
+    async def close(self):
+        async with self._lock:
+            if self.browser is not None:
+                await self.browser.close()
+                self.browser = None
+            if self.playwright is not None:
+                await self.playwright.stop()
+                self.playwright = None
+
+
+shared_async_browser = AsyncBrowser()
+
+
+class AsyncPlaywrightEngine:
+    """
+    Async counterpart of PlaywrightEngine (same method names, awaitable),
+    so one process can drive many pages concurrently on a single loop.
+    """
+
+    def __init__(self, shared_browser=None, route_requests=request_router.ROUTE_REQUESTS):
+        self.shared_browser = shared_browser or shared_async_browser
+        self.route_requests = route_requests
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.wait_until = NAVIGATION_WAIT_UNTIL
+
+    async def start(self):
+        self.browser = await self.shared_browser.get()
+
+    async def launch(self):
+        await self.start()
+        await self.release()
+        self.context = await self.browser.new_context()
+        if self.route_requests:
+            await request_router.install_async(self.context)
+        self.page = await self.context.new_page()
+        return self.page
+
+    async def release(self):
+        if self.context is not None:
+            await self.context.close()
+            self.context = None
+            self.page = None
+
+    async def close(self):
+        await self.release()
+
+    async def navigate(self, url: str, ready_selector=None, timeout=None):
+        await self.page.goto(url, wait_until=self.wait_until, timeout=timeout)
+        if ready_selector:
+            await self.page.wait_for_selector(ready_selector, timeout=timeout)
+
+    async def click(self, selector: str, timeout=None):
+        # page.click waits for the element to be actionable itself
+        await self.page.click(selector, timeout=timeout)
+
+    async def type_text(self, selector: str, text: str, timeout=None):
+        await self.page.wait_for_selector(selector, timeout=timeout)
+        await self.page.fill(selector, str(text), timeout=timeout)
+
+    async def screenshot(self, selector=None, clip=None) -> bytes:
+        if selector and await self.page.locator(selector).count():
+            return await self.page.locator(selector).first.screenshot()
+        return await self.page.screenshot(clip=clip)
+
+    async def selector_exists(self, selector: str) -> bool:
+        try:
+            await self.page.wait_for_selector(selector, timeout=1000)
+            return True
+        except Exception:
+            return False
+
+    async def type_slow(self, selector: str, text: str, delay=50, timeout=None):
+        await self.page.wait_for_selector(selector, timeout=timeout)
+        await self.page.click(selector, timeout=timeout)
+        await self.page.type(selector, text, delay=delay, timeout=timeout)
+
+    async def select(self, selector: str, value: str, timeout=None):
+        await self.page.wait_for_selector(selector, timeout=timeout)
+        await self.page.select_option(selector, value=value, timeout=timeout)
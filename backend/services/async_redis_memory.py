@@ -0,0 +1,273 @@
+import json
+from typing import List, Optional
+
+from services.redis_memory import (
+    DEFAULT_SESSION, FEED_APPEND_LUA, FEED_START, LOG_FEED_MAXLEN, NARRATION_FEED_MAXLEN,
+    SessionKeyspace, StateSnapshot, validate_session_id,
+)
+from services.redis_pool import BLOCKING, async_client
+from services.screenshot_store import async_screenshot_store
+
+
+class AsyncRedisMemory(SessionKeyspace):
+    """
+    RedisMemory on redis.asyncio, for code running on an event loop
+    (async routes, AsyncExecutorAgent). Same keys and scripts (from
+    SessionKeyspace), same methods, awaited; a Redis round trip yields to
+    the loop instead of blocking it.
+
+    The client comes from the running loop's shared pool
+    (services/redis_pool.py) unless one is injected. Scope is the
+    per-session workflow state only: the profile and ledger
+    (get_profile, set_profile, log_transaction, clear_bill) stay on
+    RedisMemory, where sync routes use them from the threadpool and
+    AsyncExecutorAgent runs its ledger steps with asyncio.to_thread.
+    """
+
+    def __init__(self, session_id=DEFAULT_SESSION, client=None, screenshots=None):
+        self._client = client
+        self.session_id = session_id
+        self.screenshots = screenshots or async_screenshot_store
+        self._feed_script = None
+
+    @property
+    def r(self):
+        return self._client or async_client()
+
+    @r.setter
+    def r(self, client):
+        self._client = client
+
+    @property
+    def blocking_r(self):
+        """
+        Client for pub/sub and BLPOP, from the loop's BLOCKING pool.
+        """
+        return self._client or async_client(kind=BLOCKING)
+
+    # -------------------------
+    # SESSION SCOPING
+    # -------------------------
+    def for_session(self, session_id: Optional[str]) -> "AsyncRedisMemory":
+        """
+        Returns a view bound to `session_id` that shares this connection.
+        """
+        return AsyncRedisMemory(
+            session_id=validate_session_id(session_id),
+            client=self._client,
+            screenshots=self.screenshots,
+        )
+
+    # -------------------------
+    # CHANGE EVENTS (dashboard stream)
+    # -------------------------
+    async def _write_and_publish(self, event: str, data, write):
+        pipe = self.r.pipeline(transaction=False)
+        write(pipe)
+        pipe.publish(self._key("events"), self._event_message(event, data))
+        await pipe.execute()
+
+    async def subscribe_events(self):
+        """
+        Returns an async pub/sub handle subscribed to this session's deltas.
+        The caller closes it (`await pubsub.aclose()`).
+        """
+        pubsub = self.blocking_r.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self._key("events"))
+        return pubsub
+
+    async def clear_session(self):
+        keys = [key async for key in self.r.scan_iter(match=self._key("*"), count=500)]
+        if keys:
+            await self.r.delete(*keys)
+
+    # -------------------------
+    # INTENT
+    # -------------------------
+    async def set_intent(self, intent: dict):
+        await self.r.set(self._key("intent"), json.dumps(intent))
+
+    async def get_intent(self) -> Optional[dict]:
+        data = await self.r.get(self._key("intent"))
+        return json.loads(data) if data else None
+
+    # -------------------------
+    # PLAN
+    # -------------------------
+    async def set_plan(self, plan: List[dict]):
+        await self.set_plan_json(json.dumps(plan))
+
+    async def set_plan_json(self, plan_json: str):
+        pipe = self.r.pipeline(transaction=True)
+        pipe.set(self._key("plan"), plan_json)
+        pipe.delete(self._key("run_id"))
+        await pipe.execute()
+
+    async def get_plan(self) -> Optional[List[dict]]:
+        data = await self.r.get(self._key("plan"))
+        return json.loads(data) if data else None
+
+    # -------------------------
+    # STEP TRACKING
+    # -------------------------
+    async def set_current_step(self, step: int):
+        await self.r.set(self._key("current_step"), step)
+
+    async def get_current_step(self) -> int:
+        val = await self.r.get(self._key("current_step"))
+        return int(val) if val else 0
+
+    async def increment_step(self):
+        await self.r.incr(self._key("current_step"))
+
+    # -------------------------
+    # PAUSE STATE
+    # -------------------------
+    async def set_paused(self, paused: bool):
+        await self._write_and_publish(
+            "paused", paused,
+            lambda pipe: pipe.set(self._key("is_paused"), "1" if paused else "0"),
+        )
+
+    async def is_paused(self) -> bool:
+        return await self.r.get(self._key("is_paused")) == "1"
+
+    # -------------------------
+    # CONTROL SIGNALS (approve / reject / cancel)
+    # -------------------------
+    async def send_control(self, command: str):
+        await self.r.rpush(self._key("control"), command)
+
+    async def wait_control(self, timeout: int) -> Optional[str]:
+        """
+        Awaits a control signal (BLPOP) for up to `timeout` seconds. Holds
+        a pool connection, but not the event loop, while waiting.
+        """
+        item = await self.blocking_r.blpop([self._key("control")], timeout=timeout)
+        return item[1] if item else None
+
+    async def clear_control(self):
+        await self.r.delete(self._key("control"))
+
+    # -------------------------
+    # SAFETY FLAGS
+    # -------------------------
+    async def set_risk(self, reason: str):
+        await self._write_and_publish(
+            "risk", reason,
+            lambda pipe: pipe.set(self._key("risk_flag"), reason),
+        )
+
+    async def get_risk(self) -> Optional[str]:
+        return await self.r.get(self._key("risk_flag"))
+
+    async def clear_risk(self):
+        await self._write_and_publish(
+            "risk", None,
+            lambda pipe: pipe.delete(self._key("risk_flag")),
+        )
+
+    # -------------------------
+    # SCREENSHOT STORAGE
+    # -------------------------
+    async def set_screenshot(self, png: bytes) -> str:
+        digest = await self.screenshots.put(png)
+        await self._write_and_publish(
+            "screenshot", digest,
+            lambda pipe: pipe.set(self._key("latest_screenshot"), digest),
+        )
+        return digest
+
+    async def clear_screenshot(self):
+        await self._write_and_publish(
+            "screenshot", None,
+            lambda pipe: pipe.delete(self._key("latest_screenshot")),
+        )
+
+    async def restore_screenshot(self, digest: str):
+        await self._write_and_publish(
+            "screenshot", digest,
+            lambda pipe: pipe.set(self._key("latest_screenshot"), digest, nx=True),
+        )
+
+    async def get_screenshot(self) -> Optional[str]:
+        return await self.r.get(self._key("latest_screenshot"))
+
+    # -------------------------
+    # LOG / NARRATION FEEDS (capped streams)
+    # -------------------------
+    async def _append_feed(self, feed: str, event: str, text: str, maxlen: int) -> str:
+        if self._feed_script is None:
+            self._feed_script = self.r.register_script(FEED_APPEND_LUA)
+        return await self._feed_script(
+            keys=self._feed_script_keys(feed),
+            args=[maxlen, event, text],
+            client=self.r,
+        )
+
+    async def read_feed(self, feed: str, since: Optional[str] = None, limit: int = 100):
+        rows = await self.r.xrange(
+            self._key(f"feed:{feed}"), f"({since or FEED_START}", "+", count=limit
+        )
+        return self._feed_page(rows, since)
+
+    async def push_log(self, text: str) -> str:
+        return await self._append_feed("logs", "log", text, LOG_FEED_MAXLEN)
+
+    async def get_logs(self, limit=50) -> List[str]:
+        rows = await self.r.xrevrange(self._key("feed:logs"), count=limit)
+        return [fields["m"] for _, fields in rows]
+
+    async def push_narration(self, text: str) -> str:
+        return await self._append_feed("narration", "narration", text, NARRATION_FEED_MAXLEN)
+
+    async def get_narration(self):
+        rows = await self.r.xrange(self._key("feed:narration"))
+        return [fields["m"] for _, fields in rows]
+
+    async def clear_narration(self):
+        await self.r.delete(self._key("feed:narration"))
+
+    # -------------------------
+    # EXECUTOR STATE
+    # -------------------------
+    async def save_executor_state(self, data: dict):
+        await self.r.set(self._key("executor_state"), json.dumps(data))
+
+    async def load_executor_state(self) -> Optional[dict]:
+        data = await self.r.get(self._key("executor_state"))
+        return json.loads(data) if data else None
+
+    async def set_user_approved(self, val: bool):
+        await self.r.set(self._key("user_approved"), "1" if val else "0")
+
+    async def is_user_approved(self) -> bool:
+        return await self.r.get(self._key("user_approved")) == "1"
+
+    async def clear_user_approved(self):
+        await self.r.delete(self._key("user_approved"))
+
+    async def transaction_id(self, step_id: int) -> str:
+        pipe = self.r.pipeline(transaction=False)
+        self._queue_run_id(pipe)
+        return self._transaction_id((await pipe.execute())[1], step_id)
+
+    # ---------------------------
+    # DASHBOARD SNAPSHOT
+    # ---------------------------
+    async def snapshot(self, log_limit=50, since: Optional[str] = None) -> StateSnapshot:
+        pipe = self.r.pipeline(transaction=True)
+        cursors = self._queue_snapshot(pipe, log_limit, since)
+        return self._build_snapshot(await pipe.execute(), *cursors)
+
+    # ---------------------------
+    # TEMP VALUES (for workflows)
+    # ---------------------------
+    async def set_temp(self, key: str, value):
+        await self.r.set(self._key(f"temp:{key}"), value)
+
+    async def get_temp(self, key: str):
+        return self._parse_temp(await self.r.get(self._key(f"temp:{key}")))
+
+
+async_redis_memory = AsyncRedisMemory()
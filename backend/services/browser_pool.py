@@ -0,0 +1,145 @@
+import os
+import time
+from typing import List, Optional
+
+from playwright.sync_api import sync_playwright
+
+from services import request_router
+
+BROWSER_HEADLESS = os.getenv("BROWSER_HEADLESS", "1") == "1"
+BROWSER_CONTEXT_POOL_SIZE = int(os.getenv("BROWSER_CONTEXT_POOL_SIZE", "2"))
+BROWSER_CONTEXT_MAX_USES = int(os.getenv("BROWSER_CONTEXT_MAX_USES", "20"))
+
+_CLEAR_STORAGE_JS = """
+() => {
+    try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}
+}
+"""
+
+
+class PooledContext:
+    """An isolated BrowserContext plus the page handed out with it."""
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class BrowserPool:
+    """
+    One long-lived headless browser with a pool of pre-warmed, isolated
+    BrowserContexts.
+
+    Not thread-safe on purpose: sync Playwright objects belong to the thread
+    that created them, so every executor worker owns its own pool.
+    """
+
+    def __init__(self, size=BROWSER_CONTEXT_POOL_SIZE, max_uses=BROWSER_CONTEXT_MAX_USES,
+                 headless=BROWSER_HEADLESS, route_requests=request_router.ROUTE_REQUESTS):
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.headless = headless
+        self.route_requests = route_requests
+
+        self.playwright = None
+        self.browser = None
+        self.idle: List[PooledContext] = []
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+    def start(self):
+        if self.playwright is None:
+            self.playwright = sync_playwright().start()
+        self.browser = self.playwright.chromium.launch(headless=self.headless)
+        self.idle = []
+        self._fill()
+
+    def healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+    def close(self):
+        for pooled in self.idle:
+            self._discard(pooled)
+        self.idle = []
+
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+
+        if self.playwright is not None:
+            self.playwright.stop()
+            self.playwright = None
+
+    # -------------------------
+    # LEASING
+    # -------------------------
+    def acquire(self) -> PooledContext:
+        if not self.healthy():
+            # First use, or the browser crashed / was killed: relaunch
+            print("🟨 [BrowserPool] Browser not connected, (re)launching")
+            self.start()
+
+        pooled = self.idle.pop() if self.idle else self._new_context()
+        pooled.uses += 1
+        return pooled
+
+    def release(self, pooled: PooledContext):
+        if not self.healthy():
+            return
+
+        if pooled.uses >= self.max_uses or not self._reset(pooled):
+            self._discard(pooled)
+            self._fill()
+            return
+
+        if len(self.idle) < self.size:
+            self.idle.append(pooled)
+        else:
+            self._discard(pooled)
+
+    # -------------------------
+    # INTERNALS
+    # -------------------------
+    def _new_context(self) -> PooledContext:
+        context = self.browser.new_context()
+        if self.route_requests:
+            # Block non-essential resources, serve dummy_bank assets from memory
+            request_router.install(context)
+        return PooledContext(context, context.new_page())
+
+    def _fill(self):
+        while len(self.idle) < self.size:
+            self.idle.append(self._new_context())
+
+    def _reset(self, pooled: PooledContext) -> bool:
+        """
+        Wipes what a workflow leaves behind (extra pages, cookies, web
+        storage) so the next lease starts clean. Returns False if the
+        context is unusable and should be recycled instead.
+        """
+        try:
+            for page in pooled.context.pages:
+                if page is not pooled.page:
+                    page.close()
+            if pooled.page.is_closed():
+                pooled.page = pooled.context.new_page()
+            elif pooled.page.url.startswith("http"):
+                pooled.page.evaluate(_CLEAR_STORAGE_JS)
+            pooled.context.clear_cookies()
+            pooled.page.goto("about:blank")
+            return True
+        except Exception as e:
+            print("🟥 [BrowserPool] Context reset failed:", e)
+            return False
+
+    def _discard(self, pooled: PooledContext):
+        try:
+            pooled.context.close()
+        except Exception:
+            pass
@@ -0,0 +1,110 @@
+import os
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from services.metrics import metrics
+
+# Longest side of the image sent to the vision model
+VISION_MAX_DIM = int(os.getenv("VISION_MAX_DIM", "1024"))
+# jpeg | webp | png
+VISION_IMAGE_FORMAT = os.getenv("VISION_IMAGE_FORMAT", "jpeg").lower()
+VISION_IMAGE_QUALITY = int(os.getenv("VISION_IMAGE_QUALITY", "80"))
+VISION_GRAYSCALE = os.getenv("VISION_GRAYSCALE", "0") == "1"
+
+# Element that frames every dummy_bank confirmation page
+VISION_CROP_SELECTOR = ".container"
+
+_ENCODINGS = {
+    "jpeg": (".jpg", "image/jpeg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", "image/webp", cv2.IMWRITE_WEBP_QUALITY),
+    "png": (".png", "image/png", None),
+}
+
+
+def prepare_for_vision(
+    png: bytes,
+    crop_box: Optional[dict] = None,
+    max_dim: int = VISION_MAX_DIM,
+    fmt: str = VISION_IMAGE_FORMAT,
+    quality: int = VISION_IMAGE_QUALITY,
+    grayscale: bool = VISION_GRAYSCALE,
+) -> Tuple[bytes, str]:
+    """
+    Crops a screenshot to `crop_box` ({x, y, width, height} in CSS pixels,
+    as from getBoundingClientRect), downsizes it so the longest side is at
+    most `max_dim` and re-encodes it. Returns (bytes, mime_type).
+
+    Falls back to the untouched PNG if it can't be decoded or encoded, so a
+    preprocessing problem never blocks verification, and to PNG when the
+    re-encoding would be larger (flat UI screens often compress better
+    losslessly).
+    """
+    start = time.perf_counter()
+    ext, mime, quality_flag = _ENCODINGS.get(fmt, _ENCODINGS["jpeg"])
+
+    flags = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+    img = cv2.imdecode(np.frombuffer(png, np.uint8), flags)
+    if img is None:
+        return png, "image/png"
+    original_shape = img.shape[:2]
+
+    if crop_box:
+        x0, y0 = max(0, int(crop_box["x"])), max(0, int(crop_box["y"]))
+        x1 = min(img.shape[1], int(crop_box["x"] + crop_box["width"]) + 1)
+        y1 = min(img.shape[0], int(crop_box["y"] + crop_box["height"]) + 1)
+        if x1 > x0 and y1 > y0:
+            img = img[y0:y1, x0:x1]
+
+    h, w = img.shape[:2]
+    scale = max_dim / max(h, w)
+    if scale < 1:
+        img = cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+    params = [quality_flag, quality] if quality_flag is not None else []
+    ok, buf = cv2.imencode(ext, img, params)
+    if not ok:
+        return png, "image/png"
+
+    out = buf.tobytes()
+    if len(out) >= len(png):
+        if img.shape[:2] == original_shape:
+            out, mime = png, "image/png"
+        else:
+            ok, buf = cv2.imencode(".png", img)
+            if ok and buf.size < len(out):
+                out, mime = buf.tobytes(), "image/png"
+
+    metrics.observe("vision_prep", (time.perf_counter() - start) * 1000)
+    metrics.incr("vision_prep.bytes_in", len(png))
+    metrics.incr("vision_prep.bytes_out", len(out))
+    return out, mime
+
+
+def image_size(image: bytes) -> Optional[Tuple[int, int]]:
+    """
+    (width, height) of a screenshot; read from the PNG header when it is
+    one, else by decoding.
+    """
+    if image[:8] == b"\x89PNG\r\n\x1a\n" and len(image) >= 24:
+        return int.from_bytes(image[16:20], "big"), int.from_bytes(image[20:24], "big")
+    img = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_UNCHANGED)
+    if img is None:
+        return None
+    return img.shape[1], img.shape[0]
+
+
+def prep_stats() -> dict:
+    bytes_in = metrics.counter("vision_prep.bytes_in")
+    bytes_out = metrics.counter("vision_prep.bytes_out")
+    return {
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+        "bytes_saved": bytes_in - bytes_out,
+        "ratio": bytes_out / bytes_in if bytes_in else 0.0,
+    }
+
+
+metrics.register_collector("vision_prep", prep_stats)
@@ -0,0 +1,164 @@
+import difflib
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from agents.intent_agent import INTENT_AGENT_VERSION, IntentOutput
+from agents.intent_rules import HEDGE_RE, normalize_utterance
+from services.metrics import metrics
+from services.async_redis_memory import async_redis_memory
+from services.redis_memory import redis_memory
+
+INTENT_CACHE_TTL = int(os.getenv("INTENT_CACHE_TTL", "86400"))
+
+# Near-duplicate lookup: similarity threshold in (0, 1], 0 disables it
+INTENT_CACHE_SIMILARITY = float(os.getenv("INTENT_CACHE_SIMILARITY", "0"))
+INTENT_CACHE_NEAR_MAX = int(os.getenv("INTENT_CACHE_NEAR_MAX", "2000"))
+
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+class IntentCache:
+    """
+    Validated IntentOutputs for utterances the LLM has already answered.
+
+    Exact lookups go to Redis under
+    `intent:cache:<agent version>:<sha1(normalized text)>` with a TTL, so a
+    new model, prompt or schema starts from an empty cache. The optional
+    near-duplicate index is per process and only serves a cached intent
+    when the amounts match exactly and any named entity appears in the new
+    text, so "send 1000 to tom" never reuses "send 1000 to mom".
+
+    get_async/put_async do the same on `async_memory`, for callers on the
+    event loop.
+    """
+
+    def __init__(self, memory=redis_memory, ttl=INTENT_CACHE_TTL,
+                 similarity=INTENT_CACHE_SIMILARITY, near_max=INTENT_CACHE_NEAR_MAX,
+                 version=INTENT_AGENT_VERSION, async_memory=async_redis_memory):
+        self.memory = memory
+        self.async_memory = async_memory
+        self.ttl = ttl
+        self.similarity = similarity
+        self.near_max = near_max
+        self.version = version
+        self._near: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, normalized: str) -> str:
+        digest = hashlib.sha1(normalized.encode()).hexdigest()
+        return f"intent:cache:{self.version}:{digest}"
+
+    def get(self, text: str) -> Optional[IntentOutput]:
+        normalized = normalize_utterance(text)
+        return self._lookup(text, normalized, self._redis_get(self._key(normalized)))
+
+    async def get_async(self, text: str) -> Optional[IntentOutput]:
+        normalized = normalize_utterance(text)
+        try:
+            raw = await self.async_memory.r.get(self._key(normalized))
+        except Exception:
+            # A cache outage is a miss; counted, not raised
+            metrics.incr("intent_cache.redis_errors")
+            raw = None
+        return self._lookup(text, normalized, raw)
+
+    def _lookup(self, text: str, normalized: str, raw: Optional[str]) -> Optional[IntentOutput]:
+        if raw:
+            try:
+                intent = IntentOutput.parse_raw(raw)
+                metrics.incr("intent_cache.hits.exact")
+                self._remember(normalized, raw)
+                return intent
+            except ValueError:
+                pass
+
+        intent = self._near_lookup(text, normalized)
+        if intent is not None:
+            metrics.incr("intent_cache.hits.near")
+            return intent
+
+        metrics.incr("intent_cache.misses")
+        return None
+
+    def put(self, text: str, intent: IntentOutput):
+        normalized = normalize_utterance(text)
+        raw = intent.json()
+        try:
+            self.memory.r.set(self._key(normalized), raw, ex=self.ttl)
+        except Exception:
+            metrics.incr("intent_cache.redis_errors")
+        self._remember(normalized, raw)
+
+    async def put_async(self, text: str, intent: IntentOutput):
+        normalized = normalize_utterance(text)
+        raw = intent.json()
+        try:
+            await self.async_memory.r.set(self._key(normalized), raw, ex=self.ttl)
+        except Exception:
+            metrics.incr("intent_cache.redis_errors")
+        self._remember(normalized, raw)
+
+    def _redis_get(self, key: str) -> Optional[str]:
+        try:
+            return self.memory.r.get(key)
+        except Exception:
+            metrics.incr("intent_cache.redis_errors")
+            return None
+
+    # ------------------------------------
+    # Near duplicates
+    # ------------------------------------
+    def _remember(self, normalized: str, raw: str):
+        if self.similarity <= 0:
+            return
+        with self._lock:
+            self._near[normalized] = raw
+            self._near.move_to_end(normalized)
+            while len(self._near) > self.near_max:
+                self._near.popitem(last=False)
+
+    def _near_lookup(self, text: str, normalized: str) -> Optional[IntentOutput]:
+        # Negations and questions only ever match exactly
+        if self.similarity <= 0 or HEDGE_RE.search(text.lower()):
+            return None
+
+        numbers = sorted(_NUMBER_RE.findall(normalized))
+        tokens = set(normalized.split())
+        matcher = difflib.SequenceMatcher(b=normalized, autojunk=False)
+
+        best, best_score = None, self.similarity
+        with self._lock:
+            candidates = list(self._near.items())
+        for candidate, raw in candidates:
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() < best_score or matcher.quick_ratio() < best_score:
+                continue
+            score = matcher.ratio()
+            if score >= best_score and sorted(_NUMBER_RE.findall(candidate)) == numbers:
+                intent = IntentOutput.parse_raw(raw)
+                if intent.entity in (None, "self", "digital_gold") or intent.entity in tokens:
+                    best, best_score = intent, score
+        return best
+
+    def stats(self) -> dict:
+        exact = metrics.counter("intent_cache.hits.exact")
+        near = metrics.counter("intent_cache.hits.near")
+        misses = metrics.counter("intent_cache.misses")
+        lookups = exact + near + misses
+        return {
+            "version": self.version,
+            "exact_hits": exact,
+            "near_hits": near,
+            "misses": misses,
+            "hit_rate": (exact + near) / lookups if lookups else 0.0,
+            # Every hit skipped one LLM call of average latency
+            "saved_latency_ms": (exact + near) * metrics.mean("intent.llm"),
+        }
+
+
+intent_cache = IntentCache()
+metrics.register_collector("intent_cache", intent_cache.stats)
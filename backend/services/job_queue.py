@@ -0,0 +1,247 @@
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, Optional
+
+from services.metrics import metrics
+from services.redis_memory import redis_memory
+
+EXECUTOR_WORKERS = int(os.getenv("EXECUTOR_WORKERS", "2"))
+EXECUTOR_QUEUE_SIZE = int(os.getenv("EXECUTOR_QUEUE_SIZE", "32"))
+
+# How many finished jobs to remember for GET /jobs/{id}
+FINISHED_JOB_HISTORY = 1000
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class QueueFull(Exception):
+    """Raised when the job queue is at capacity (backpressure)."""
+
+
+class SessionBusy(Exception):
+    """Raised when a session already has a queued or running job."""
+
+
+@dataclass
+class Job:
+    session_id: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    worker: Optional[str] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        if self.started_at:
+            data["queue_wait_ms"] = (self.started_at - self.submitted_at) * 1000
+        if self.finished_at and self.started_at:
+            data["run_ms"] = (self.finished_at - self.started_at) * 1000
+        return data
+
+
+class ExecutorPool:
+    """
+    Bounded job queue drained by a fixed set of executor worker threads.
+
+    Each worker builds its own executor inside its thread, because the
+    sync Playwright API is bound to the thread that started it.
+    """
+
+    def __init__(self, executor_factory: Callable, workers=EXECUTOR_WORKERS, max_queue=EXECUTOR_QUEUE_SIZE):
+        self.executor_factory = executor_factory
+        self.workers = workers
+        self.max_queue = max_queue
+
+        # Unbounded: capacity is counted in self.queued, so a job cancelled
+        # while queued (left in the queue for a worker to skip) frees its
+        # slot straight away
+        self.queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.active_by_session: Dict[str, str] = {}
+        self.queued = 0
+        self.busy_workers = 0
+
+        self._lock = threading.Lock()
+        self._threads = []
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"executor-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def shutdown(self, timeout=10):
+        for _ in self._threads:
+            self.queue.put(None)
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    # -------------------------
+    # JOB API
+    # -------------------------
+    def submit(self, session_id: str) -> Job:
+        job = Job(session_id=session_id)
+
+        with self._lock:
+            if session_id in self.active_by_session:
+                raise SessionBusy(self.active_by_session[session_id])
+            if self.queued >= self.max_queue:
+                metrics.incr("executor_pool.rejected")
+                raise QueueFull()
+            self.queue.put_nowait(job)
+            self.queued += 1
+            self.jobs[job.id] = job
+            self.active_by_session[session_id] = job.id
+
+        metrics.incr("executor_pool.submitted")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def active_job(self, session_id: str) -> Optional[str]:
+        """
+        Id of the session's queued or running job, if any.
+        """
+        with self._lock:
+            return self.active_by_session.get(session_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Queued jobs are dropped before they start. Running jobs are stopped
+        cooperatively the same way /reject does it: the step pointer is
+        pushed past the end of the plan and the pause is released.
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status in (COMPLETED, FAILED, CANCELLED):
+                return job
+            job.cancel_requested = True
+            if job.status == QUEUED:
+                self.queued -= 1
+                self._finish(job, CANCELLED)
+                return job
+
+        memory = redis_memory.for_session(job.session_id)
+        memory.set_current_step(9999)
+        memory.set_paused(False)
+        memory.push_log("Execution cancelled")
+        memory.send_control("cancel")
+        return job
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "busy_workers": self.busy_workers,
+                "queue_depth": self.queued,
+                "max_queue": self.max_queue,
+                "active_sessions": len(self.active_by_session),
+            }
+
+    # -------------------------
+    # WORKER
+    # -------------------------
+    def _build_executor(self):
+        """
+        Returns a new executor, or None (logged) when the factory raises,
+        e.g. SELECTOR_INDEX_STRICT refusing a stale selector map.
+        """
+        try:
+            executor = self.executor_factory()
+        except Exception:
+            traceback.print_exc()
+            metrics.incr("executor_pool.executor_errors")
+            return None
+
+        # Pay the browser cold start before the first job, not during it
+        warm_up = getattr(executor, "warm_up", None)
+        if warm_up:
+            try:
+                warm_up()
+            except Exception:
+                traceback.print_exc()
+        return executor
+
+    def _worker(self):
+        executor = self._build_executor()
+        name = threading.current_thread().name
+
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+
+            with self._lock:
+                if job.status == CANCELLED:
+                    continue
+                self.queued -= 1
+                job.status = RUNNING
+                job.started_at = time.time()
+                job.worker = name
+                self.busy_workers += 1
+
+            metrics.observe("executor_pool.queue_wait", (job.started_at - job.submitted_at) * 1000)
+            memory = redis_memory.for_session(job.session_id)
+            memory.push_log("Execution started")
+
+            status, error = COMPLETED, None
+            try:
+                # A worker whose executor could not be built retries per
+                # job instead of dying and leaving its jobs queued forever
+                if executor is None:
+                    executor = self._build_executor()
+                    if executor is None:
+                        raise RuntimeError("Executor could not be started")
+                executor.run(job.session_id)
+            except Exception as e:
+                traceback.print_exc()
+                status, error = FAILED, str(e)
+                memory.push_log(f"Execution failed: {e}")
+
+            with self._lock:
+                self.busy_workers -= 1
+                job.error = error
+                self._finish(job, CANCELLED if job.cancel_requested else status)
+
+            metrics.observe("executor_pool.run", (job.finished_at - job.started_at) * 1000)
+
+        close = getattr(executor, "close", None) if executor else None
+        if close:
+            close()
+
+    def _finish(self, job: Job, status: str):
+        # Caller holds self._lock
+        job.status = status
+        job.finished_at = time.time()
+        if self.active_by_session.get(job.session_id) == job.id:
+            del self.active_by_session[job.session_id]
+        metrics.incr(f"executor_pool.{status}")
+
+        # Forget the oldest finished jobs once the history is full
+        while len(self.jobs) > FINISHED_JOB_HISTORY:
+            oldest_id, oldest = next(iter(self.jobs.items()))
+            if oldest.status in (QUEUED, RUNNING):
+                break
+            del self.jobs[oldest_id]
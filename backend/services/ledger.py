@@ -0,0 +1,376 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# How long a transaction id is remembered for idempotent retries
+LEDGER_TXN_TTL = int(os.getenv("LEDGER_TXN_TTL", str(7 * 24 * 3600)))
+# Approximate cap on the history stream; 0 keeps everything (see archive())
+LEDGER_HISTORY_MAXLEN = int(os.getenv("LEDGER_HISTORY_MAXLEN", "0"))
+# History entries /profile returns
+PROFILE_HISTORY_LIMIT = int(os.getenv("PROFILE_HISTORY_LIMIT", "20"))
+
+ACCOUNT_KEY = "ledger:account"
+BILLS_KEY = "ledger:bills"
+HISTORY_KEY = "ledger:history"
+# Per-type copies of history entries under the same ids, so a type filter
+# reads only its own entries
+HISTORY_TYPE_PREFIX = "ledger:history:type:"
+
+DEFAULT_PROFILE = {
+    "balance": 100000,
+    "bills": {
+        "tata": 950,
+        "adani": 1200
+    },
+    "history": []
+}
+
+# History is a stream of compact entries: one-letter field names, short
+# type codes, and the stream id doubles as the timestamp.
+_FIELDS = {"type": "t", "amount": "a", "details": "d", "txn_id": "x"}
+_FIELD_NAMES = {short: name for name, short in _FIELDS.items()}
+_TYPE_CODES = {"bill_payment": "b", "gold_purchase": "g", "transfer": "t", "deposit": "d"}
+_TYPE_NAMES = {code: name for name, code in _TYPE_CODES.items()}
+
+
+def encode_entry(entry: dict) -> dict:
+    """
+    Stream fields for a history entry. Unknown keys keep their names.
+    """
+    fields = {}
+    for name, value in entry.items():
+        if value is None or name in ("id", "ts"):
+            continue
+        if name == "type":
+            value = _TYPE_CODES.get(value, value)
+        fields[_FIELDS.get(name, name)] = str(value)
+    return fields
+
+
+def history_type_key(entry_type: str) -> str:
+    return f"{HISTORY_TYPE_PREFIX}{entry_type}"
+
+
+def decode_entry(entry_id: str, fields: dict) -> dict:
+    entry = {"id": entry_id, "ts": int(entry_id.split("-")[0]) // 1000}
+    for short, value in fields.items():
+        name = _FIELD_NAMES.get(short, short)
+        if name == "type":
+            value = _TYPE_NAMES.get(value, value)
+        elif name == "amount":
+            value = int(value) if value.lstrip("-").isdigit() else value
+        entry[name] = value
+    return entry
+
+
+# Appends to the history stream and to the entry type's index stream under
+# the same id (type streams are subsequences of the history stream, so the
+# explicit id is always increasing there).
+_HISTORY_LUA = """
+local function xadd(key, maxlen, id, fields)
+    local args = {"XADD", key}
+    if maxlen > 0 then
+        for _, arg in ipairs({"MAXLEN", "~", maxlen}) do table.insert(args, arg) end
+    end
+    table.insert(args, id)
+    for _, arg in ipairs(fields) do table.insert(args, arg) end
+    return redis.call(unpack(args))
+end
+
+local function append_history(history, index, maxlen, fields)
+    local id = xadd(history, maxlen, "*", fields)
+    xadd(index, maxlen, id, fields)
+    return id
+end
+"""
+
+#   KEYS: history, type index
+#   ARGV: history maxlen, encoded entry fields...
+_APPEND_LUA = _HISTORY_LUA + """
+return append_history(KEYS[1], KEYS[2], tonumber(ARGV[1]), {unpack(ARGV, 2)})
+"""
+
+# Check-and-apply in one round trip. A transaction id that was already
+# applied returns its stored outcome instead of moving money again.
+#   KEYS: account, bills, txn, history, type index
+#   ARGV: op (debit | credit | pay_bill), amount, txn ttl, biller,
+#         history maxlen, encoded entry fields...
+# For pay_bill a non-zero amount is the due amount the user approved.
+_APPLY_LUA = _HISTORY_LUA + """
+local seen = redis.call("HMGET", KEYS[3], "balance", "amount")
+if seen[1] then
+    return {"duplicate", tonumber(seen[1]), tonumber(seen[2])}
+end
+
+local op, amount = ARGV[1], tonumber(ARGV[2])
+local balance = tonumber(redis.call("HGET", KEYS[1], "balance") or "0")
+
+if op == "pay_bill" then
+    local due = tonumber(redis.call("HGET", KEYS[2], ARGV[4]) or "0")
+    if due <= 0 then
+        return {"no_bill", balance, 0}
+    end
+    if amount > 0 and amount ~= due then
+        return {"bill_changed", balance, due}
+    end
+    amount = due
+end
+
+if op ~= "credit" and balance < amount then
+    return {"insufficient_funds", balance, amount}
+end
+
+if op == "credit" then
+    balance = redis.call("HINCRBY", KEYS[1], "balance", amount)
+else
+    balance = redis.call("HINCRBY", KEYS[1], "balance", -amount)
+end
+if op == "pay_bill" then
+    redis.call("HSET", KEYS[2], ARGV[4], 0)
+end
+
+local fields = {unpack(ARGV, 6)}
+table.insert(fields, "a")
+table.insert(fields, amount)
+append_history(KEYS[4], KEYS[5], tonumber(ARGV[5]), fields)
+
+redis.call("HSET", KEYS[3], "balance", balance, "amount", amount)
+redis.call("EXPIRE", KEYS[3], tonumber(ARGV[3]))
+return {"ok", balance, amount}
+"""
+
+
+@dataclass(frozen=True)
+class LedgerResult:
+    # ok | duplicate | insufficient_funds | no_bill | bill_changed
+    status: str
+    balance: int
+    amount: int
+
+    @property
+    def applied(self) -> bool:
+        """
+        True when the money has moved, now or by an earlier call with the
+        same transaction id.
+        """
+        return self.status in ("ok", "duplicate")
+
+
+class Ledger:
+    """
+    Account balance and bills as Redis hashes, history as an append-only
+    stream read newest-first with cursors, plus one index stream per
+    entry type for filtered reads.
+
+    Debits, credits and bill payments are single Lua scripts: the balance
+    check, the update, the history entry and the transaction-id record
+    happen atomically, so concurrent executors never lose an update or
+    overdraw, and a retried step with the same id is applied once.
+    """
+
+    def __init__(self, memory, txn_ttl=LEDGER_TXN_TTL, history_maxlen=LEDGER_HISTORY_MAXLEN):
+        # Follows memory.r, so swapping the client (tests, benchmarks)
+        # moves the ledger with it
+        self.memory = memory
+        self.txn_ttl = txn_ttl
+        self.history_maxlen = history_maxlen
+        self._scripts = {}
+        self._script_client = None
+
+    def _script(self, source: str):
+        client = self.memory.r
+        if self._script_client is not client:
+            self._scripts = {}
+            self._script_client = client
+        if source not in self._scripts:
+            self._scripts[source] = client.register_script(source)
+        return self._scripts[source]
+
+    def _apply(self, op: str, amount: int, txn_id: str, entry: dict, biller: str = "") -> LedgerResult:
+        # The script appends the amount it actually moved
+        fields = encode_entry({**entry, "txn_id": txn_id, "amount": None})
+        status, balance, amount = self._script(_APPLY_LUA)(
+            keys=[ACCOUNT_KEY, BILLS_KEY, f"ledger:txn:{txn_id}", HISTORY_KEY,
+                  history_type_key(entry["type"])],
+            args=[op, amount, self.txn_ttl, biller, self.history_maxlen, *_flatten(fields)],
+            client=self.memory.r,
+        )
+        if isinstance(status, bytes):
+            status = status.decode()
+        return LedgerResult(status=status, balance=int(balance), amount=int(amount))
+
+    # ------------------------------------
+    # Money movement
+    # ------------------------------------
+    def debit(self, amount: int, txn_id: str, entry: dict) -> LedgerResult:
+        return self._apply("debit", _positive(amount), txn_id, entry)
+
+    def credit(self, amount: int, txn_id: str, entry: dict) -> LedgerResult:
+        return self._apply("credit", _positive(amount), txn_id, entry)
+
+    def pay_bill(self, biller: str, txn_id: str, entry: dict, expected: Optional[int] = None) -> LedgerResult:
+        """
+        Debits what is due for `biller` and zeroes the bill. With
+        `expected`, refuses (bill_changed) if the due amount is different.
+        """
+        return self._apply("pay_bill", int(expected or 0), txn_id, entry, biller=biller)
+
+    # ------------------------------------
+    # Reads
+    # ------------------------------------
+    def balance(self) -> int:
+        return int(self.memory.r.hget(ACCOUNT_KEY, "balance") or 0)
+
+    def bill(self, biller: str) -> Optional[int]:
+        due = self.memory.r.hget(BILLS_KEY, biller)
+        return int(due) if due is not None else None
+
+    def profile(self, history_limit: int = PROFILE_HISTORY_LIMIT) -> dict:
+        """
+        The profile shape ({balance, bills, history}) in one round trip,
+        with only the latest `history_limit` entries (oldest first).
+        """
+        pipe = self.memory.r.pipeline(transaction=True)
+        pipe.hget(ACCOUNT_KEY, "balance")
+        pipe.hgetall(BILLS_KEY)
+        pipe.xrevrange(HISTORY_KEY, count=history_limit)
+        balance, bills, history = pipe.execute()
+
+        if balance is None:
+            return json.loads(json.dumps(DEFAULT_PROFILE))
+        return {
+            "balance": int(balance),
+            "bills": {biller: int(due) for biller, due in bills.items()},
+            "history": [decode_entry(*row) for row in reversed(history)],
+        }
+
+    def summary(self) -> dict:
+        """
+        Balance, bills and the number of history entries, without history.
+        """
+        pipe = self.memory.r.pipeline(transaction=True)
+        pipe.hget(ACCOUNT_KEY, "balance")
+        pipe.hgetall(BILLS_KEY)
+        pipe.xlen(HISTORY_KEY)
+        balance, bills, count = pipe.execute()
+
+        if balance is None:
+            return {"balance": DEFAULT_PROFILE["balance"], "bills": dict(DEFAULT_PROFILE["bills"]),
+                    "history_count": 0}
+        return {
+            "balance": int(balance),
+            "bills": {biller: int(due) for biller, due in bills.items()},
+            "history_count": count,
+        }
+
+    def history(self, limit: int = PROFILE_HISTORY_LIMIT, before: Optional[str] = None,
+                entry_type: Optional[str] = None, since: Optional[float] = None,
+                until: Optional[float] = None) -> Tuple[List[dict], Optional[str]]:
+        """
+        Newest-first page of history. Returns (entries, cursor); pass the
+        cursor as `before` for the next page, None means no more.
+
+        `entry_type` reads that type's index stream instead of the full
+        history; `since`/`until` (unix seconds, inclusive) become stream id
+        bounds, so neither filter scans unrelated entries.
+        """
+        key = history_type_key(entry_type) if entry_type else HISTORY_KEY
+        if before:
+            newest = f"({before}"
+        elif until is not None:
+            newest = str(int(until * 1000))
+        else:
+            newest = "+"
+        oldest = str(int(since * 1000)) if since is not None else "-"
+
+        rows = self.memory.r.xrevrange(key, newest, oldest, count=limit)
+        cursor = rows[-1][0] if len(rows) == limit else None
+        return [decode_entry(*row) for row in rows], cursor
+
+    def history_since(self, after: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """
+        Oldest-first entries added after the id `after` (for followers).
+        """
+        rows = self.memory.r.xrange(
+            HISTORY_KEY, f"({after}" if after else "-", "+", count=limit
+        )
+        return [decode_entry(*row) for row in rows]
+
+    def history_length(self) -> int:
+        return self.memory.r.xlen(HISTORY_KEY)
+
+    # ------------------------------------
+    # Admin writes (seeding, manual entries)
+    # ------------------------------------
+    def reset(self, profile: dict):
+        """
+        Replaces balance, bills and history in one MULTI/EXEC.
+        """
+        r = self.memory.r
+        type_keys = list(r.scan_iter(match=f"{HISTORY_TYPE_PREFIX}*", count=500))
+        append = self._script(_APPEND_LUA)
+
+        pipe = r.pipeline(transaction=True)
+        pipe.delete(ACCOUNT_KEY, BILLS_KEY, HISTORY_KEY, *type_keys)
+        pipe.hset(ACCOUNT_KEY, "balance", int(profile.get("balance", 0)))
+        if profile.get("bills"):
+            pipe.hset(BILLS_KEY, mapping={k: int(v) for k, v in profile["bills"].items()})
+        for entry in profile.get("history") or ():
+            append(keys=self._history_keys(entry),
+                   args=[self.history_maxlen, *_flatten(encode_entry(entry))], client=pipe)
+        pipe.execute()
+
+    def append_history(self, entry: dict) -> str:
+        return self._script(_APPEND_LUA)(
+            keys=self._history_keys(entry),
+            args=[self.history_maxlen, *_flatten(encode_entry(entry))],
+            client=self.memory.r,
+        )
+
+    def _history_keys(self, entry: dict) -> List[str]:
+        return [HISTORY_KEY, history_type_key(entry.get("type", "unknown"))]
+
+    def archive(self, keep: int, path: str, batch: int = 1000) -> int:
+        """
+        Appends all but the newest `keep` history entries to a JSONL file
+        and deletes them from the stream. Entries are deleted by id only
+        after they are written, so concurrent appends are never lost.
+        """
+        r = self.memory.r
+        newest = r.xrevrange(HISTORY_KEY, count=keep + 1)
+        if len(newest) <= keep:
+            return 0
+
+        last, start, moved = newest[-1][0], "-", 0
+        with open(path, "a", encoding="utf-8") as f:
+            while True:
+                rows = r.xrange(HISTORY_KEY, start, last, count=batch)
+                if not rows:
+                    break
+                entries = [decode_entry(*row) for row in rows]
+                f.writelines(json.dumps(entry) + "\n" for entry in entries)
+                f.flush()
+
+                pipe = r.pipeline(transaction=False)
+                pipe.xdel(HISTORY_KEY, *(entry["id"] for entry in entries))
+                for entry in entries:
+                    pipe.xdel(history_type_key(entry.get("type", "unknown")), entry["id"])
+                pipe.execute()
+                moved += len(rows)
+                start = f"({rows[-1][0]}"
+        return moved
+
+    def clear_bill(self, biller: str):
+        self.memory.r.hset(BILLS_KEY, biller, 0)
+
+
+def _flatten(fields: dict) -> List[str]:
+    return [part for item in fields.items() for part in item]
+
+
+def _positive(amount) -> int:
+    amount = int(amount)
+    if amount <= 0:
+        raise ValueError(f"Invalid amount: {amount}")
+    return amount
@@ -0,0 +1,75 @@
+import threading
+from collections import deque
+from typing import Callable, Dict
+
+
+class Metrics:
+    """
+    Tiny in-process metrics registry (counters, gauges, timings).
+
+    Subsystems either record into it directly or register a collector
+    callable whose dict is merged into the snapshot served by GET /metrics.
+    """
+
+    def __init__(self, timing_window=1024):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._timings: Dict[str, deque] = {}
+        self._timing_totals: Dict[str, list] = {}
+        self._collectors: Dict[str, Callable[[], dict]] = {}
+        self._window = timing_window
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, ms: float):
+        with self._lock:
+            if name not in self._timings:
+                self._timings[name] = deque(maxlen=self._window)
+                self._timing_totals[name] = [0, 0.0]
+            self._timings[name].append(ms)
+            self._timing_totals[name][0] += 1
+            self._timing_totals[name][1] += ms
+
+    def register_collector(self, name: str, fn: Callable[[], dict]):
+        self._collectors[name] = fn
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def mean(self, name: str) -> float:
+        with self._lock:
+            count, total = self._timing_totals.get(name, (0, 0.0))
+            return total / count if count else 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            timings = {}
+            for name, window in self._timings.items():
+                ordered = sorted(window)
+                count, total = self._timing_totals[name]
+                timings[name] = {
+                    "count": count,
+                    "mean_ms": total / count if count else 0.0,
+                    "p50_ms": ordered[len(ordered) // 2] if ordered else 0.0,
+                    "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] if ordered else 0.0,
+                }
+            data = {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": timings,
+            }
+
+        for name, fn in self._collectors.items():
+            data[name] = fn()
+        return data
+
+
+metrics = Metrics()
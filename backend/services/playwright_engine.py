@@ -1,29 +1,75 @@
-from playwright.sync_api import sync_playwright
+from services.browser_pool import BrowserPool
+
+# DOM parsed is enough: stylesheets come from the in-memory asset cache and
+# images/fonts are blocked, so waiting for network idle only adds latency
+NAVIGATION_WAIT_UNTIL = "domcontentloaded"
 
 class PlaywrightEngine:
-    def __init__(self):
+    def __init__(self, pool=None):
+        # The pool (and its browser) is created lazily on the thread that
+        # first launches, since sync Playwright is bound to that thread
+        self.pool = pool
+        self.lease = None
         self.browser = None
         self.page = None
+        self.wait_until = NAVIGATION_WAIT_UNTIL
+
+    def start(self):
+        """
+        Launches the browser and pre-warms contexts ahead of the first run.
+        """
+        if self.pool is None:
+            self.pool = BrowserPool()
+        if not self.pool.healthy():
+            self.pool.start()
+        self.browser = self.pool.browser
 
     def launch(self):
-        p = sync_playwright().start()
-        self.browser = p.chromium.launch(headless=False)
-        self.page = self.browser.new_page()
+        """
+        Leases a clean, pre-warmed context from the pool.
+        """
+        self.start()
+        self.release()
+        self.lease = self.pool.acquire()
+        self.browser = self.pool.browser
+        self.page = self.lease.page
         return self.page
 
-    def navigate(self, url: str):
-        self.page.goto(url, wait_until="networkidle")
+    def release(self):
+        """
+        Returns the current context to the pool for cleanup/recycling.
+        """
+        if self.lease is not None:
+            self.pool.release(self.lease)
+            self.lease = None
+            self.page = None
+
+    def close(self):
+        self.release()
+        if self.pool is not None:
+            self.pool.close()
+
+    def navigate(self, url: str, ready_selector=None, timeout=None):
+        self.page.goto(url, wait_until=self.wait_until, timeout=timeout)
+        if ready_selector:
+            self.page.wait_for_selector(ready_selector, timeout=timeout)
 
-    def click(self, selector: str):
-        self.page.wait_for_selector(selector)
-        self.page.click(selector)
+    def click(self, selector: str, timeout=None):
+        # page.click waits for the element to be actionable itself
+        self.page.click(selector, timeout=timeout)
 
-    def type_text(self, selector: str, text: str):
-        self.page.wait_for_selector(selector)
-        self.page.fill(selector, str(text))
+    def type_text(self, selector: str, text: str, timeout=None):
+        self.page.wait_for_selector(selector, timeout=timeout)
+        self.page.fill(selector, str(text), timeout=timeout)
 
-    def screenshot(self) -> bytes:
-        return self.page.screenshot()
+    def screenshot(self, selector=None, clip=None) -> bytes:
+        """
+        Full viewport by default. `selector` captures just that element
+        (if present), `clip` ({x, y, width, height}) just that region.
+        """
+        if selector and self.page.locator(selector).count():
+            return self.page.locator(selector).first.screenshot()
+        return self.page.screenshot(clip=clip)
     
 
     def selector_exists(self, selector: str) -> bool:
@@ -32,13 +78,13 @@ class PlaywrightEngine:
             return True
         except:
             return False
-    def type_slow(self, selector: str, text: str):
-        self.page.wait_for_selector(selector)
-        self.page.click(selector)
-        self.page.type(selector, text, delay=50)
-    def select(self, selector: str, value: str):
-        self.page.wait_for_selector(selector)
-        self.page.select_option(selector, value=value)
+    def type_slow(self, selector: str, text: str, delay=50, timeout=None):
+        self.page.wait_for_selector(selector, timeout=timeout)
+        self.page.click(selector, timeout=timeout)
+        self.page.type(selector, text, delay=delay, timeout=timeout)
+    def select(self, selector: str, value: str, timeout=None):
+        self.page.wait_for_selector(selector, timeout=timeout)
+        self.page.select_option(selector, value=value, timeout=timeout)
 
 
 
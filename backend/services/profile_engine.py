@@ -1,31 +1,37 @@
+from services.ledger import LedgerResult
 from services.redis_memory import redis_memory
 
-def apply_transaction(action: str, amount: int, entity=None):
-    profile = redis_memory.get_profile()
+
+def apply_transaction(action: str, amount: int, entity=None, txn_id: str = None,
+                      memory=redis_memory) -> LedgerResult:
+    """
+    Moves the money for a completed workflow through the ledger, once per
+    `txn_id`. For pay_bill, `amount` (if given) must match what is due.
+    """
+    ledger = memory.ledger
 
     if action == "buy_gold":
-        profile["balance"] -= amount
-        profile["history"].append({
-            "type": "buy_gold",
+        return ledger.debit(amount, txn_id, {
+            "type": "gold_purchase",
             "details": "Digital Gold",
-            "amount": amount
         })
 
-    elif action == "transfer_money":
-        profile["balance"] -= amount
-        profile["history"].append({
+    if action == "transfer_money":
+        return ledger.debit(amount, txn_id, {
             "type": "transfer",
             "details": f"To {entity}",
-            "amount": amount
         })
 
-    elif action == "pay_bill":
-        profile["balance"] -= amount
-        profile["bills"][entity] = 0
-        profile["history"].append({
+    if action == "pay_bill":
+        return ledger.pay_bill(entity, txn_id, {
             "type": "bill_payment",
             "details": entity,
-            "amount": amount
+        }, expected=amount)
+
+    if action == "deposit_funds":
+        return ledger.credit(amount, txn_id, {
+            "type": "deposit",
+            "details": "Deposit",
         })
 
-    redis_memory.set_profile(profile)
+    raise ValueError(f"No ledger transaction for action: {action}")
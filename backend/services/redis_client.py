@@ -1,9 +1,11 @@
-import redis
 import json
 
+from services.redis_pool import sync_client
+
 class RedisClient:
-    def __init__(self, host="localhost", port=6379):
-        self.r = redis.Redis(host=host, port=port, decode_responses=True)
+    def __init__(self, client=None):
+        # Same process-wide pool as RedisMemory, not a connection of its own
+        self.r = client or sync_client()
 
     def set_intent(self, intent: dict):
         self.r.set("intent", json.dumps(intent))
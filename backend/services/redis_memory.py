@@ -1,156 +1,480 @@
-import redis
+import os
 import json
+import re
+import uuid
 from typing import Any, List, Optional
+from pydantic import BaseModel
+from services.ledger import Ledger, PROFILE_HISTORY_LIMIT
+from services.redis_pool import BLOCKING, sync_client
+from services.screenshot_store import screenshot_store
+
+DEFAULT_SESSION = "default"
+
+# Session ids end up in key names and SCAN MATCH globs, so no ":", "*",
+# "?" or "[" that could reach another session's keys
+SESSION_ID_PATTERN = r"^[\w-]{1,64}$"
+_SESSION_ID_RE = re.compile(SESSION_ID_PATTERN)
+
+# Per-session caps on the log and narration feeds (approximate, as MAXLEN ~)
+LOG_FEED_MAXLEN = int(os.getenv("LOG_FEED_MAXLEN", "200"))
+NARRATION_FEED_MAXLEN = int(os.getenv("NARRATION_FEED_MAXLEN", "100"))
+
+# Appends to a capped feed stream and publishes the delta (with the new
+# entry id) in one round trip.
+#   KEYS: feed stream, events channel
+#   ARGV: maxlen, event name, text
+FEED_APPEND_LUA = """
+local id = redis.call("XADD", KEYS[1], "MAXLEN", "~", ARGV[1], "*", "m", ARGV[3])
+redis.call("PUBLISH", KEYS[2], cjson.encode({event = ARGV[2], data = ARGV[3], id = id}))
+return id
+"""
+
+# Feed ids are Redis stream ids; "0-0" is before every entry
+FEED_START = "0-0"
+
+
+def validate_session_id(session_id: Optional[str]) -> str:
+    """
+    Returns the session id (DEFAULT_SESSION when empty); raises
+    ValueError for anything but 1-64 letters, digits, "_" or "-".
+    """
+    session_id = session_id or DEFAULT_SESSION
+    if not _SESSION_ID_RE.fullmatch(session_id):
+        raise ValueError(f"Invalid session id: {session_id!r}")
+    return session_id
+
+
+def parse_feed_cursor(cursor: Optional[str]):
+    """
+    "<logs id>.<narration id>" -> (logs id, narration id). Missing or
+    malformed cursors start both feeds from the beginning.
+    """
+    parts = (cursor or "").split(".")
+    if len(parts) != 2 or not all(_is_stream_id(part) for part in parts):
+        return FEED_START, FEED_START
+    return parts[0], parts[1]
+
+
+def _is_stream_id(value: str) -> bool:
+    ms, _, seq = value.partition("-")
+    return ms.isdigit() and seq.isdigit()
+
+
+class StateSnapshot(BaseModel):
+    """
+    Everything the dashboard needs for one refresh.
+    """
+    paused: bool = False
+    risk: Optional[str] = None
+    logs: List[str] = []
+    narration: List[str] = []
+    screenshot: Optional[str] = None  # content hash, see GET /screenshot/{hash}
+    current_step: int = 0
+    # Pass back as /state?since=... to get only newer logs and narration
+    cursor: str = f"{FEED_START}.{FEED_START}"
+
+
+class SessionKeyspace:
+    """
+    Key names and command shapes shared by RedisMemory and
+    AsyncRedisMemory (services/async_redis_memory.py), which differ only
+    in whether a round trip is awaited.
+    """
+    session_id: str
+
+    def _key(self, name: str) -> str:
+        return f"session:{self.session_id}:{name}"
+
+    def _event_message(self, event: str, data) -> str:
+        return json.dumps({"event": event, "data": data})
+
+    def _feed_script_keys(self, feed: str) -> List[str]:
+        # KEYS for FEED_APPEND_LUA
+        return [self._key(f"feed:{feed}"), self._key("events")]
+
+    def _feed_page(self, rows, since: Optional[str]):
+        entries = [{"id": entry_id, "text": fields["m"]} for entry_id, fields in rows]
+        return entries, rows[-1][0] if rows else (since or FEED_START)
+
+    def _queue_run_id(self, pipe):
+        # Result [1] is the run id, created on first use
+        pipe.set(self._key("run_id"), uuid.uuid4().hex, nx=True)
+        pipe.get(self._key("run_id"))
+
+    def _transaction_id(self, run_id: str, step_id: int) -> str:
+        return f"{self.session_id}:{run_id}:{step_id}"
+
+    def _queue_snapshot(self, pipe, log_limit: int, since: Optional[str]):
+        """
+        Queues the snapshot reads on `pipe`; returns the feed cursors
+        _build_snapshot needs.
+        """
+        log_since, narration_since = parse_feed_cursor(since)
+        pipe.get(self._key("is_paused"))
+        pipe.get(self._key("risk_flag"))
+        pipe.xrevrange(self._key("feed:logs"), "+", f"({log_since}", count=log_limit)
+        pipe.xrange(self._key("feed:narration"), f"({narration_since}", "+")
+        pipe.get(self._key("latest_screenshot"))
+        pipe.get(self._key("current_step"))
+        return log_since, narration_since
+
+    @staticmethod
+    def _build_snapshot(results, log_since: str, narration_since: str) -> StateSnapshot:
+        paused, risk, logs, narration, screenshot, step = results
+
+        log_cursor = logs[0][0] if logs else log_since
+        narration_cursor = narration[-1][0] if narration else narration_since
+
+        return StateSnapshot(
+            paused=paused == "1",
+            risk=risk,
+            logs=[fields["m"] for _, fields in logs],
+            narration=[fields["m"] for _, fields in narration],
+            screenshot=screenshot,
+            current_step=int(step) if step else 0,
+            cursor=f"{log_cursor}.{narration_cursor}",
+        )
+
+    @staticmethod
+    def _parse_temp(val):
+        if val is None:
+            return None
+        try:
+            return int(val)
+        except ValueError:
+            return val
+
 
-class RedisMemory:
-    def __init__(self, host="localhost", port=6379):
-        self.r = redis.Redis(host=host, port=port, decode_responses=True)
+class RedisMemory(SessionKeyspace):
+    """
+    Workflow state store.
+
+    Everything that belongs to a single workflow run (intent, plan, step
+    pointer, pause/risk flags, screenshot, logs, narration, temp values)
+    lives under a `session:<id>:` prefix so many workflows can share one
+    Redis without stomping each other. The bank profile is account-level
+    and stays global, in the ledger (see services/ledger.py).
+    """
+
+    def __init__(self, session_id=DEFAULT_SESSION, client=None, screenshots=None, blocking_client=None):
+        # Shared process-wide pools unless a client is injected. Pub/sub
+        # and BLPOP use the BLOCKING pool (see services/redis_pool.py)
+        self.r = client or sync_client()
+        if blocking_client is None and client is None:
+            blocking_client = sync_client(kind=BLOCKING)
+        self._blocking = blocking_client
+        self.session_id = session_id
+        self.screenshots = screenshots or screenshot_store
+        self.ledger = Ledger(self)
+        self._feed_script = None
+
+    @property
+    def r(self):
+        return self._client
+
+    @r.setter
+    def r(self, client):
+        # Swapping the client (tests, benchmarks) moves the blocking
+        # commands along with it
+        self._client = client
+        self._blocking = None
+
+    @property
+    def blocking_r(self):
+        """
+        Client for commands that hold their connection while they wait.
+        """
+        return self._blocking or self._client
+
+    # -------------------------
+    # SESSION SCOPING
+    # -------------------------
+    def for_session(self, session_id: Optional[str]) -> "RedisMemory":
+        """
+        Returns a view bound to `session_id` that shares this connection.
+        """
+        return RedisMemory(
+            session_id=validate_session_id(session_id),
+            client=self.r,
+            screenshots=self.screenshots,
+            blocking_client=self._blocking,
+        )
+
+    # -------------------------
+    # CHANGE EVENTS (dashboard stream)
+    # -------------------------
+    def _write_and_publish(self, event: str, data, write):
+        """
+        Applies `write` to a pipeline and publishes the delta on the
+        session's event channel in the same round trip.
+        """
+        pipe = self.r.pipeline(transaction=False)
+        write(pipe)
+        pipe.publish(self._key("events"), self._event_message(event, data))
+        pipe.execute()
+
+    def subscribe_events(self):
+        """
+        Returns a pub/sub handle subscribed to this session's deltas.
+        """
+        pubsub = self.blocking_r.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self._key("events"))
+        return pubsub
+
+    def clear_session(self):
+        """
+        Drops every key of the bound session.
+        """
+        keys = list(self.r.scan_iter(match=self._key("*"), count=500))
+        if keys:
+            self.r.delete(*keys)
 
     # -------------------------
     # INTENT
     # -------------------------
     def set_intent(self, intent: dict):
-        self.r.set("intent", json.dumps(intent))
+        self.r.set(self._key("intent"), json.dumps(intent))
 
     def get_intent(self) -> Optional[dict]:
-        data = self.r.get("intent")
+        data = self.r.get(self._key("intent"))
         return json.loads(data) if data else None
 
     # -------------------------
     # PLAN
     # -------------------------
     def set_plan(self, plan: List[dict]):
-        self.r.set("plan", json.dumps(plan))
+        self.set_plan_json(json.dumps(plan))
+
+    def set_plan_json(self, plan_json: str):
+        """
+        Stores an already-serialized plan (see planner_agent.CompiledPlan).
+        A new plan is a new run, so it gets new ledger transaction ids.
+        """
+        pipe = self.r.pipeline(transaction=True)
+        pipe.set(self._key("plan"), plan_json)
+        pipe.delete(self._key("run_id"))
+        pipe.execute()
 
     def get_plan(self) -> Optional[List[dict]]:
-        data = self.r.get("plan")
+        data = self.r.get(self._key("plan"))
         return json.loads(data) if data else None
 
     # -------------------------
     # STEP TRACKING
     # -------------------------
     def set_current_step(self, step: int):
-        self.r.set("current_step", step)
+        self.r.set(self._key("current_step"), step)
 
     def get_current_step(self) -> int:
-        val = self.r.get("current_step")
+        val = self.r.get(self._key("current_step"))
         return int(val) if val else 0
 
     def increment_step(self):
-        self.r.incr("current_step")
+        self.r.incr(self._key("current_step"))
 
     # -------------------------
     # PAUSE STATE
     # -------------------------
     def set_paused(self, paused: bool):
-        self.r.set("is_paused", "1" if paused else "0")
+        self._write_and_publish(
+            "paused", paused,
+            lambda pipe: pipe.set(self._key("is_paused"), "1" if paused else "0"),
+        )
 
     def is_paused(self) -> bool:
-        val = self.r.get("is_paused")
+        val = self.r.get(self._key("is_paused"))
         return val == "1"
 
+    # -------------------------
+    # CONTROL SIGNALS (approve / reject / cancel)
+    # -------------------------
+    def send_control(self, command: str):
+        """
+        Wakes a paused executor. The flags stay the source of truth; the
+        control list only tells the executor to re-read them.
+        """
+        self.r.rpush(self._key("control"), command)
+
+    def wait_control(self, timeout: int) -> Optional[str]:
+        """
+        Blocks (BLPOP) until a control signal arrives or `timeout` seconds
+        pass. Costs no Redis traffic while waiting.
+        """
+        item = self.blocking_r.blpop([self._key("control")], timeout=timeout)
+        return item[1] if item else None
+
+    def clear_control(self):
+        self.r.delete(self._key("control"))
+
     # -------------------------
     # SAFETY FLAGS
     # -------------------------
     def set_risk(self, reason: str):
-        self.r.set("risk_flag", reason)
+        self._write_and_publish(
+            "risk", reason,
+            lambda pipe: pipe.set(self._key("risk_flag"), reason),
+        )
 
     def get_risk(self) -> Optional[str]:
-        return self.r.get("risk_flag")
+        return self.r.get(self._key("risk_flag"))
 
     def clear_risk(self):
-        self.r.delete("risk_flag")
+        self._write_and_publish(
+            "risk", None,
+            lambda pipe: pipe.delete(self._key("risk_flag")),
+        )
 
     # -------------------------
     # SCREENSHOT STORAGE
     # -------------------------
-    def set_screenshot(self, img_b64: str):
-        self.r.set("latest_screenshot", img_b64)
+    def set_screenshot(self, png: bytes) -> str:
+        """
+        Stores the raw PNG in the screenshot store and points the session
+        at its content hash. Returns the hash.
+        """
+        digest = self.screenshots.put(png)
+        self._write_and_publish(
+            "screenshot", digest,
+            lambda pipe: pipe.set(self._key("latest_screenshot"), digest),
+        )
+        return digest
+
+    def clear_screenshot(self):
+        self._write_and_publish(
+            "screenshot", None,
+            lambda pipe: pipe.delete(self._key("latest_screenshot")),
+        )
+
+    def restore_screenshot(self, digest: str):
+        """
+        Points the session back at `digest`, unless a newer screenshot
+        was stored after it was cleared.
+        """
+        self._write_and_publish(
+            "screenshot", digest,
+            lambda pipe: pipe.set(self._key("latest_screenshot"), digest, nx=True),
+        )
 
     def get_screenshot(self) -> Optional[str]:
-        return self.r.get("latest_screenshot")
+        """
+        Returns the content hash of the latest screenshot, if any.
+        """
+        return self.r.get(self._key("latest_screenshot"))
 
     # -------------------------
-    # LOGGING
+    # LOG / NARRATION FEEDS (capped streams)
     # -------------------------
-    def push_log(self, text: str):
-        self.r.lpush("logs", text)
+    def _append_feed(self, feed: str, event: str, text: str, maxlen: int) -> str:
+        if self._feed_script is None:
+            self._feed_script = self.r.register_script(FEED_APPEND_LUA)
+        return self._feed_script(
+            keys=self._feed_script_keys(feed),
+            args=[maxlen, event, text],
+            client=self.r,
+        )
+
+    def read_feed(self, feed: str, since: Optional[str] = None, limit: int = 100):
+        """
+        Oldest-first entries of a feed ("logs" or "narration") newer than
+        the id `since`. Returns ([{"id", "text"}], cursor); the cursor is
+        `since` again when there is nothing new.
+        """
+        rows = self.r.xrange(self._key(f"feed:{feed}"), f"({since or FEED_START}", "+", count=limit)
+        return self._feed_page(rows, since)
+
+    def push_log(self, text: str) -> str:
+        return self._append_feed("logs", "log", text, LOG_FEED_MAXLEN)
 
     def get_logs(self, limit=50) -> List[str]:
-        return self.r.lrange("logs", 0, limit)
+        """
+        Latest `limit` log lines, newest first.
+        """
+        rows = self.r.xrevrange(self._key("feed:logs"), count=limit)
+        return [fields["m"] for _, fields in rows]
 
     # -------------------------
     # EXECUTOR STATE
     # -------------------------
     def save_executor_state(self, data: dict):
-        self.r.set("executor_state", json.dumps(data))
+        self.r.set(self._key("executor_state"), json.dumps(data))
 
     def load_executor_state(self) -> Optional[dict]:
-        data = self.r.get("executor_state")
+        data = self.r.get(self._key("executor_state"))
         return json.loads(data) if data else None
 
     def set_user_approved(self, val: bool):
-        self.r.set("user_approved", "1" if val else "0")
+        self.r.set(self._key("user_approved"), "1" if val else "0")
 
     def is_user_approved(self) -> bool:
-        return self.r.get("user_approved") == "1"
+        return self.r.get(self._key("user_approved")) == "1"
 
     def clear_user_approved(self):
-        self.r.delete("user_approved")
+        self.r.delete(self._key("user_approved"))
 
-    def push_narration(self, text: str):
-        self.r.rpush("narration", text)
+    def push_narration(self, text: str) -> str:
+        return self._append_feed("narration", "narration", text, NARRATION_FEED_MAXLEN)
 
     def get_narration(self):
-        return self.r.lrange("narration", 0, -1)
+        rows = self.r.xrange(self._key("feed:narration"))
+        return [fields["m"] for _, fields in rows]
 
     def clear_narration(self):
-        self.r.delete("narration")
-
-    def get_profile(self):
-        data = self.r.get("profile")
-        return json.loads(data) if data else {
-            "balance": 100000,
-            "bills": {
-                "tata": 950,
-                "adani": 1200
-            },
-            "history": []
-        }
+        self.r.delete(self._key("feed:narration"))
+
+    # -------------------------
+    # PROFILE (backed by the ledger)
+    # -------------------------
+    def get_profile(self, history_limit: int = PROFILE_HISTORY_LIMIT):
+        """
+        Balance, bills and the latest `history_limit` history entries.
+        """
+        return self.ledger.profile(history_limit)
 
     def set_profile(self, profile: dict):
-        self.r.set("profile", json.dumps(profile))
+        """
+        Seeds balance, bills and history. Money movement goes through
+        self.ledger, never through a read-modify-write of this.
+        """
+        self.ledger.reset(profile)
 
     def log_transaction(self, entry: dict):
-        profile = self.get_profile()
-        profile["history"].append(entry)
-        self.set_profile(profile)
+        self.ledger.append_history(entry)
+
+    def transaction_id(self, step_id: int) -> str:
+        """
+        Stable ledger transaction id for a step of this session's run. A
+        resumed or retried step gets the same id; a new plan gets new ids.
+        """
+        pipe = self.r.pipeline(transaction=False)
+        self._queue_run_id(pipe)
+        return self._transaction_id(pipe.execute()[1], step_id)
+
+    # ---------------------------
+    # DASHBOARD SNAPSHOT
+    # ---------------------------
+    def snapshot(self, log_limit=50, since: Optional[str] = None) -> StateSnapshot:
+        """
+        Reads the whole dashboard state in a single MULTI/EXEC round trip
+        instead of one round trip per getter.
+
+        With `since` (a previous snapshot's cursor) logs and narration only
+        hold entries added after it, so an idle poll carries no feed data.
+        """
+        pipe = self.r.pipeline(transaction=True)
+        cursors = self._queue_snapshot(pipe, log_limit, since)
+        return self._build_snapshot(pipe.execute(), *cursors)
 
     # ---------------------------
     # TEMP VALUES (for workflows)
     # ---------------------------
     def set_temp(self, key: str, value):
-        self.r.set(f"temp:{key}", value)
+        self.r.set(self._key(f"temp:{key}"), value)
 
     def get_temp(self, key: str):
-        val = self.r.get(f"temp:{key}")
-        if val is None:
-            return None
-        try:
-            return int(val)
-        except ValueError:
-            return val
+        return self._parse_temp(self.r.get(self._key(f"temp:{key}")))
 
     def clear_bill(self, biller: str):
-        profile = self.get_profile()
-        if not profile:
-            return
-        profile["bills"][biller] = 0
-        self.set_profile(profile)
-
-
-
-
+        self.ledger.clear_bill(biller)
 
 
 redis_memory = RedisMemory()
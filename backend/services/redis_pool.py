@@ -0,0 +1,113 @@
+"""
+One Redis connection pool per process, shared by every store.
+
+RedisMemory, RedisClient, ScreenshotStore and the async stores all get
+their clients here instead of opening their own connections. Text and
+binary clients need separate pools (decode_responses is a per-connection
+setting), and redis.asyncio connections belong to the event loop that
+opened them, so async pools are kept per loop.
+
+Pub/sub subscriptions (/state/stream) and BLPOP (wait_control) hold a
+connection for as long as they wait, so they get their own BLOCKING
+pools: a burst of dashboards can't starve the commands every request
+needs.
+"""
+import asyncio
+import os
+import threading
+import weakref
+
+import redis
+import redis.asyncio as aioredis
+
+from services.metrics import metrics
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Per pool
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "128"))
+# Per BLOCKING pool: one connection per open /state/stream and per
+# executor waiting at a pause
+REDIS_BLOCKING_MAX_CONNECTIONS = int(os.getenv("REDIS_BLOCKING_MAX_CONNECTIONS", "256"))
+# Must stay above the longest blocking command (BLPOP in wait_control)
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "60"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "2"))
+# How long a caller waits for a free connection when the pool is exhausted
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+
+COMMANDS = "commands"
+BLOCKING = "blocking"
+
+_lock = threading.Lock()
+# (kind, decode_responses) -> client
+_sync_clients = {}
+# loop -> {(kind, decode_responses): client}
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _pool_kwargs(kind: str, decode_responses: bool) -> dict:
+    return dict(
+        max_connections=REDIS_BLOCKING_MAX_CONNECTIONS if kind == BLOCKING else REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        decode_responses=decode_responses,
+    )
+
+
+def sync_client(decode_responses: bool = True, kind: str = COMMANDS) -> redis.Redis:
+    """
+    The process-wide client for `decode_responses` and `kind` (COMMANDS,
+    or BLOCKING for pub/sub and BLPOP). Thread-safe: each command borrows
+    a connection from the shared pool.
+    """
+    with _lock:
+        client = _sync_clients.get((kind, decode_responses))
+        if client is None:
+            # Blocking pool: callers wait for a free connection instead of
+            # failing as soon as all max_connections are in use
+            pool = redis.BlockingConnectionPool.from_url(REDIS_URL, **_pool_kwargs(kind, decode_responses))
+            client = _sync_clients[(kind, decode_responses)] = redis.Redis(connection_pool=pool)
+        return client
+
+
+def async_client(decode_responses: bool = True, kind: str = COMMANDS) -> aioredis.Redis:
+    """
+    The redis.asyncio client for the running event loop. Must be called
+    from a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get((kind, decode_responses))
+        if client is None:
+            pool = aioredis.BlockingConnectionPool.from_url(REDIS_URL, **_pool_kwargs(kind, decode_responses))
+            client = clients[(kind, decode_responses)] = aioredis.Redis(connection_pool=pool)
+        return client
+
+
+def pool_stats() -> dict:
+    with _lock:
+        sync = {
+            f"{kind}_{'text' if decode else 'binary'}": {
+                "created": len(client.connection_pool._connections),
+                # BlockingConnectionPool pads its queue with None placeholders
+                "idle": sum(1 for conn in list(client.connection_pool.pool.queue) if conn),
+            }
+            for (kind, decode), client in _sync_clients.items()
+        }
+        async_in_use = {COMMANDS: 0, BLOCKING: 0}
+        for clients in list(_async_clients.values()):
+            for (kind, _), client in clients.items():
+                async_in_use[kind] += len(client.connection_pool._in_use_connections)
+        return {
+            "max_connections": REDIS_MAX_CONNECTIONS,
+            "blocking_max_connections": REDIS_BLOCKING_MAX_CONNECTIONS,
+            "sync": sync,
+            "async_loops": len(_async_clients),
+            "async_in_use": async_in_use,
+        }
+
+
+metrics.register_collector("redis_pool", pool_stats)
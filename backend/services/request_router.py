@@ -0,0 +1,106 @@
+import mimetypes
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+ROUTE_REQUESTS = os.getenv("BLOCK_RESOURCES", "1") == "1"
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+ASSETS_DIR = PROJECT_ROOT / "dummy_bank" / "assets"
+ASSETS_URL_PREFIX = "/dummy_bank/assets/"
+
+# Nothing the executor or the vision check needs
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "hotjar.com",
+    "segment.io",
+)
+
+BLOCK = "block"
+FULFILL = "fulfill"
+CONTINUE = "continue"
+
+
+class AssetCache:
+    """
+    dummy_bank/assets loaded into memory once, served through page.route
+    without touching the network or the web server.
+    """
+
+    def __init__(self, root: Path = ASSETS_DIR):
+        self.root = root
+        self._files: Optional[Dict[str, Tuple[bytes, str]]] = None
+
+    def _load(self):
+        files = {}
+        if self.root.is_dir():
+            for path in self.root.rglob("*"):
+                if path.is_file():
+                    rel = path.relative_to(self.root).as_posix()
+                    content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+                    files[rel] = (path.read_bytes(), content_type)
+        self._files = files
+
+    def get(self, rel_path: str) -> Optional[Tuple[bytes, str]]:
+        if self._files is None:
+            self._load()
+        return self._files.get(rel_path)
+
+
+asset_cache = AssetCache()
+
+
+def decide(url: str, resource_type: str):
+    """
+    Returns (decision, asset) for a request; asset is (body, content_type)
+    when the decision is FULFILL.
+    """
+    parsed = urlparse(url)
+
+    if any(parsed.hostname and parsed.hostname.endswith(host) for host in BLOCKED_HOSTS):
+        return BLOCK, None
+
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return BLOCK, None
+
+    if ASSETS_URL_PREFIX in parsed.path:
+        rel = parsed.path.split(ASSETS_URL_PREFIX, 1)[1]
+        asset = asset_cache.get(rel)
+        if asset is not None:
+            return FULFILL, asset
+
+    return CONTINUE, None
+
+
+def handle_route(route):
+    decision, asset = decide(route.request.url, route.request.resource_type)
+    if decision == BLOCK:
+        route.abort()
+    elif decision == FULFILL:
+        body, content_type = asset
+        route.fulfill(status=200, body=body, content_type=content_type)
+    else:
+        route.continue_()
+
+
+async def handle_route_async(route):
+    decision, asset = decide(route.request.url, route.request.resource_type)
+    if decision == BLOCK:
+        await route.abort()
+    elif decision == FULFILL:
+        body, content_type = asset
+        await route.fulfill(status=200, body=body, content_type=content_type)
+    else:
+        await route.continue_()
+
+
+def install(context):
+    context.route("**/*", handle_route)
+
+
+async def install_async(context):
+    await context.route("**/*", handle_route_async)
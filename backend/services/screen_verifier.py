@@ -0,0 +1,245 @@
+import re
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from services.image_prep import VISION_CROP_SELECTOR
+from services.metrics import metrics
+
+# What each dummy_bank confirmation page shows, and where
+CONFIRM_SCREENS = {
+    "gold_confirm": {"amount": "#amt", "entity": None, "entity_text": "Digital Gold"},
+    "pay_bill_confirm": {"amount": "#amt", "entity": "#biller", "entity_text": None},
+    "transfer_confirm": {"amount": "#amt", "entity": "#recipient", "entity_text": None},
+}
+
+SCREEN_FOR_ACTION = {
+    "buy_gold": "gold_confirm",
+    "pay_bill": "pay_bill_confirm",
+    "transfer_money": "transfer_confirm",
+}
+
+# Minimum pixel std-dev inside the amount's box for it to count as drawn
+MIN_RENDERED_STDDEV = 8.0
+
+# One round trip: everything the DOM and visibility tiers need
+_READ_SCREEN_JS = """
+(spec) => {
+    const pick = (sel) => sel ? document.querySelector(sel) : null;
+    const text = (el) => el ? el.innerText.trim() : null;
+    const amountEl = pick(spec.amount);
+    let box = null, visible = false, onTop = false;
+    if (amountEl) {
+        const r = amountEl.getBoundingClientRect();
+        const st = getComputedStyle(amountEl);
+        box = {x: r.x, y: r.y, width: r.width, height: r.height};
+        visible = r.width > 0 && r.height > 0 && st.visibility !== "hidden"
+            && st.display !== "none" && parseFloat(st.opacity) > 0
+            && r.bottom > 0 && r.top < window.innerHeight;
+        const hit = visible ? document.elementFromPoint(r.x + r.width / 2, r.y + r.height / 2) : null;
+        onTop = !!hit && (hit === amountEl || amountEl.contains(hit));
+    }
+    return {
+        path: location.pathname,
+        amount: text(amountEl),
+        entity: text(pick(spec.entity)),
+        body: document.body ? document.body.innerText : "",
+        amount_box: box,
+        amount_visible: visible,
+        amount_on_top: onTop,
+        container_box: (() => {
+            const c = document.querySelector(spec.container);
+            if (!c) return null;
+            const r = c.getBoundingClientRect();
+            return {x: r.x, y: r.y, width: r.width, height: r.height};
+        })(),
+    };
+}
+"""
+
+
+def _parse_amount(text: Optional[str]) -> Optional[int]:
+    if not text:
+        return None
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", text)
+    if not match:
+        return None
+    return int(float(match.group(0).replace(",", "")))
+
+
+def judge_dom(facts: dict, screen: str, amount: int, entity: str) -> Optional[dict]:
+    """
+    Tier 1: deterministic DOM check. Returns a verdict, or None when the
+    page doesn't expose what we need (inconclusive).
+    """
+    spec = CONFIRM_SCREENS.get(screen)
+    if spec is None or facts is None:
+        return None
+
+    shown_amount = _parse_amount(facts.get("amount"))
+    if shown_amount is None:
+        return None
+
+    if spec["entity"]:
+        shown_entity = facts.get("entity")
+        if not shown_entity:
+            return None
+        entity_match = shown_entity.strip().lower() == str(entity).strip().lower()
+    else:
+        entity_match = spec["entity_text"].lower() in facts.get("body", "").lower()
+
+    return {
+        "screen_valid": facts.get("path", "").endswith(f"/{screen}.html"),
+        "amount_match": shown_amount == int(amount),
+        "entity_match": entity_match,
+        "notes": f"DOM: amount={shown_amount}, entity={facts.get('entity') or spec['entity_text']}",
+    }
+
+
+def judge_visibility(facts: dict, screenshot: bytes) -> bool:
+    """
+    Tier 2: is the amount element actually showing? It must be visible,
+    topmost at its centre (no overlay) and its box in the screenshot must
+    contain drawn pixels rather than a flat fill.
+
+    The drawn amount is never read or compared with the expected one (no
+    OCR): only judge_dom compares values. This just catches a correct
+    DOM hidden behind something else.
+    """
+    box = facts.get("amount_box") if facts else None
+    if not box or not facts.get("amount_visible") or not facts.get("amount_on_top"):
+        return False
+
+    img = cv2.imdecode(np.frombuffer(screenshot, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        return False
+
+    x0, y0 = max(0, int(box["x"])), max(0, int(box["y"]))
+    x1 = min(img.shape[1], int(box["x"] + box["width"]) + 1)
+    y1 = min(img.shape[0], int(box["y"] + box["height"]) + 1)
+    if x1 <= x0 or y1 <= y0:
+        return False
+
+    return float(img[y0:y1, x0:x1].std()) >= MIN_RENDERED_STDDEV
+
+
+def verifier_stats() -> dict:
+    total = metrics.counter("verifier.requests")
+    stats = {
+        tier: {
+            "decided": metrics.counter(f"verifier.decided.{tier}"),
+            "hit_rate": metrics.counter(f"verifier.decided.{tier}") / total if total else 0.0,
+        }
+        for tier in ("dom", "vlm")
+    }
+    stats["dom_inconclusive"] = metrics.counter("verifier.dom_inconclusive")
+    stats["visibility_failures"] = metrics.counter("verifier.visibility_failures")
+    return stats
+
+
+metrics.register_collector("verifier", verifier_stats)
+
+
+class TieredVerifier:
+    """
+    Confirmation-screen verification, cheapest tier first:
+
+    1. DOM        - read amount/entity/page straight from the confirm page
+    2. visibility - check the amount element is on screen and drawn
+                    (its value is not re-read from the pixels)
+    3. VLM        - VisionEngine (remote Gemini), only when 1 is
+                    inconclusive or 2 fails; bounded by VisionClient
+
+    A DOM mismatch on a visible amount fails closed without calling the
+    VLM; so does any VLM error.
+    """
+
+    def __init__(self, vision):
+        self.vision = vision
+
+    def verify(self, browser, expected_screen, expected_amount, expected_entity) -> dict:
+        metrics.incr("verifier.requests")
+        spec = CONFIRM_SCREENS.get(expected_screen, {})
+
+        start = time.perf_counter()
+        facts = browser.page.evaluate(_READ_SCREEN_JS, self._spec(spec)) if spec else None
+        metrics.observe("verifier.dom", (time.perf_counter() - start) * 1000)
+
+        if facts is None:
+            # Unknown screen: nothing for the visibility check, so capture only
+            # the container for the VLM
+            screenshot = browser.screenshot(selector=VISION_CROP_SELECTOR)
+        else:
+            screenshot = browser.screenshot()
+            verdict = self._cheap_tiers(facts, screenshot, expected_screen, expected_amount, expected_entity)
+            if verdict is not None:
+                return verdict
+
+        start = time.perf_counter()
+        verdict = self.vision.verify_confirmation_screen(
+            screenshot_bytes=screenshot,
+            expected_amount=expected_amount,
+            expected_entity=expected_entity,
+            expected_screen=expected_screen,
+            crop_box=facts.get("container_box") if facts else None,
+        )
+        return self._vlm_verdict(verdict, start)
+
+    async def verify_async(self, browser, expected_screen, expected_amount, expected_entity) -> dict:
+        metrics.incr("verifier.requests")
+        spec = CONFIRM_SCREENS.get(expected_screen, {})
+
+        start = time.perf_counter()
+        facts = await browser.page.evaluate(_READ_SCREEN_JS, self._spec(spec)) if spec else None
+        metrics.observe("verifier.dom", (time.perf_counter() - start) * 1000)
+
+        if facts is None:
+            screenshot = await browser.screenshot(selector=VISION_CROP_SELECTOR)
+        else:
+            screenshot = await browser.screenshot()
+            verdict = self._cheap_tiers(facts, screenshot, expected_screen, expected_amount, expected_entity)
+            if verdict is not None:
+                return verdict
+
+        start = time.perf_counter()
+        verdict = await self.vision.verify_confirmation_screen_async(
+            screenshot_bytes=screenshot,
+            expected_amount=expected_amount,
+            expected_entity=expected_entity,
+            expected_screen=expected_screen,
+            crop_box=facts.get("container_box") if facts else None,
+        )
+        return self._vlm_verdict(verdict, start)
+
+    @staticmethod
+    def _spec(spec: dict) -> dict:
+        return {**spec, "container": VISION_CROP_SELECTOR}
+
+    # ------------------------------------
+    # Tier decisions
+    # ------------------------------------
+    def _cheap_tiers(self, facts, screenshot, screen, amount, entity) -> Optional[dict]:
+        dom = judge_dom(facts, screen, amount, entity)
+        if dom is None:
+            metrics.incr("verifier.dom_inconclusive")
+            print("🟨 [Verifier] DOM tier inconclusive, escalating to VLM")
+            return None
+
+        start = time.perf_counter()
+        visible = judge_visibility(facts, screenshot)
+        metrics.observe("verifier.visibility", (time.perf_counter() - start) * 1000)
+        if not visible:
+            metrics.incr("verifier.visibility_failures")
+            print("🟨 [Verifier] Amount not visibly drawn, escalating to VLM")
+            return None
+
+        metrics.incr("verifier.decided.dom")
+        print(f"🟩 [Verifier] Decided by DOM tier: {dom}")
+        return {**dom, "tier": "dom"}
+
+    def _vlm_verdict(self, verdict: dict, start: float) -> dict:
+        metrics.observe("verifier.vlm", (time.perf_counter() - start) * 1000)
+        metrics.incr("verifier.decided.vlm")
+        return {**verdict, "tier": "vlm"}
@@ -0,0 +1,113 @@
+import hashlib
+import re
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from services.redis_pool import async_client, sync_client
+
+SCREENSHOT_TTL_SECONDS = 60 * 60
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ScreenshotStore:
+    """
+    Content-addressed screenshot storage.
+
+    Raw PNG bytes are kept on a binary-safe Redis connection under
+    `screenshot:<sha256>`, so nothing is base64-encoded and an unchanged
+    image keeps the same key (and the same HTTP ETag).
+    """
+
+    def __init__(self, client=None, ttl=SCREENSHOT_TTL_SECONDS):
+        # decode_responses must stay off: values are raw image bytes
+        self.r = client or sync_client(decode_responses=False)
+        self.ttl = ttl
+
+    def _key(self, digest: str, max_dim: Optional[int] = None) -> str:
+        if max_dim:
+            return f"screenshot:{digest}:thumb:{max_dim}"
+        return f"screenshot:{digest}"
+
+    def put(self, png: bytes) -> str:
+        digest = hashlib.sha256(png).hexdigest()
+        # Re-putting the same image only refreshes its TTL
+        self.r.set(self._key(digest), png, ex=self.ttl)
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        if not DIGEST_RE.match(digest):
+            return None
+        return self.r.get(self._key(digest))
+
+    def thumbnail(self, digest: str, max_dim: int) -> Optional[bytes]:
+        """
+        Returns a PNG downscaled so its longest side is at most `max_dim`.
+        Thumbnails are cached next to the original with the same TTL.
+        """
+        if not DIGEST_RE.match(digest):
+            return None
+
+        cached = self.r.get(self._key(digest, max_dim))
+        if cached is not None:
+            return cached
+
+        original = self.r.get(self._key(digest))
+        if original is None:
+            return None
+
+        img = cv2.imdecode(np.frombuffer(original, np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            return None
+
+        h, w = img.shape[:2]
+        scale = max_dim / max(h, w)
+        if scale < 1:
+            img = cv2.resize(
+                img, (max(1, int(w * scale)), max(1, int(h * scale))),
+                interpolation=cv2.INTER_AREA,
+            )
+
+        ok, buf = cv2.imencode(".png", img)
+        if not ok:
+            return None
+
+        thumb = buf.tobytes()
+        self.r.set(self._key(digest, max_dim), thumb, ex=self.ttl)
+        return thumb
+
+
+class AsyncScreenshotStore:
+    """
+    put/get of ScreenshotStore on redis.asyncio, for AsyncRedisMemory.
+    Same keys and TTL, so either store reads what the other wrote.
+    """
+
+    def __init__(self, client=None, ttl=SCREENSHOT_TTL_SECONDS):
+        self._client = client
+        self.ttl = ttl
+
+    @property
+    def r(self):
+        return self._client or async_client(decode_responses=False)
+
+    @r.setter
+    def r(self, client):
+        self._client = client
+
+    _key = ScreenshotStore._key
+
+    async def put(self, png: bytes) -> str:
+        digest = hashlib.sha256(png).hexdigest()
+        await self.r.set(self._key(digest), png, ex=self.ttl)
+        return digest
+
+    async def get(self, digest: str) -> Optional[bytes]:
+        if not DIGEST_RE.match(digest):
+            return None
+        return await self.r.get(self._key(digest))
+
+
+screenshot_store = ScreenshotStore()
+async_screenshot_store = AsyncScreenshotStore()
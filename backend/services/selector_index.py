@@ -0,0 +1,310 @@
+"""
+Offline selector index of the dummy_bank pages.
+
+Crawls dummy_bank/*.html once (no browser) and records every element with
+the selectors it answers to, so the executor knows before touching the
+page whether a target is there:
+
+    python -m services.selector_index            # summary + selector_map check
+    python -m services.selector_index --out selector_index.json
+"""
+import argparse
+import json
+import os
+import re
+from dataclasses import asdict, dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+DUMMY_BANK_DIR = os.getenv(
+    "DUMMY_BANK_DIR", str(Path(__file__).resolve().parents[2] / "dummy_bank")
+)
+# Prebuilt index (JSON from --out); crawled from DUMMY_BANK_DIR when unset
+SELECTOR_INDEX_PATH = os.getenv("SELECTOR_INDEX_PATH")
+# Refuse to start when selector_map doesn't match the pages
+SELECTOR_INDEX_STRICT = os.getenv("SELECTOR_INDEX_STRICT", "0") == "1"
+
+# Elements whose visible text is kept for a text selector
+_TEXT_TAGS = ("a", "button", "label", "option")
+
+_NAVIGATION_RE = re.compile(r"location(?:\.href)?\s*=\s*['\"]([\w\-]+)\.html")
+_BOUND_HANDLER_RE = re.compile(r"getElementById\(\s*['\"]([\w\-]+)['\"]\s*\)\.onclick")
+
+# tag#id.class[attr=value] with no combinators or pseudo classes
+_COMPOUND_RE = re.compile(r"^([a-zA-Z][\w-]*)?((?:[#.][\w-]+|\[[^\]]+\])*)$")
+_PART_RE = re.compile(r"([#.])([\w-]+)|\[\s*([\w-]+)\s*(?:=\s*['\"]?([^'\"\]]*)['\"]?)?\s*\]")
+
+
+@dataclass(frozen=True)
+class IndexedElement:
+    tag: str
+    id: Optional[str]
+    classes: Tuple[str, ...]
+    attrs: Dict[str, str]
+    text: str
+    # Clicking leaves the page (inline handler, link or scripted redirect)
+    navigates: bool
+    # Destination when it is written in the markup
+    navigates_to: Optional[str]
+
+    @property
+    def selector(self) -> str:
+        """
+        The most stable selector for this element: its id, else its text.
+        """
+        if self.id:
+            return f"#{self.id}"
+        if self.text:
+            return f'{self.tag}:has-text("{self.text}")'
+        return self.tag
+
+    def matches(self, parts) -> bool:
+        tag, ids, classes, attrs = parts
+        if tag and tag.lower() != self.tag:
+            return False
+        if any(i != self.id for i in ids):
+            return False
+        if any(c not in self.classes for c in classes):
+            return False
+        for name, value in attrs:
+            if name not in self.attrs or (value is not None and self.attrs[name] != value):
+                return False
+        return True
+
+
+def parse_selector(selector: str):
+    """
+    Splits a compound CSS selector into (tag, ids, classes, attrs).
+    Returns None for anything the index can't evaluate offline.
+    """
+    match = _COMPOUND_RE.match(selector.strip())
+    if not match or not selector.strip():
+        return None
+    ids, classes, attrs = [], [], []
+    for kind, name, attr, value in _PART_RE.findall(match.group(2)):
+        if kind == "#":
+            ids.append(name)
+        elif kind == ".":
+            classes.append(name)
+        else:
+            attrs.append((attr, value if value != "" else None))
+    return match.group(1), ids, classes, attrs
+
+
+def page_from_url(url: str) -> Optional[str]:
+    """
+    ".../dummy_bank/gold.html?amount=5" -> "gold"
+    """
+    name = os.path.basename(urlparse(url or "").path)
+    return name[:-len(".html")] if name.endswith(".html") else None
+
+
+class _PageParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.raw = []
+        self.scripts = []
+        self._text_stack = []
+        self._in_script = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: v or "" for k, v in attrs}
+        if tag == "script":
+            self._in_script = True
+            self.scripts.append("")
+            return
+        element = {"tag": tag, "attrs": attrs, "text": []}
+        self.raw.append(element)
+        if tag in _TEXT_TAGS:
+            self._text_stack.append(element)
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self._in_script = False
+        elif self._text_stack and self._text_stack[-1]["tag"] == tag:
+            self._text_stack.pop()
+
+    def handle_data(self, data):
+        if self._in_script:
+            self.scripts[-1] += data
+        elif self._text_stack:
+            self._text_stack[-1]["text"].append(data)
+
+
+def crawl_page(html: str) -> List[IndexedElement]:
+    parser = _PageParser()
+    parser.feed(html)
+
+    script = "\n".join(parser.scripts)
+    scripted_navigation = bool(_NAVIGATION_RE.search(script))
+    bound_handlers = set(_BOUND_HANDLER_RE.findall(script))
+
+    elements = []
+    for raw in parser.raw:
+        attrs = raw["attrs"]
+        element_id = attrs.get("id") or None
+        onclick = attrs.get("onclick", "")
+
+        target = _NAVIGATION_RE.search(onclick)
+        href = attrs.get("href", "") if raw["tag"] == "a" else ""
+        navigates_to = (
+            target.group(1) if target
+            else href[:-len(".html")] if href.endswith(".html")
+            else None
+        )
+        # A handler defined in a <script> that redirects: destination unknown
+        scripted = scripted_navigation and (
+            (onclick and not target) or element_id in bound_handlers
+        )
+
+        elements.append(IndexedElement(
+            tag=raw["tag"],
+            id=element_id,
+            classes=tuple(attrs.get("class", "").split()),
+            attrs={k: v for k, v in attrs.items() if k not in ("id", "class", "style")},
+            text=" ".join("".join(raw["text"]).split()),
+            navigates=navigates_to is not None or scripted,
+            navigates_to=navigates_to,
+        ))
+    return elements
+
+
+class SelectorIndex:
+    """
+    page name -> elements on that page, as crawled from the static HTML.
+
+    Lookups answer True/False for pages the index has crawled and None
+    when it can't tell (page not crawled, selector too complex), so
+    callers treat None as "try the DOM".
+    """
+
+    def __init__(self, pages: Dict[str, List[IndexedElement]], source: str = ""):
+        self.pages = pages
+        self.source = source
+
+    def find(self, page: str, selector: str) -> Optional[List[IndexedElement]]:
+        parts = parse_selector(selector)
+        if page not in self.pages or parts is None:
+            return None
+        return [el for el in self.pages[page] if el.matches(parts)]
+
+    def expects(self, page: Optional[str], selector: str) -> Optional[bool]:
+        found = self.find(page, selector) if page else None
+        return None if found is None else bool(found)
+
+    def pages_for(self, selector: str) -> List[str]:
+        return sorted(page for page in self.pages if self.find(page, selector))
+
+    def validate(self, selector_map: Dict[str, str], navigating_targets: Iterable[str],
+                 click_targets: Iterable[str] = ()) -> List[str]:
+        """
+        Problems with an executor's selector_map, as readable lines. Click
+        targets without a selector are reported as vision-only.
+        """
+        problems = []
+        navigating_targets = set(navigating_targets)
+
+        for target, selector in sorted(selector_map.items()):
+            if parse_selector(selector) is None:
+                problems.append(f"{target}: selector {selector!r} can't be checked offline")
+                continue
+
+            found = {page: self.find(page, selector) for page in self.pages_for(selector)}
+            if not found:
+                problems.append(f"{target}: {selector!r} is not on any dummy_bank page")
+                continue
+
+            for page, elements in sorted(found.items()):
+                if len(elements) > 1:
+                    problems.append(f"{target}: {selector!r} matches {len(elements)} elements on {page}")
+
+            navigates = [el.navigates for elements in found.values() for el in elements]
+            if target in navigating_targets and not any(navigates):
+                problems.append(f"{target}: listed as navigating but never leaves the page")
+            if target not in navigating_targets and all(navigates):
+                problems.append(f"{target}: navigates but is not in navigating_targets")
+
+        for target in sorted(navigating_targets - set(selector_map)):
+            problems.append(f"{target}: in navigating_targets but has no selector")
+
+        for target in sorted(set(click_targets) - set(selector_map)):
+            problems.append(f"{target}: no selector, clicks will use vision")
+
+        return problems
+
+    def stats(self) -> dict:
+        return {
+            "source": self.source,
+            "pages": len(self.pages),
+            "elements": sum(len(elements) for elements in self.pages.values()),
+        }
+
+    # ------------------------------------
+    # Persistence
+    # ------------------------------------
+    def to_dict(self) -> dict:
+        return {
+            "pages": {
+                page: [asdict(el) for el in elements]
+                for page, elements in sorted(self.pages.items())
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, source: str = "") -> "SelectorIndex":
+        pages = {
+            page: [IndexedElement(**{**el, "classes": tuple(el["classes"])}) for el in elements]
+            for page, elements in data["pages"].items()
+        }
+        return cls(pages, source=source)
+
+
+def crawl_dummy_bank(root: str = DUMMY_BANK_DIR) -> SelectorIndex:
+    pages = {
+        path.stem: crawl_page(path.read_text(encoding="utf-8"))
+        for path in sorted(Path(root).glob("*.html"))
+    }
+    return SelectorIndex(pages, source=str(root))
+
+
+def load_selector_index(path: Optional[str] = SELECTOR_INDEX_PATH,
+                        root: str = DUMMY_BANK_DIR) -> SelectorIndex:
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return SelectorIndex.from_dict(json.load(f), source=path)
+    return crawl_dummy_bank(root)
+
+
+# Crawled once per process
+selector_index = load_selector_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the dummy_bank selector index")
+    parser.add_argument("--root", default=DUMMY_BANK_DIR)
+    parser.add_argument("--out", help="write the index as JSON (use with SELECTOR_INDEX_PATH)")
+    args = parser.parse_args()
+
+    index = crawl_dummy_bank(args.root)
+    for page, elements in sorted(index.pages.items()):
+        clickable = [el for el in elements if el.tag in ("a", "button")]
+        print(f"{page:<20} {len(elements):3d} elements  "
+              f"{', '.join(el.selector for el in clickable) or '-'}")
+
+    # Imported here: the executor itself imports this module
+    from agents.executor_agent import NAVIGATING_TARGETS, SELECTOR_MAP, plan_click_targets
+    problems = index.validate(SELECTOR_MAP, NAVIGATING_TARGETS, plan_click_targets())
+    print("\nselector_map:", "OK" if not problems else "")
+    for problem in problems:
+        print("  -", problem)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(index.to_dict(), f, indent=2)
+        print(f"\nwrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import cv2
+import numpy as np
+
+from services.metrics import metrics
+
+VISION_CACHE_TTL = int(os.getenv("VISION_CACHE_TTL", "600"))
+VISION_CACHE_SIZE = int(os.getenv("VISION_CACHE_SIZE", "512"))
+VISION_CACHE_REDIS = os.getenv("VISION_CACHE_REDIS", "1") == "1"
+
+# dHash grid (32x32 = 1024 bits). Fine enough that "500" and "5000" on the
+# same screen hash differently, but a changed digit in the same place can
+# still collide, which is why passes are never served on this hash.
+PHASH_SIZE = 32
+
+_VERDICT_CHECKS = ("screen_valid", "amount_match", "entity_match")
+
+
+def perceptual_hash(png: bytes, hash_size: int = PHASH_SIZE) -> Optional[str]:
+    """
+    Difference hash: robust to re-encoding and anti-aliasing noise, but
+    changes when text is added, removed or moved.
+    """
+    img = cv2.imdecode(np.frombuffer(png, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        return None
+    small = cv2.resize(img, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return np.packbits(bits).tobytes().hex()
+
+
+def is_pass(verdict: dict) -> bool:
+    return all(verdict.get(check) for check in _VERDICT_CHECKS)
+
+
+class VerdictKey(NamedTuple):
+    """
+    Both cache keys of one verification; each includes the vision
+    provider and the expected screen, amount and entity.
+    """
+    exact: str       # sha256 of the screenshot bytes
+    perceptual: str  # dHash of the pixels
+
+
+class VerdictCache:
+    """
+    LRU + TTL cache of vision verdicts.
+
+    A pass is only cached and served for the exact same screenshot bytes.
+    Fail/mismatch verdicts are also served for perceptually identical
+    screenshots (re-encoded, anti-aliased), since failing closed on a
+    look-alike is always safe and serving a pass for one is not: the same
+    layout with a tampered digit must reach the model.
+
+    Local entries are checked first; with a shared Redis, workers also see
+    each other's verdicts. Only successfully parsed verdicts are ever
+    stored, so errors keep failing closed.
+    """
+
+    def __init__(self, max_entries=VISION_CACHE_SIZE, ttl=VISION_CACHE_TTL, shared=None,
+                 provider="gemini"):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Verdicts of one provider are never served for another
+        self.provider = provider
+        # RedisMemory-like object (uses .r) or None for local-only
+        self.shared = shared
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, screenshot: bytes, screen: str, amount, entity) -> Optional[VerdictKey]:
+        phash = perceptual_hash(screenshot)
+        if phash is None:
+            return None
+        expected = f"{screen}:{amount}:{str(entity).lower()}"
+        return VerdictKey(
+            exact=f"{self.provider}:exact:{hashlib.sha256(screenshot).hexdigest()}:{expected}",
+            perceptual=f"{self.provider}:near:{phash}:{expected}",
+        )
+
+    def get(self, key: VerdictKey) -> Optional[dict]:
+        verdict = self._lookup(key.exact)
+        if verdict is None:
+            verdict = self._lookup(key.perceptual)
+            # Only failures are stored here; never let a pass through
+            if verdict is not None and is_pass(verdict):
+                verdict = None
+        if verdict is None:
+            metrics.incr("vision_cache.misses")
+        return verdict
+
+    def put(self, key: VerdictKey, verdict: dict):
+        self._store(key.exact if is_pass(verdict) else key.perceptual, verdict)
+
+    def _lookup(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                expires_at, verdict = entry
+                if expires_at > now:
+                    self._local.move_to_end(key)
+                    metrics.incr("vision_cache.hits.local")
+                    return dict(verdict)
+                del self._local[key]
+
+        if self.shared is not None:
+            try:
+                raw = self.shared.r.get(f"vision:verdict:{key}")
+            except Exception as e:
+                print("🟨 [VisionCache] Redis lookup failed:", e)
+                raw = None
+            if raw:
+                verdict = json.loads(raw)
+                self._put_local(key, verdict)
+                metrics.incr("vision_cache.hits.redis")
+                return verdict
+
+        return None
+
+    def _store(self, key: str, verdict: dict):
+        self._put_local(key, verdict)
+        if self.shared is not None:
+            try:
+                self.shared.r.set(f"vision:verdict:{key}", json.dumps(verdict), ex=self.ttl)
+            except Exception as e:
+                print("🟨 [VisionCache] Redis store failed:", e)
+
+    def _put_local(self, key: str, verdict: dict):
+        with self._lock:
+            self._local[key] = (time.time() + self.ttl, dict(verdict))
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def stats(self) -> dict:
+        hits = metrics.counter("vision_cache.hits.local") + metrics.counter("vision_cache.hits.redis")
+        misses = metrics.counter("vision_cache.misses")
+        return {
+            "entries": len(self._local),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            # Every hit skipped one model call of average latency
+            "saved_latency_ms": hits * metrics.mean("vision.generate_content"),
+        }
@@ -0,0 +1,316 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from services.metrics import metrics
+
+# gemini | fake (offline, see FakeVisionModel)
+VISION_PROVIDER = os.getenv("VISION_PROVIDER", "gemini").lower()
+
+# Per attempt, and for the whole call including retries and backoff
+VISION_TIMEOUT_S = float(os.getenv("VISION_TIMEOUT_S", "10"))
+VISION_DEADLINE_S = float(os.getenv("VISION_DEADLINE_S", "25"))
+VISION_MAX_RETRIES = int(os.getenv("VISION_MAX_RETRIES", "2"))
+VISION_BACKOFF_BASE_S = float(os.getenv("VISION_BACKOFF_BASE_S", "0.5"))
+VISION_BACKOFF_MAX_S = float(os.getenv("VISION_BACKOFF_MAX_S", "4"))
+
+# Process-wide limits: calls in flight, and calls started per second
+VISION_CONCURRENCY = int(os.getenv("VISION_CONCURRENCY", "4"))
+VISION_RATE_PER_S = float(os.getenv("VISION_RATE_PER_S", "5"))
+
+# Consecutive failed attempts that open the breaker, and how long it stays open
+VISION_BREAKER_THRESHOLD = int(os.getenv("VISION_BREAKER_THRESHOLD", "5"))
+VISION_BREAKER_RESET_S = float(os.getenv("VISION_BREAKER_RESET_S", "30"))
+
+# Worth another attempt: the provider is slow, overloaded or briefly down
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    ConnectionError,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+)
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class QueueDeadlineExceeded(asyncio.TimeoutError):
+    """
+    The deadline ran out while the call waited for a concurrency slot or
+    a rate-limit token; the provider was never asked.
+    """
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive failures; open rejects
+    every call until `reset_after` seconds pass, then lets one trial call
+    through (half-open). Its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, threshold=VISION_BREAKER_THRESHOLD, reset_after=VISION_BREAKER_RESET_S):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> Optional[str]:
+        """
+        The state the call was admitted in ("closed", or "half_open" for
+        the trial call), or None when it is rejected.
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return state
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return state
+            return None
+
+    def release(self, admitted: Optional[str]):
+        """
+        Ends an admitted call that has no outcome (cancelled by the caller,
+        or never sent): nothing is counted, a trial slot is freed.
+        """
+        if admitted == "half_open":
+            with self._lock:
+                self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            # Late failures of calls already in flight don't extend the open window
+            if self._trial_in_flight or (self.opened_at is None and self.failures >= self.threshold):
+                print("🟥 [VisionClient] Circuit breaker OPEN")
+                metrics.incr("vision.breaker_trips")
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class TokenBucket:
+    """
+    Allows `rate` call starts per second with bursts up to `burst`.
+    rate <= 0 disables limiting. Only used on the client's own loop.
+    """
+
+    def __init__(self, rate=VISION_RATE_PER_S, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeVisionModel:
+    """
+    Offline stand-in for genai.GenerativeModel.
+
+    Answers with `verdict` after `latency_s`; `fail_rate` of calls raise
+    ServiceUnavailable and `hang=True` never answers, to exercise retries,
+    timeouts and the breaker. Without an explicit `verdict` it rejects
+    every screen, so VISION_PROVIDER=fake can never approve a payment.
+    """
+
+    def __init__(self, verdict=None, latency_s=0.05, fail_rate=0.0, hang=False, seed=None):
+        self.verdict = verdict or {
+            "screen_valid": False, "amount_match": False, "entity_match": False,
+            "notes": "fake vision provider",
+        }
+        self.latency_s = latency_s
+        self.fail_rate = fail_rate
+        self.hang = hang
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    async def generate_content_async(self, parts):
+        self.calls += 1
+        if self.hang:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.latency_s)
+        if self._random.random() < self.fail_rate:
+            raise google_exceptions.ServiceUnavailable("fake provider unavailable")
+        return FakeResponse(json.dumps(self.verdict))
+
+    def generate_content(self, parts):
+        return asyncio.run(self.generate_content_async(parts))
+
+
+class VisionClient:
+    """
+    Bounded access to the vision provider.
+
+    Every call runs on one background event loop, so the semaphore, token
+    bucket and breaker are process-wide whether callers are executor
+    threads (generate) or other event loops (generate_async).
+    """
+
+    def __init__(
+        self,
+        model,
+        timeout=VISION_TIMEOUT_S,
+        deadline=VISION_DEADLINE_S,
+        max_retries=VISION_MAX_RETRIES,
+        concurrency=VISION_CONCURRENCY,
+        rate=VISION_RATE_PER_S,
+        breaker=None,
+    ):
+        self.model = model
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.concurrency = concurrency
+        self.rate = rate
+        self.breaker = breaker or CircuitBreaker()
+        self.in_flight = 0
+
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._semaphore = None
+        self._bucket = None
+
+    # ------------------------------------
+    # Entry points
+    # ------------------------------------
+    def generate(self, parts):
+        """
+        Blocking call for executor threads. Raises CircuitOpen, or the
+        last provider error once retries or the deadline run out.
+        """
+        return self._submit(parts).result()
+
+    async def generate_async(self, parts):
+        return await asyncio.wrap_future(self._submit(parts))
+
+    # ------------------------------------
+    # Background loop
+    # ------------------------------------
+    def _submit(self, parts):
+        return asyncio.run_coroutine_threadsafe(self._call(parts), self._ensure_loop())
+
+    def _ensure_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="vision-client", daemon=True
+                ).start()
+            return self._loop
+
+    async def _call(self, parts):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._bucket = TokenBucket(self.rate)
+
+        give_up_at = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            admitted = self.breaker.allow()
+            if admitted is None:
+                metrics.incr("vision.breaker_rejections")
+                raise CircuitOpen("Vision provider circuit is open")
+
+            try:
+                async with self._semaphore:
+                    await self._bucket.acquire()
+                    remaining = give_up_at - time.monotonic()
+                    if remaining <= 0:
+                        raise QueueDeadlineExceeded("Vision deadline spent waiting to be sent")
+                    metrics.incr("vision.attempts")
+                    self.in_flight += 1
+                    try:
+                        start = time.perf_counter()
+                        response = await asyncio.wait_for(
+                            self.model.generate_content_async(parts),
+                            timeout=min(self.timeout, remaining),
+                        )
+                    finally:
+                        self.in_flight -= 1
+                metrics.observe("vision.generate_content", (time.perf_counter() - start) * 1000)
+                self.breaker.record_success()
+                return response
+
+            except QueueDeadlineExceeded:
+                # A local backlog, not a provider failure
+                self.breaker.release(admitted)
+                metrics.incr("vision.queue_timeouts")
+                raise
+
+            except asyncio.CancelledError:
+                # The caller gave up; says nothing about the provider
+                self.breaker.release(admitted)
+                raise
+
+            except RETRYABLE_ERRORS as e:
+                self.breaker.record_failure()
+                if isinstance(e, asyncio.TimeoutError):
+                    metrics.incr("vision.timeouts")
+                print(f"🟨 [VisionClient] Attempt {attempt + 1} failed:", repr(e))
+
+                # Full jitter: sleep anywhere up to the exponential cap
+                delay = random.uniform(
+                    0, min(VISION_BACKOFF_MAX_S, VISION_BACKOFF_BASE_S * 2 ** attempt)
+                )
+                attempt += 1
+                if attempt > self.max_retries or time.monotonic() + delay >= give_up_at:
+                    raise
+                metrics.incr("vision.retries")
+                await asyncio.sleep(delay)
+
+            except Exception:
+                # Bad request, auth ... : retrying won't help
+                self.breaker.record_failure()
+                raise
+
+    def stats(self) -> dict:
+        return {
+            "provider": VISION_PROVIDER,
+            "breaker": self.breaker.state,
+            "in_flight": self.in_flight,
+            "attempts": metrics.counter("vision.attempts"),
+            "retries": metrics.counter("vision.retries"),
+            "timeouts": metrics.counter("vision.timeouts"),
+            "queue_timeouts": metrics.counter("vision.queue_timeouts"),
+            "breaker_rejections": metrics.counter("vision.breaker_rejections"),
+        }
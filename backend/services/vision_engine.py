@@ -71,72 +71,239 @@
 #             "amount_match": False,
 #             "entity_match": False
 #         }
+import asyncio
 import base64
 import google.generativeai as genai
 import json
 import os
 import re
 
+from services.image_prep import image_size, prepare_for_vision
+from services.metrics import metrics
+from services.redis_memory import redis_memory
+from services.verdict_cache import VerdictCache, VISION_CACHE_REDIS
+from services.vision_client import VisionClient, FakeVisionModel, VISION_PROVIDER
+
 # genai.configure(api_key=os.getenv(""))
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
 
+# One cache per process, shared by every VisionEngine (and via Redis,
+# across workers)
+verdict_cache = VerdictCache(
+    shared=redis_memory if VISION_CACHE_REDIS else None, provider=VISION_PROVIDER
+)
+metrics.register_collector("vision_cache", verdict_cache.stats)
+
+# One client per process, so concurrency, rate limit and breaker are shared
+vision_client = VisionClient(
+    FakeVisionModel() if VISION_PROVIDER == "fake"
+    else genai.GenerativeModel("gemini-2.0-flash-lite-preview")
+)
+metrics.register_collector("vision_client", vision_client.stats)
+
+
 class VisionEngine:
-    def __init__(self):
-        self.model = genai.GenerativeModel("gemini-2.0-flash-lite-preview")
+    """
+    Confirmation-screen verdicts from the vision model. Every failure
+    (timeout, provider error, open breaker, unparseable answer) returns a
+    fail-closed verdict.
+    """
+
+    def __init__(self, cache=verdict_cache, client=None):
+        self.client = client or vision_client
+        self.model = self.client.model
+        self.cache = cache
 
     def verify_confirmation_screen(
         self,
         screenshot_bytes: bytes,
         expected_amount: int,
         expected_entity: str,
-        expected_screen: str = "gold_confirm"
+        expected_screen: str = "gold_confirm",
+        crop_box: dict = None
     ) -> dict:
+        """
+        `crop_box` (CSS pixels) limits the upload to the confirmation
+        container; see services.image_prep.
+        """
         print("🟦 [Vision] verify_confirmation_screen CALLED")
 
-        image_b64 = base64.b64encode(screenshot_bytes).decode()
-
-        print("🟦 [Vision] Screenshot size:", len(screenshot_bytes))
-        print("🟦 [Vision] Expected amount:", expected_amount)
-        print("🟦 [Vision] Expected entity:", expected_entity)
+        cache_key, cached = self._cached(screenshot_bytes, expected_screen, expected_amount, expected_entity)
+        if cached is not None:
+            return cached
 
         try:
-            response = self.model.generate_content(
-                [
-                    self._build_prompt(
-                        expected_amount,
-                        expected_entity,
-                        expected_screen
-                    ),
-                    {
-                        "mime_type": "image/png",
-                        "data": image_b64
-                    }
-                ]
+            response = self.client.generate(
+                self._parts(screenshot_bytes, expected_amount, expected_entity, expected_screen, crop_box)
             )
+            return self._verdict(response, cache_key)
+        except Exception as e:
+            return self._fail_closed(e)
+
+    async def verify_confirmation_screen_async(
+        self,
+        screenshot_bytes: bytes,
+        expected_amount: int,
+        expected_entity: str,
+        expected_screen: str = "gold_confirm",
+        crop_box: dict = None
+    ) -> dict:
+        print("🟦 [Vision] verify_confirmation_screen_async CALLED")
+
+        # The cache hashes the image and may read/write the shared (sync)
+        # Redis, so it runs off the event loop like the image prep
+        cache_key, cached = await asyncio.to_thread(
+            self._cached, screenshot_bytes, expected_screen, expected_amount, expected_entity
+        )
+        if cached is not None:
+            return cached
 
-            raw_text = response.text
-            print("🟩 [Vision] Raw Gemini response:", raw_text)
+        try:
+            parts = await asyncio.to_thread(
+                self._parts, screenshot_bytes, expected_amount, expected_entity, expected_screen, crop_box
+            )
+            response = await self.client.generate_async(parts)
+            return await asyncio.to_thread(self._verdict, response, cache_key)
+        except Exception as e:
+            return self._fail_closed(e)
+
+    # ------------------------------------
+    # Element location (click fallback)
+    # ------------------------------------
+    def locate_element(self, screenshot_bytes: bytes, target: str):
+        """
+        Asks the vision model where `target` is on the screenshot. Returns
+        the (x, y) centre in screenshot pixels, or None when the model
+        doesn't see it or the call fails, so the executor stops instead of
+        clicking a guess.
+        """
+        print("🟦 [Vision] locate_element CALLED:", target)
+        try:
+            parts, size = self._locate_parts(screenshot_bytes, target)
+            return self._point(self.client.generate(parts), size)
+        except Exception as e:
+            print("🟥 [Vision] locate_element ERROR:", repr(e))
+            return None
 
-            verdict = self._extract_json(raw_text)
-            if verdict["screen_valid"] and verdict["amount_match"]:
-                print("🟩 [Safety] Vision validation PASSED")
+    async def locate_element_async(self, screenshot_bytes: bytes, target: str):
+        print("🟦 [Vision] locate_element_async CALLED:", target)
+        try:
+            parts, size = await asyncio.to_thread(self._locate_parts, screenshot_bytes, target)
+            return self._point(await self.client.generate_async(parts), size)
+        except Exception as e:
+            print("🟥 [Vision] locate_element ERROR:", repr(e))
+            return None
+
+    def _locate_parts(self, screenshot_bytes, target):
+        size = image_size(screenshot_bytes)
+        if size is None:
+            raise ValueError("Screenshot could not be decoded")
+
+        image_bytes, mime_type = prepare_for_vision(screenshot_bytes)
+        return [
+            self._build_locate_prompt(target),
+            {
+                "mime_type": mime_type,
+                "data": base64.b64encode(image_bytes).decode()
+            }
+        ], size
+
+    def _point(self, response, size):
+        """
+        Maps the model's box (normalised to 0-1000, Gemini's convention)
+        back to screenshot pixels, which the downscaled upload doesn't use.
+        """
+        raw_text = response.text
+        print("🟩 [Vision] Raw locate response:", raw_text)
+
+        answer = self._extract_json(raw_text)
+        box = answer.get("box_2d")
+        if not answer.get("found") or not box or len(box) != 4:
+            return None
+
+        ymin, xmin, ymax, xmax = (min(max(float(v), 0.0), 1000.0) for v in box)
+        width, height = size
+        return (
+            round((xmin + xmax) / 2 / 1000 * width),
+            round((ymin + ymax) / 2 / 1000 * height),
+        )
+
+    def _build_locate_prompt(self, target):
+        label = target.replace("_", " ")
+        return f"""
+    You are locating a UI element on a banking web page screenshot.
 
+    Element: the clickable "{label}" (plan target `{target}`).
 
+    If exactly one clickable element matches, return its bounding box as
+    [ymin, xmin, ymax, xmax] normalised to 0-1000. If it is not visible or
+    the match is ambiguous, return found=false.
 
-            return verdict
+    Return ONLY valid JSON.
+    Do NOT include markdown, comments, or explanations.
 
+    {{
+    "found": true/false,
+    "box_2d": [ymin, xmin, ymax, xmax]
+    }}
+    """
 
-        except Exception as e:
-            print("🟥 [Vision] ERROR:", str(e))
+    # ------------------------------------
+    # Shared steps
+    # ------------------------------------
+    def _cached(self, screenshot_bytes, screen, amount, entity):
+        if self.cache is None:
+            return None, None
+        cache_key = self.cache.key(screenshot_bytes, screen, amount, entity)
+        cached = self.cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            print("🟩 [Vision] Verdict cache hit")
+        return cache_key, cached
+
+    def _parts(self, screenshot_bytes, expected_amount, expected_entity, expected_screen, crop_box):
+        image_bytes, mime_type = prepare_for_vision(screenshot_bytes, crop_box=crop_box)
+        image_b64 = base64.b64encode(image_bytes).decode()
+
+        print("🟦 [Vision] Screenshot size:", len(screenshot_bytes), "→", len(image_bytes))
+        print("🟦 [Vision] Expected amount:", expected_amount)
+        print("🟦 [Vision] Expected entity:", expected_entity)
 
-            return {
-                "screen_valid": False,
-                "amount_match": False,
-                "entity_match": False,
-                "notes": f"Vision exception: {e}"
+        return [
+            self._build_prompt(
+                expected_amount,
+                expected_entity,
+                expected_screen
+            ),
+            {
+                "mime_type": mime_type,
+                "data": image_b64
             }
+        ]
+
+    def _verdict(self, response, cache_key) -> dict:
+        raw_text = response.text
+        print("🟩 [Vision] Raw Gemini response:", raw_text)
+
+        verdict = self._extract_json(raw_text)
+        if verdict["screen_valid"] and verdict["amount_match"]:
+            print("🟩 [Safety] Vision validation PASSED")
+
+        # Only parsed verdicts are cached; failures stay uncached
+        if cache_key:
+            self.cache.put(cache_key, verdict)
+
+        return verdict
+
+    def _fail_closed(self, e: Exception) -> dict:
+        print("🟥 [Vision] ERROR:", repr(e))
 
+        return {
+            "screen_valid": False,
+            "amount_match": False,
+            "entity_match": False,
+            "notes": f"Vision exception: {e!r}"
+        }
 
 
     def _extract_json(self, text: str) -> dict:
@@ -0,0 +1,137 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+HUMAN_PACING = os.getenv("HUMAN_PACING", "0") == "1"
+
+# Per-action timeouts (ms) for condition-based waits
+ACTION_TIMEOUTS_MS = {
+    "navigate": 10000,
+    "click": 5000,
+    "select": 3000,
+    "type": 3000,
+    "dom_settle": 1000,
+}
+
+# Quiet period (ms) with no DOM mutations before a non-navigating
+# action counts as settled
+DOM_QUIET_MS = 100
+
+_DOM_SETTLE_JS = """
+([quietMs, timeoutMs]) => new Promise((resolve) => {
+    let timer = setTimeout(done, quietMs);
+    const deadline = setTimeout(done, timeoutMs);
+    const observer = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(done, quietMs);
+    });
+    observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    function done() {
+        observer.disconnect();
+        clearTimeout(timer);
+        clearTimeout(deadline);
+        resolve(true);
+    }
+})
+"""
+
+
+class HumanPacing:
+    """
+    Optional human-like delays, off by default (HUMAN_PACING=1 to enable).
+    These are the fixed sleeps the executor used to apply unconditionally;
+    they are cosmetic (demo recordings) and never needed for correctness.
+    """
+
+    DELAYS = {
+        "navigate": 1.0,
+        "click": 1.0,
+        "select_biller": 1.0,
+        "enter_amount": 0.3,
+        "final_submit": 1.0,
+        "deposit_funds": 0.5,
+    }
+    TYPING_DELAY_MS = 50
+
+    def __init__(self, enabled: bool = HUMAN_PACING):
+        self.enabled = enabled
+
+    def pause(self, action: str):
+        if self.enabled:
+            time.sleep(self.DELAYS.get(action, 0))
+
+    async def pause_async(self, action: str):
+        if self.enabled:
+            await asyncio.sleep(self.DELAYS.get(action, 0))
+
+    @property
+    def typing_delay_ms(self) -> int:
+        return self.TYPING_DELAY_MS if self.enabled else 0
+
+
+class WaitStrategy:
+    """
+    Waits for the condition an action actually depends on (navigation
+    committed, element actionable, DOM quiet) instead of sleeping.
+    """
+
+    def __init__(self, browser, timeouts=None):
+        self.browser = browser
+        self.timeouts = {**ACTION_TIMEOUTS_MS, **(timeouts or {})}
+
+    @contextmanager
+    def navigation(self):
+        """
+        Wraps an action that leaves the page; returns once the next
+        document's DOM is parsed.
+        """
+        with self.browser.page.expect_navigation(
+            wait_until="domcontentloaded",
+            timeout=self.timeouts["navigate"],
+        ):
+            yield
+
+    def dom_settled(self):
+        """
+        Resolves after DOM_QUIET_MS without mutations (bounded by the
+        dom_settle timeout), for in-page actions that re-render.
+        """
+        self.browser.page.evaluate(
+            _DOM_SETTLE_JS, [DOM_QUIET_MS, self.timeouts["dom_settle"]]
+        )
+
+    def click(self, selector: str, navigates: bool):
+        if navigates:
+            with self.navigation():
+                self.browser.click(selector, timeout=self.timeouts["click"])
+        else:
+            self.browser.click(selector, timeout=self.timeouts["click"])
+            self.dom_settled()
+
+
+class AsyncWaitStrategy(WaitStrategy):
+    """
+    WaitStrategy for AsyncPlaywrightEngine.
+    """
+
+    @asynccontextmanager
+    async def navigation(self):
+        async with self.browser.page.expect_navigation(
+            wait_until="domcontentloaded",
+            timeout=self.timeouts["navigate"],
+        ):
+            yield
+
+    async def dom_settled(self):
+        await self.browser.page.evaluate(
+            _DOM_SETTLE_JS, [DOM_QUIET_MS, self.timeouts["dom_settle"]]
+        )
+
+    async def click(self, selector: str, navigates: bool):
+        if navigates:
+            async with self.navigation():
+                await self.browser.click(selector, timeout=self.timeouts["click"])
+        else:
+            await self.browser.click(selector, timeout=self.timeouts["click"])
+            await self.dom_settled()
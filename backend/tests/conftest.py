@@ -0,0 +1,39 @@
+"""
+Shared fixtures. Tests run offline: Redis is an in-process fakeredis
+server (with Lua, for the ledger and feed scripts), and no browser or
+model is started.
+
+    cd backend && python -m pytest -q
+"""
+import os
+import sys
+
+# intent_agent builds its model client at import time
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PYDANTIC_AI_NO_BANNER", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fakeredis  # noqa: E402
+import pytest  # noqa: E402
+
+from services.redis_memory import RedisMemory  # noqa: E402
+from services.screenshot_store import ScreenshotStore  # noqa: E402
+
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis_client(redis_server):
+    return fakeredis.FakeRedis(server=redis_server, decode_responses=True)
+
+
+@pytest.fixture
+def memory(redis_server, redis_client):
+    return RedisMemory(
+        session_id="test",
+        client=redis_client,
+        screenshots=ScreenshotStore(client=fakeredis.FakeRedis(server=redis_server)),
+    )
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+
+import cv2
+import fakeredis
+import numpy as np
+import pytest
+
+import agents.async_executor_agent as async_executor_agent
+from agents.async_executor_agent import AsyncExecutorAgent
+from agents.planner_agent import plan_for_intent
+from services.async_redis_memory import AsyncRedisMemory
+from services.redis_memory import RedisMemory
+from services.screenshot_store import AsyncScreenshotStore, ScreenshotStore
+from services.verdict_cache import VerdictCache
+from services.vision_client import FakeVisionModel, VisionClient
+from services.vision_engine import VisionEngine
+
+PASS = {"screen_valid": True, "amount_match": True, "entity_match": True}
+
+
+class StubPage:
+    async def evaluate(self, script, arg=None):
+        # A confirm page without a readable amount: the DOM tier escalates
+        return {"path": "/gold_confirm.html", "amount": None}
+
+
+class StubBrowser:
+    page = StubPage()
+
+    async def launch(self):
+        return self.page
+
+    async def release(self):
+        pass
+
+    async def screenshot(self, selector=None):
+        ok, buf = cv2.imencode(".png", np.full((120, 160, 3), 255, np.uint8))
+        return buf.tobytes()
+
+
+@pytest.fixture
+def agent(redis_server, monkeypatch):
+    loop_threads = set()
+    blocking_on_loop = []
+
+    class GuardedConnection(fakeredis.FakeRedisConnection):
+        # Records sync Redis round trips made on the event-loop thread
+        def send_packed_command(self, *args, **kwargs):
+            if threading.get_ident() in loop_threads:
+                blocking_on_loop.append(args)
+            return super().send_packed_command(*args, **kwargs)
+
+    sync_memory = RedisMemory(
+        client=fakeredis.FakeRedis(
+            server=redis_server, decode_responses=True, connection_class=GuardedConnection,
+        ),
+        screenshots=ScreenshotStore(client=fakeredis.FakeRedis(server=redis_server)),
+    )
+    async_memory = AsyncRedisMemory(
+        client=fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True),
+        screenshots=AsyncScreenshotStore(client=fakeredis.FakeAsyncRedis(server=redis_server)),
+    )
+    monkeypatch.setattr(async_executor_agent, "redis_memory", sync_memory)
+    monkeypatch.setattr(async_executor_agent, "async_redis_memory", async_memory)
+
+    executor = AsyncExecutorAgent()
+    executor.browser = executor.safety.browser = StubBrowser()
+    executor.loop_threads = loop_threads
+    executor.blocking_on_loop = blocking_on_loop
+    return executor, sync_memory.for_session("async")
+
+
+def test_deposit_workflow_keeps_redis_off_the_loop(agent):
+    executor, memory = agent
+    memory.set_profile({"balance": 1000, "bills": {}, "history": []})
+    intent = {"action": "deposit_funds", "amount": 3000, "entity": "self"}
+    memory.set_intent(intent)
+    memory.set_plan_json(plan_for_intent(intent).steps_json)
+    memory.set_current_step(0)
+
+    async def main():
+        executor.loop_threads.add(threading.get_ident())
+        await executor.run("async")
+
+    asyncio.run(main())
+
+    assert executor.blocking_on_loop == []
+    assert memory.ledger.balance() == 4000
+    assert memory.get_logs()[0] == "Workflow completed."
+    assert memory.get_current_step() == 2
+
+
+def test_pause_is_recorded_through_async_memory(agent):
+    executor, memory = agent
+
+    async def main():
+        executor.loop_threads.add(threading.get_ident())
+        executor.state = executor.state.for_session("async")
+        await executor.trigger_pause({"action": "pause_for_approval"})
+
+    asyncio.run(main())
+
+    assert executor.blocking_on_loop == []
+    snapshot = memory.snapshot()
+    assert snapshot.paused and snapshot.risk == "High-risk action requires approval"
+    assert snapshot.screenshot is not None
+
+
+def test_verification_keeps_redis_off_the_loop(agent):
+    executor, memory = agent
+    memory.set_intent({"action": "buy_gold", "amount": 500, "entity": "digital_gold"})
+    vision = VisionEngine(
+        cache=VerdictCache(shared=memory),
+        client=VisionClient(FakeVisionModel(verdict=PASS, latency_s=0), rate=0),
+    )
+    executor.safety.verifier.vision = vision
+
+    async def main():
+        executor.loop_threads.add(threading.get_ident())
+        executor.safety.async_memory = executor.state.for_session("async")
+        # The second verification is served from the shared verdict cache
+        return [await executor.safety.evaluate_async({"action": "confirm_payment"}) for _ in range(2)]
+
+    assert asyncio.run(main()) == [True, True]
+    assert executor.blocking_on_loop == []
+    assert vision.client.model.calls == 1
+    assert memory.r.keys("vision:verdict:*")
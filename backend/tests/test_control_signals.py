@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import time
+
+import fakeredis
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import agents.executor_agent as executor_agent
+import routes.api as api
+from agents.executor_agent import ExecutorAgent
+from services.async_redis_memory import AsyncRedisMemory
+
+# Long enough that a test only passes if the signal, not the timeout,
+# wakes the executor
+WAIT = 30
+
+
+@pytest.fixture
+def client(memory, monkeypatch):
+    monkeypatch.setattr(api, "redis_memory", memory)
+    app = FastAPI()
+    app.include_router(api.router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def paused_executor(memory, monkeypatch):
+    """
+    An executor paused before the only step of a one-step plan, running
+    its loop on a thread the way an ExecutorPool worker does.
+    """
+    monkeypatch.setattr(executor_agent, "CONTROL_WAIT_SECONDS", WAIT)
+    session = memory.for_session("a")
+    session.set_plan([{"step_id": 1, "action": "log_completion"}])
+    session.set_paused(True)
+
+    executor = ExecutorAgent()
+    executor.memory = session
+    executor.fused_runs = {}
+    executor.executed = []
+    executor.execute_step = executor.executed.append
+
+    thread = threading.Thread(target=executor._run_loop, args=(session.get_plan(),), daemon=True)
+    thread.start()
+    # Let it reach the BLPOP
+    time.sleep(0.1)
+    assert thread.is_alive() and executor.executed == []
+    return executor, thread, session
+
+
+@pytest.mark.parametrize("route, executed", [("/approve", 1), ("/reject", 0)])
+def test_control_routes_wake_a_paused_executor(client, paused_executor, route, executed):
+    executor, thread, session = paused_executor
+    start = time.monotonic()
+
+    assert client.post(route, params={"session_id": "a"}).status_code == 200
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert time.monotonic() - start < 5
+    assert len(executor.executed) == executed
+    assert session.get_logs(limit=1) == ["Workflow completed."]
+
+
+def test_a_signal_for_another_session_does_not_wake_it(client, paused_executor):
+    _, thread, _ = paused_executor
+
+    client.post("/approve", params={"session_id": "b"})
+    thread.join(0.3)
+    assert thread.is_alive()
+
+    client.post("/reject", params={"session_id": "a"})
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+def test_sync_signal_wakes_an_async_waiter(client, memory, redis_server):
+    async_memory = AsyncRedisMemory(client=fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True))
+
+    async def wait():
+        waiter = asyncio.ensure_future(async_memory.for_session("a").wait_control(WAIT))
+        await asyncio.sleep(0.1)
+        await asyncio.to_thread(client.post, "/approve", params={"session_id": "a"})
+        return await asyncio.wait_for(waiter, 5)
+
+    assert asyncio.run(wait()) == "approve"
@@ -0,0 +1,101 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.api as api
+from services.job_queue import ExecutorPool, SessionBusy
+
+PLAN = [{"step_id": 1, "action": "open_app"}]
+
+
+@pytest.fixture
+def client(memory, monkeypatch):
+    # No workers: submitted jobs stay queued, so the pool fills up
+    pool = ExecutorPool(executor_factory=lambda: None, workers=0, max_queue=1)
+    monkeypatch.setattr(api, "redis_memory", memory)
+    monkeypatch.setattr(api, "executor_pool", pool)
+
+    app = FastAPI()
+    app.include_router(api.router)
+    return TestClient(app)
+
+
+def prepare(memory, session_id: str):
+    session = memory.for_session(session_id)
+    session.set_plan(PLAN)
+    session.set_screenshot(b"previous run")
+    return session
+
+
+def test_execute_resets_the_dashboard_before_queueing(client, memory, monkeypatch):
+    session = prepare(memory, "a")
+    seen = {}
+
+    def submit(session_id):
+        # What a worker picking the job up immediately would see
+        seen["screenshot"] = session.get_screenshot()
+        seen["logs"] = session.get_logs()
+        return ExecutorPool.submit(api.executor_pool, session_id)
+
+    monkeypatch.setattr(api.executor_pool, "submit", submit)
+    response = client.post("/execute", params={"session_id": "a"})
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "queued"
+    assert seen == {"screenshot": None, "logs": ["Execution queued"]}
+
+
+def test_busy_session_is_rejected_without_touching_the_dashboard(client, memory):
+    session = prepare(memory, "a")
+    first = client.post("/execute", params={"session_id": "a"}).json()
+    session.set_screenshot(b"running job")
+    running = session.get_screenshot()
+
+    response = client.post("/execute", params={"session_id": "a"})
+
+    assert response.status_code == 409
+    assert response.json()["detail"]["job_id"] == first["job_id"]
+    assert session.get_screenshot() == running
+    assert session.get_logs(limit=1) == ["Execution queued"]
+
+
+def test_racing_submit_for_a_busy_session_is_rolled_back(client, memory, monkeypatch):
+    session = prepare(memory, "a")
+    previous = session.get_screenshot()
+
+    def submit(session_id):
+        # Another request queued a job between the check and the submit
+        raise SessionBusy("other-job")
+
+    monkeypatch.setattr(api.executor_pool, "submit", submit)
+    response = client.post("/execute", params={"session_id": "a"})
+
+    assert response.status_code == 409
+    assert response.json()["detail"]["job_id"] == "other-job"
+    assert session.get_screenshot() == previous
+    assert session.get_logs(limit=1) == ["Execution not queued: session already has an active job"]
+
+
+def test_full_queue_is_rejected_and_rolled_back(client, memory):
+    prepare(memory, "a")
+    client.post("/execute", params={"session_id": "a"})
+    session = prepare(memory, "b")
+    previous = session.get_screenshot()
+
+    response = client.post("/execute", params={"session_id": "b"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "5"
+    assert session.get_screenshot() == previous
+    assert session.get_logs(limit=1) == ["Execution not queued: executor queue is full"]
+
+
+def test_restore_does_not_overwrite_a_newer_screenshot(memory):
+    session = prepare(memory, "a")
+    previous = session.get_screenshot()
+    session.clear_screenshot()
+    newer = session.set_screenshot(b"newer")
+
+    session.restore_screenshot(previous)
+
+    assert session.get_screenshot() == newer
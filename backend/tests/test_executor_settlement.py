@@ -0,0 +1,85 @@
+import pytest
+
+from agents.executor_agent import ExecutorAgent
+from agents.planner_agent import plan_for_intent
+
+PROFILE = {"balance": 10000, "bills": {"tata": 950}, "history": []}
+
+
+@pytest.fixture
+def executor(memory):
+    memory.set_profile(PROFILE)
+    agent = ExecutorAgent()
+    agent.memory = memory
+    return agent
+
+
+def start(executor, intent: dict):
+    memory = executor.memory
+    memory.set_intent(intent)
+    plan = plan_for_intent(intent)
+    memory.set_plan_json(plan.steps_json)
+    memory.set_current_step(len(plan.steps) - 1)
+    return [step.dict() for step in plan.steps]
+
+
+def test_buy_gold_settles_intent_amount(executor):
+    start(executor, {"action": "buy_gold", "amount": 500, "entity": "digital_gold"})
+
+    # log_completion has no amount of its own
+    executor.record_completion({"action": "log_completion", "amount": None})
+
+    assert executor.memory.ledger.balance() == 9500
+    assert executor.memory.ledger.history(limit=1)[0][0]["type"] == "gold_purchase"
+
+
+def test_transfer_settles_intent_amount(executor):
+    steps = start(executor, {"action": "transfer_money", "amount": 2000, "entity": "mom"})
+    assert steps[-1]["action"] == "log_completion" and steps[-1]["amount"] is None
+
+    executor.record_completion(steps[-1])
+
+    assert executor.memory.ledger.balance() == 8000
+    entry = executor.memory.ledger.history(limit=1)[0][0]
+    assert (entry["type"], entry["amount"], entry["details"]) == ("transfer", 2000, "To mom")
+
+
+def test_pay_bill_settles_fetched_bill(executor):
+    steps = start(executor, {"action": "pay_bill", "amount": None, "entity": "tata"})
+    executor.resolve_bill({"action": "fetch_bill_amount", "entity": "tata"})
+
+    executor.record_completion(steps[-1])
+
+    assert executor.memory.ledger.balance() == 9050
+    assert executor.memory.ledger.bill("tata") == 0
+
+
+def test_deposit_credits_once(executor):
+    steps = start(executor, {"action": "deposit_funds", "amount": 3000, "entity": "self"})
+    executor.memory.set_current_step(0)
+    executor.record_deposit(steps[0])
+    executor.memory.set_current_step(1)
+
+    # log_completion must not move the deposit a second time
+    executor.record_completion(steps[1])
+
+    assert executor.memory.ledger.balance() == 13000
+
+
+def test_retried_completion_is_not_applied_twice(executor):
+    steps = start(executor, {"action": "transfer_money", "amount": 2000, "entity": "mom"})
+
+    executor.record_completion(steps[-1])
+    executor.record_completion(steps[-1])
+
+    assert executor.memory.ledger.balance() == 8000
+    assert executor.memory.ledger.summary()["history_count"] == 1
+
+
+def test_overdraft_is_refused(executor):
+    steps = start(executor, {"action": "transfer_money", "amount": 20000, "entity": "mom"})
+
+    with pytest.raises(RuntimeError, match="insufficient_funds"):
+        executor.record_completion(steps[-1])
+
+    assert executor.memory.ledger.balance() == 10000
@@ -0,0 +1,235 @@
+import asyncio
+import json
+
+import fakeredis
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.api as api
+from services.async_redis_memory import AsyncRedisMemory
+from services.redis_memory import FEED_START, parse_feed_cursor, validate_session_id
+
+
+@pytest.fixture
+def session(memory):
+    return memory.for_session("a")
+
+
+@pytest.fixture
+def client(memory, monkeypatch):
+    monkeypatch.setattr(api, "redis_memory", memory)
+    app = FastAPI()
+    app.include_router(api.router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("cursor, expected", [
+    ("1-0.2-3", ("1-0", "2-3")),
+    ("1700000000000-12.0-0", ("1700000000000-12", "0-0")),
+    (None, (FEED_START, FEED_START)),
+    ("", (FEED_START, FEED_START)),
+    ("1-0", (FEED_START, FEED_START)),
+    ("1-0.2-3.4-5", (FEED_START, FEED_START)),
+    ("1-0.latest", (FEED_START, FEED_START)),
+    ("1.2", (FEED_START, FEED_START)),
+])
+def test_parse_feed_cursor(cursor, expected):
+    assert parse_feed_cursor(cursor) == expected
+
+
+def test_read_feed_returns_only_newer_entries(session):
+    for i in range(3):
+        session.push_log(f"line {i}")
+
+    entries, cursor = session.read_feed("logs")
+    assert [e["text"] for e in entries] == ["line 0", "line 1", "line 2"]
+    assert cursor == entries[-1]["id"]
+
+    assert session.read_feed("logs", since=cursor) == ([], cursor)
+
+    session.push_log("line 3")
+    assert [e["text"] for e in session.read_feed("logs", since=cursor)[0]] == ["line 3"]
+
+
+def test_read_feed_pages_with_limit(session):
+    for i in range(5):
+        session.push_narration(f"n{i}")
+
+    first, cursor = session.read_feed("narration", limit=2)
+    second, cursor = session.read_feed("narration", since=cursor, limit=2)
+    third, _ = session.read_feed("narration", since=cursor, limit=2)
+
+    assert [[e["text"] for e in page] for page in (first, second, third)] == [
+        ["n0", "n1"], ["n2", "n3"], ["n4"],
+    ]
+
+
+def test_snapshot_since_returns_only_new_logs_and_narration(session):
+    session.push_log("old log")
+    session.push_narration("old narration")
+    cursor = session.snapshot().cursor
+
+    session.push_log("new log 1")
+    session.push_log("new log 2")
+    session.push_narration("new narration")
+    delta = session.snapshot(since=cursor)
+
+    assert delta.logs == ["new log 2", "new log 1"]
+    assert delta.narration == ["new narration"]
+
+    idle = session.snapshot(since=delta.cursor)
+    assert (idle.logs, idle.narration, idle.cursor) == ([], [], delta.cursor)
+
+
+def test_snapshot_with_a_bad_cursor_starts_over(session):
+    session.push_log("a")
+    session.push_narration("b")
+
+    snapshot = session.snapshot(since="garbage")
+
+    assert (snapshot.logs, snapshot.narration) == (["a"], ["b"])
+
+
+def test_snapshot_log_limit_keeps_the_newest(session):
+    for i in range(5):
+        session.push_log(f"line {i}")
+
+    assert session.snapshot(log_limit=2).logs == ["line 4", "line 3"]
+
+
+def test_push_publishes_the_entry_id(session):
+    pubsub = session.subscribe_events()
+
+    entry_id = session.push_log("hello")
+
+    # The first read only consumes the subscribe confirmation
+    messages = [pubsub.get_message(ignore_subscribe_messages=True, timeout=1) for _ in range(2)]
+    message = next(m for m in messages if m)
+    assert json.loads(message["data"]) == {"event": "log", "data": "hello", "id": entry_id}
+    pubsub.close()
+
+
+def test_feeds_are_capped(session):
+    for i in range(1000):
+        session.push_log(f"line {i}")
+
+    # MAXLEN ~ trims whole nodes, so the cap is approximate
+    assert session.r.xlen(session._key("feed:logs")) < 1000
+    assert session.get_logs(limit=1) == ["line 999"]
+
+
+def test_feeds_are_per_session(memory):
+    memory.for_session("a").push_log("only a")
+
+    assert memory.for_session("b").read_feed("logs") == ([], FEED_START)
+
+
+def test_async_memory_reads_the_same_feeds(session, redis_server):
+    session.push_log("one")
+    session.push_narration("two")
+    expected = session.snapshot()
+
+    async def read():
+        memory = AsyncRedisMemory(
+            session_id="a", client=fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True),
+        )
+        await memory.push_log("three")
+        return await memory.snapshot(since=expected.cursor), await memory.read_feed("logs")
+
+    delta, (entries, _) = asyncio.run(read())
+
+    assert delta.logs == ["three"] and delta.narration == []
+    assert [e["text"] for e in entries] == ["one", "three"]
+
+
+def test_feed_endpoints(client, memory):
+    session = memory.for_session("a")
+    session.push_log("x")
+    cursor = session.push_log("y")
+    session.push_narration("z")
+
+    logs = client.get("/state/logs", params={"session_id": "a", "limit": 1}).json()
+    assert [e["text"] for e in logs["entries"]] == ["x"]
+
+    logs = client.get("/state/logs", params={"session_id": "a", "since": logs["cursor"]}).json()
+    assert [e["text"] for e in logs["entries"]] == ["y"] and logs["cursor"] == cursor
+
+    narration = client.get("/state/narration", params={"session_id": "a"}).json()
+    assert [e["text"] for e in narration["entries"]] == ["z"]
+
+    state = client.get("/state", params={"session_id": "a"}).json()
+    assert client.get("/state", params={"session_id": "a", "since": state["cursor"]}).json()["logs"] == []
+
+
+@pytest.mark.parametrize("params", [{"since": "latest"}, {"limit": 0}, {"limit": 501}])
+def test_feed_endpoints_reject_bad_parameters(client, params):
+    assert client.get("/state/logs", params=params).status_code == 422
+
+
+# ------------------------------------
+# Session ids
+# ------------------------------------
+@pytest.mark.parametrize("session_id", ["*", "a:b", "a*", "[ab]", "a?", "", "x" * 65, "a b"])
+def test_routes_reject_session_ids_that_reach_other_keys(client, session_id):
+    for path in ("/state", "/state/logs", "/state/narration"):
+        assert client.get(path, params={"session_id": session_id}).status_code == 422
+    assert client.post("/approve", params={"session_id": session_id}).status_code == 422
+
+
+@pytest.mark.parametrize("session_id", ["*", "a:b", "a*", "x" * 65])
+def test_for_session_rejects_unsafe_ids(memory, session_id):
+    with pytest.raises(ValueError):
+        memory.for_session(session_id)
+
+
+@pytest.mark.parametrize("session_id, expected", [
+    (None, "default"), ("", "default"), ("tab-1_A", "tab-1_A"), ("x" * 64, "x" * 64),
+])
+def test_validate_session_id(session_id, expected):
+    assert validate_session_id(session_id) == expected
+
+
+def test_clear_session_leaves_other_sessions_alone(memory):
+    for name in ("a", "ab", "b"):
+        memory.for_session(name).push_log(f"only {name}")
+
+    memory.for_session("a").clear_session()
+
+    assert memory.for_session("a").get_logs() == []
+    assert memory.for_session("ab").get_logs() == ["only ab"]
+    assert memory.for_session("b").get_logs() == ["only b"]
+
+
+def test_sync_and_async_memory_write_the_same_keys(memory, redis_server):
+    def write(session):
+        session.set_intent({"action": "buy_gold"})
+        session.set_plan([{"step_id": 1}])
+        session.set_paused(True)
+        session.set_risk("r")
+        session.push_log("l")
+        session.push_narration("n")
+        session.set_temp("bill", 5)
+        return session.transaction_id(1), session.snapshot()
+
+    async def write_async(session):
+        await session.set_intent({"action": "buy_gold"})
+        await session.set_plan([{"step_id": 1}])
+        await session.set_paused(True)
+        await session.set_risk("r")
+        await session.push_log("l")
+        await session.push_narration("n")
+        await session.set_temp("bill", 5)
+        return await session.transaction_id(1), await session.snapshot()
+
+    sync_txn, sync_snapshot = write(memory.for_session("s"))
+    async_memory = AsyncRedisMemory(client=fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True))
+    async_txn, async_snapshot = asyncio.run(write_async(async_memory.for_session("a")))
+
+    def keys(session_id):
+        prefix = f"session:{session_id}:"
+        return sorted(key[len(prefix):] for key in memory.r.scan_iter(match=f"{prefix}*"))
+
+    assert keys("s") == keys("a")
+    assert sync_txn.split(":")[0::2] == ["s", "1"] and async_txn.split(":")[0::2] == ["a", "1"]
+    assert sync_snapshot.dict(exclude={"cursor"}) == async_snapshot.dict(exclude={"cursor"})
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from services.ledger import HISTORY_KEY, decode_entry, encode_entry, history_type_key
+
+ENTRIES = [
+    {"type": "deposit", "amount": 1000, "details": "Deposit to self"},
+    {"type": "bill_payment", "amount": 950, "details": "Paid tata bill"},
+    {"type": "gold_purchase", "amount": 500, "details": "Digital gold"},
+    {"type": "transfer", "amount": 200, "details": "To mom"},
+]
+
+
+@pytest.fixture
+def ledger(memory):
+    memory.set_profile({"balance": 10000, "bills": {}, "history": ENTRIES})
+    return memory.ledger
+
+
+def test_entries_are_stored_compactly():
+    fields = encode_entry({"id": "1-0", "ts": 1, "type": "transfer", "amount": 200,
+                           "details": "To mom", "txn_id": "s:r:4", "note": None})
+
+    assert fields == {"t": "t", "a": "200", "d": "To mom", "x": "s:r:4"}
+
+
+def test_entries_round_trip():
+    entry = {"type": "bill_payment", "amount": 950, "details": "Paid", "txn_id": "x", "extra": "kept"}
+
+    decoded = decode_entry("1700000000123-0", encode_entry(entry))
+
+    assert decoded == {"id": "1700000000123-0", "ts": 1700000000, **entry}
+
+
+def test_unknown_types_and_non_numeric_amounts_survive():
+    decoded = decode_entry("1000-0", encode_entry({"type": "refund", "amount": "n/a"}))
+
+    assert (decoded["type"], decoded["amount"]) == ("refund", "n/a")
+
+
+def test_history_is_append_only(ledger, memory):
+    first_ids = [e["id"] for e in memory.get_profile()["history"]]
+
+    memory.log_transaction({"type": "deposit", "amount": 5, "details": "manual"})
+
+    history = memory.get_profile()["history"]
+    assert [e["id"] for e in history[:-1]] == first_ids
+    assert history[-1]["details"] == "manual"
+
+
+def test_each_entry_is_indexed_under_its_type_with_the_same_id(ledger, memory):
+    ledger.debit(300, "t1", {"type": "gold_purchase", "details": "Digital gold"})
+
+    main = memory.r.xrevrange(HISTORY_KEY, count=1)[0]
+    indexed = memory.r.xrevrange(history_type_key("gold_purchase"), count=1)[0]
+    assert indexed == main
+    assert memory.r.xlen(history_type_key("gold_purchase")) == 2
+    assert memory.r.xlen(history_type_key("deposit")) == 1
+
+
+def test_profile_returns_the_latest_entries_oldest_first(ledger, memory):
+    history = memory.get_profile(history_limit=2)["history"]
+
+    assert [e["type"] for e in history] == ["gold_purchase", "transfer"]
+
+
+def test_history_since_follows_new_entries(ledger):
+    last = ledger.history(limit=1)[0][0]["id"]
+    assert ledger.history_since(last) == []
+
+    ledger.credit(10, "t1", {"type": "deposit", "details": "later"})
+
+    assert [e["details"] for e in ledger.history_since(last)] == ["later"]
+    assert len(ledger.history_since()) == 5
+
+
+def test_history_maxlen_caps_the_stream(memory):
+    memory.ledger.history_maxlen = 10
+    memory.set_profile({"balance": 0, "bills": {}, "history": []})
+
+    for i in range(500):
+        memory.log_transaction({"type": "deposit", "amount": i, "details": "d"})
+
+    # MAXLEN ~ trims whole nodes, so the cap is approximate
+    assert memory.ledger.history_length() < 500
+    assert memory.ledger.history(limit=1)[0][0]["amount"] == 499
+
+
+def test_archive_moves_old_entries_to_jsonl(ledger, memory, tmp_path):
+    path = tmp_path / "history.jsonl"
+
+    moved = ledger.archive(keep=1, path=str(path), batch=2)
+
+    assert moved == 3
+    archived = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [e["type"] for e in archived] == ["deposit", "bill_payment", "gold_purchase"]
+    assert [e["type"] for e in memory.get_profile()["history"]] == ["transfer"]
+    assert memory.r.xlen(history_type_key("deposit")) == 0
+    assert memory.r.xlen(history_type_key("transfer")) == 1
+
+
+def test_archive_keeps_short_histories(ledger, tmp_path):
+    assert ledger.archive(keep=10, path=str(tmp_path / "history.jsonl")) == 0
+    assert ledger.history_length() == 4
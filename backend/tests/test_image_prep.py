@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+import pytest
+
+from services.image_prep import image_size, prepare_for_vision
+
+
+def encode(img, ext=".png") -> bytes:
+    ok, buf = cv2.imencode(ext, img)
+    assert ok
+    return buf.tobytes()
+
+
+def decode(data: bytes):
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+def noise(h, w):
+    # Incompressible for PNG, so JPEG always comes out smaller
+    return np.random.default_rng(0).integers(0, 256, (h, w, 3), np.uint8)
+
+
+def blocks():
+    # 640x480, white with a red 200x100 box at (100, 50)
+    img = np.full((480, 640, 3), 255, np.uint8)
+    img[50:150, 100:300] = (0, 0, 255)
+    return img
+
+
+def test_crop_box_keeps_only_the_box():
+    out, mime = prepare_for_vision(
+        encode(blocks()), crop_box={"x": 100, "y": 50, "width": 199, "height": 99}, fmt="png",
+    )
+
+    img = decode(out)
+    assert mime == "image/png"
+    assert img.shape[:2] == (100, 200)
+    assert (img == (0, 0, 255)).all()
+
+
+@pytest.mark.parametrize("crop_box, size", [
+    # Clamped to the image
+    ({"x": -20, "y": -20, "width": 60, "height": 60}, (41, 41)),
+    ({"x": 600, "y": 440, "width": 500, "height": 500}, (40, 40)),
+    # Empty or fully outside: no crop
+    ({"x": 10, "y": 10, "width": -5, "height": 5}, (640, 480)),
+    ({"x": 900, "y": 900, "width": 10, "height": 10}, (640, 480)),
+    (None, (640, 480)),
+])
+def test_crop_box_edges(crop_box, size):
+    out, _ = prepare_for_vision(encode(blocks()), crop_box=crop_box, fmt="png")
+
+    assert image_size(out) == size
+
+
+@pytest.mark.parametrize("shape, max_dim, size", [
+    ((1000, 2000), 1024, (1024, 512)),
+    ((2000, 1000), 500, (250, 500)),
+    ((300, 400), 1024, (400, 300)),  # never upscaled
+])
+def test_downscales_past_max_dim(shape, max_dim, size):
+    out, mime = prepare_for_vision(encode(noise(*shape)), max_dim=max_dim, fmt="jpeg")
+
+    assert mime == "image/jpeg"
+    assert image_size(out) == size
+
+
+def test_smaller_reencoding_is_used():
+    png = encode(noise(480, 640))
+
+    out, mime = prepare_for_vision(png, fmt="jpeg", quality=80)
+
+    assert mime == "image/jpeg" and len(out) < len(png)
+
+
+def test_larger_reencoding_falls_back_to_the_original():
+    # A flat screen: PNG beats JPEG
+    png = encode(np.full((480, 640, 3), 255, np.uint8))
+
+    assert prepare_for_vision(png, fmt="jpeg", quality=95) == (png, "image/png")
+
+
+def test_larger_reencoding_of_a_crop_falls_back_to_png():
+    png = encode(blocks())
+
+    out, mime = prepare_for_vision(
+        png, crop_box={"x": 0, "y": 0, "width": 319, "height": 199}, fmt="jpeg", quality=95,
+    )
+
+    assert mime == "image/png"
+    assert image_size(out) == (320, 200)
+
+
+def test_undecodable_input_is_passed_through():
+    assert prepare_for_vision(b"not an image") == (b"not an image", "image/png")
+
+
+def test_image_size():
+    img = noise(30, 40)
+
+    assert image_size(encode(img)) == (40, 30)
+    assert image_size(encode(img, ".jpg")) == (40, 30)
+    assert image_size(b"junk") is None
@@ -0,0 +1,142 @@
+import asyncio
+import io
+import json
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import agents.intent_resolver as intent_resolver
+import batch_intents
+import routes.api as api
+from agents.intent_agent import IntentOutput
+from agents.intent_resolver import resolve_batch
+from services.async_redis_memory import AsyncRedisMemory
+from services.intent_cache import IntentCache
+
+# Neither the rules nor an empty cache answer these, so each one goes to
+# the (stub) LLM; earlier lines take longer, so they finish last
+LLM_LINES = {
+    "mom needs 1000, send it": 0.08,
+    "could you move money for mom": 0.05,
+    "something about dad": 0.02,
+    "help me with gold": 0.0,
+}
+
+
+@pytest.fixture
+def llm(memory, redis_server, monkeypatch):
+    async_memory = AsyncRedisMemory(client=fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True))
+    cache = IntentCache(memory=memory, async_memory=async_memory, version="test")
+    finished = []
+
+    async def run(text):
+        await asyncio.sleep(LLM_LINES[text])
+        finished.append(text)
+        return SimpleNamespace(output=IntentOutput(action="transfer_money", amount=len(text), entity="mom"))
+
+    monkeypatch.setattr(intent_resolver, "intent_cache", cache)
+    monkeypatch.setattr(intent_resolver, "intent_agent", SimpleNamespace(run=run))
+    return finished
+
+
+def batch(lines, **kwargs):
+    async def collect():
+        async def source():
+            for line in lines:
+                yield line
+        return [result async for result in resolve_batch(source(), **kwargs)]
+
+    results = asyncio.run(collect())
+    return results[:-1], results[-1]["summary"]
+
+
+def test_results_keep_input_order_when_the_llm_finishes_out_of_order(llm):
+    lines = [json.dumps({"text": text}) for text in LLM_LINES]
+
+    results, _ = batch(lines, concurrency=4)
+
+    assert llm == list(reversed(LLM_LINES))
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert [r["intent"]["amount"] for r in results] == [len(text) for text in LLM_LINES]
+    assert {r["source"] for r in results} == {"llm"}
+
+
+def test_order_holds_past_the_reorder_window(llm):
+    # concurrency=1 holds back at most 4 results; 8 lines overflow it
+    lines = [json.dumps(text) for text in LLM_LINES] * 2
+
+    results, summary = batch(lines, concurrency=1)
+
+    assert [r["index"] for r in results] == list(range(8))
+    assert [r["intent"]["amount"] for r in results] == [len(text) for text in LLM_LINES] * 2
+    assert summary["count"] == 8
+
+
+def test_bad_lines_become_per_line_errors(llm):
+    lines = [
+        '{"text": "Transfer 2000 to mom"}',
+        "{not json",
+        '{"body": "Transfer 2000 to mom"}',
+        '{"text": "   "}',
+        "",
+        '"help me with gold"',
+    ]
+
+    results, summary = batch(lines)
+
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert results[0]["source"] == "rules"
+    assert "JSONDecodeError" in results[1]["error"]
+    assert "missing 'text'" in results[2]["error"]
+    assert "missing 'text'" in results[3]["error"]
+    # The blank line is skipped, not numbered
+    assert results[4]["source"] == "llm"
+    assert (summary["count"], summary["errors"]) == (5, 3)
+
+
+def test_field_selects_the_command(llm):
+    results, _ = batch(['{"body": "Buy gold for 500", "text": "ignored"}'], field="body")
+
+    assert results[0]["intent"] == {"action": "buy_gold", "amount": 500, "entity": "digital_gold"}
+
+
+def test_summary_line(llm):
+    intent_resolver.intent_cache.put("something about dad", IntentOutput(action="transfer_money", amount=1))
+    lines = ['"Transfer 2000 to mom"', '"something about dad"', '"help me with gold"', "[]"]
+
+    _, summary = batch(lines, concurrency=1)
+
+    assert summary["count"] == 4
+    assert summary["errors"] == 1
+    assert summary["sources"] == {"rules": 1, "cache": 1, "llm": 1}
+    assert summary["elapsed_s"] >= 0 and summary["intents_per_sec"] > 0
+
+
+def test_batch_endpoint_streams_ndjson(llm):
+    app = FastAPI()
+    app.include_router(api.router)
+    body = "\n".join([json.dumps({"text": text}) for text in LLM_LINES] + ["{not json"])
+
+    response = TestClient(app).post("/intent/batch", content=body)
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r.get("index") for r in rows[:-1]] == [0, 1, 2, 3, 4]
+    assert "error" in rows[4]
+    assert rows[-1]["summary"]["count"] == 5
+
+
+def test_batch_cli_writes_results_to_stdout_and_the_summary_to_stderr(llm, capsys):
+    stream = io.StringIO('{"body": "Transfer 2000 to mom"}\n{"text": "x"}\n')
+    out = io.StringIO()
+
+    asyncio.run(batch_intents.run(stream, out, field="body", concurrency=2))
+
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert rows[0]["intent"]["amount"] == 2000
+    assert rows[1] == {"index": 1, "error": "ValueError(\"missing 'body'\")"}
+    summary = json.loads(capsys.readouterr().err)
+    assert (summary["count"], summary["errors"]) == (2, 1)
@@ -0,0 +1,160 @@
+import asyncio
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+
+import agents.intent_resolver as intent_resolver
+from agents.intent_agent import IntentOutput
+from services.async_redis_memory import AsyncRedisMemory
+from services.intent_cache import IntentCache
+from services.metrics import metrics
+
+TO_MOM = IntentOutput(action="transfer_money", amount=1000, entity="mom")
+
+
+@pytest.fixture
+def async_memory(redis_server):
+    return AsyncRedisMemory(client=fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True))
+
+
+@pytest.fixture
+def cache(memory, async_memory):
+    return IntentCache(memory=memory, async_memory=async_memory, ttl=60, version="v1")
+
+
+@pytest.fixture
+def near_cache(memory, async_memory):
+    return IntentCache(memory=memory, async_memory=async_memory, similarity=0.8, version="v1")
+
+
+class BrokenRedis:
+    def get(self, key):
+        raise ConnectionError("down")
+
+    def set(self, *args, **kwargs):
+        raise ConnectionError("down")
+
+
+@pytest.mark.parametrize("again", [
+    "please send Rs. 1,000 to mom",
+    "PLEASE  send ₹1000 to mom!",
+    "please send 1k to mom",
+])
+def test_exact_hit_on_the_normalized_utterance(cache, again):
+    cache.put("please send 1000 rupees to mom", TO_MOM)
+
+    assert cache.get(again) == TO_MOM
+
+
+@pytest.mark.parametrize("other", [
+    "please send 100 to mom",
+    "please send 1000 to tom",
+    "please send 1000 to mom?",
+])
+def test_different_commands_miss(cache, other):
+    cache.put("please send 1000 to mom", TO_MOM)
+
+    assert cache.get(other) is None
+
+
+def test_entries_expire(cache, memory):
+    cache.put("please send 1000 to mom", TO_MOM)
+
+    assert 0 < memory.r.ttl(cache._key("please send 1000 to mom")) <= 60
+
+
+def test_new_agent_version_starts_empty(cache, memory, async_memory):
+    cache.put("please send 1000 to mom", TO_MOM)
+
+    newer = IntentCache(memory=memory, async_memory=async_memory, version="v2")
+
+    assert newer.get("please send 1000 to mom") is None
+
+
+def test_unparseable_entries_miss(cache, memory):
+    memory.r.set(cache._key("please send 1000 to mom"), '{"action": "rob_bank"}')
+
+    assert cache.get("please send 1000 to mom") is None
+
+
+def test_redis_failures_are_misses(cache):
+    cache.memory = SimpleNamespace(r=BrokenRedis())
+    errors = metrics.counter("intent_cache.redis_errors")
+
+    cache.put("please send 1000 to mom", TO_MOM)
+
+    assert cache.get("please send 1000 to mom") is None
+    assert metrics.counter("intent_cache.redis_errors") == errors + 2
+
+
+def test_async_and_sync_share_entries(cache):
+    async def roundtrip():
+        await cache.put_async("send 500 to my brother now", TO_MOM)
+        return await cache.get_async("please send 1000 to mom")
+
+    cache.put("please send 1000 to mom", TO_MOM)
+
+    assert asyncio.run(roundtrip()) == TO_MOM
+    assert cache.get("send 500 to my brother now") == TO_MOM
+
+
+def test_near_duplicates_are_off_by_default(cache):
+    cache.put("please send 1000 to mom", TO_MOM)
+
+    assert cache.get("please send 1000 to mom right now") is None
+
+
+def test_near_duplicate_hit(near_cache):
+    near_cache.put("please send 1000 to mom", TO_MOM)
+
+    assert near_cache.get("please send 1000 to mom now") == TO_MOM
+
+
+@pytest.mark.parametrize("text", [
+    # Amounts must match exactly
+    "please send 1001 to mom now",
+    # The cached entity must appear in the new text
+    "please send 1000 to tom now",
+    # Hedged commands only match exactly
+    "please don't send 1000 to mom",
+    "should i send 1000 to mom",
+])
+def test_near_duplicate_guards(near_cache, text):
+    near_cache.put("please send 1000 to mom", TO_MOM)
+
+    assert near_cache.get(text) is None
+
+
+def test_near_duplicate_index_is_bounded(near_cache):
+    near_cache.near_max = 2
+    for i in range(3):
+        near_cache.put(f"please send 1000 to mom {'x' * i}", TO_MOM)
+
+    assert list(near_cache._near) == ["please send 1000 to mom x", "please send 1000 to mom xx"]
+
+
+def test_llm_answers_are_cached(cache, monkeypatch):
+    calls = []
+
+    async def run(text):
+        calls.append(text)
+        return SimpleNamespace(output=TO_MOM)
+
+    monkeypatch.setattr(intent_resolver, "intent_cache", cache)
+    monkeypatch.setattr(intent_resolver, "intent_agent", SimpleNamespace(run=run))
+
+    async def resolve_twice():
+        return [await intent_resolver.resolve_intent("mom needs 1000, send it") for _ in range(2)]
+
+    assert asyncio.run(resolve_twice()) == [TO_MOM, TO_MOM]
+    assert calls == ["mom needs 1000, send it"]
+
+
+def test_rule_hits_skip_the_cache(cache, monkeypatch):
+    monkeypatch.setattr(intent_resolver, "intent_cache", cache)
+
+    intent, source = asyncio.run(intent_resolver.resolve_fast("Transfer 2000 to mom"))
+
+    assert source == "rules" and intent.amount == 2000
+    assert cache.get("Transfer 2000 to mom") is None
@@ -0,0 +1,60 @@
+import pytest
+
+from agents.intent_rules import normalize_utterance, parse_intent
+
+
+@pytest.mark.parametrize("text, action, amount, entity", [
+    ("Buy 500 rupees gold", "buy_gold", 500, "digital_gold"),
+    ("buy gold for ₹1,200", "buy_gold", 1200, "digital_gold"),
+    ("invest 2k in gold", "buy_gold", 2000, "digital_gold"),
+    ("Transfer 2000 to mom", "transfer_money", 2000, "mom"),
+    ("send rs. 500 to my brother", "transfer_money", 500, "brother"),
+    ("Pay 500 Tata bill", "pay_bill", 500, "tata"),
+    ("pay my adani electricity bill of 1200", "pay_bill", 1200, "adani"),
+    ("add 10000 to my account", "deposit_funds", 10000, "self"),
+    ("top up wallet with 1.5 lakh", "deposit_funds", 150000, "self"),
+])
+def test_parses_regular_commands(text, action, amount, entity):
+    intent = parse_intent(text)
+
+    assert intent is not None
+    assert (intent.action, intent.amount, intent.entity) == (action, amount, entity)
+
+
+@pytest.mark.parametrize("text", [
+    # No recipient keyword, so the payee is ambiguous
+    "pay rahul 500",
+    # Several actions or amounts
+    "buy gold for 500 and send 200 to mom",
+    "pay tata and adani bill 500",
+    # Negated, conditional or a question
+    "don't buy gold for 500",
+    "should i buy gold for 500",
+    "if gold is cheap buy 500",
+    "buy gold for 500?",
+    # Quantities are not rupees
+    "buy 2 grams of gold",
+    "buy 2g gold",
+    "buy 2 gm gold",
+    "buy 1 kg gold",
+    "buy 10 units of gold",
+    "buy 5 gold coins for 500",
+    "buy 3 shares of gold",
+    "buy gold worth 500 grams",
+    # Missing or non-whole amounts
+    "pay tata bill",
+    "buy gold for 500.50",
+    "",
+])
+def test_ambiguous_commands_fall_back_to_the_llm(text):
+    assert parse_intent(text) is None
+
+
+@pytest.mark.parametrize("text, normalized", [
+    ("Buy gold for Rs. 1,200!", "buy gold for 1200"),
+    ("buy gold for ₹1200", "buy gold for 1200"),
+    ("buy gold for 1.2k", "buy gold for 1200"),
+    ("Buy  GOLD for 500?", "buy gold for 500 ?"),
+])
+def test_normalize_utterance(text, normalized):
+    assert normalize_utterance(text) == normalized
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+import services.job_queue as job_queue
+from services.job_queue import CANCELLED, COMPLETED, FAILED, ExecutorPool, QueueFull
+
+
+@pytest.fixture(autouse=True)
+def pool_memory(memory, monkeypatch):
+    monkeypatch.setattr(job_queue, "redis_memory", memory)
+    return memory
+
+
+class StubExecutor:
+    def __init__(self):
+        self.sessions = []
+
+    def run(self, session_id):
+        self.sessions.append(session_id)
+
+
+def wait_for(pool, job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while job.status not in (COMPLETED, FAILED, CANCELLED):
+        assert time.monotonic() < deadline, f"job {job.id} still {job.status}"
+        time.sleep(0.01)
+    return job
+
+
+def test_cancelled_queued_jobs_free_their_slot():
+    pool = ExecutorPool(executor_factory=StubExecutor, workers=0, max_queue=1)
+    first = pool.submit("a")
+    with pytest.raises(QueueFull):
+        pool.submit("b")
+
+    pool.cancel(first.id)
+
+    assert pool.submit("b").status == "queued"
+    assert pool.stats()["queue_depth"] == 1
+
+
+def test_worker_skips_cancelled_jobs():
+    executor = StubExecutor()
+    pool = ExecutorPool(executor_factory=lambda: executor, workers=0, max_queue=2)
+    cancelled = pool.submit("a")
+    pool.cancel(cancelled.id)
+    job = pool.submit("b")
+
+    pool.workers = 1
+    pool.start()
+    try:
+        assert wait_for(pool, job).status == COMPLETED
+    finally:
+        pool.shutdown()
+
+    assert executor.sessions == ["b"]
+    assert pool.stats()["queue_depth"] == 0
+
+
+def test_factory_errors_fail_the_job_and_keep_the_worker(pool_memory):
+    executor = StubExecutor()
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) <= 2:
+            raise RuntimeError("selector map is stale")
+        return executor
+
+    pool = ExecutorPool(executor_factory=factory, workers=1, max_queue=2)
+    pool.start()
+    try:
+        failed = wait_for(pool, pool.submit("a"))
+        completed = wait_for(pool, pool.submit("b"))
+    finally:
+        pool.shutdown()
+
+    assert (failed.status, failed.error) == (FAILED, "Executor could not be started")
+    assert pool_memory.for_session("a").get_logs(limit=1) == [
+        "Execution failed: Executor could not be started",
+    ]
+    assert completed.status == COMPLETED and executor.sessions == ["b"]
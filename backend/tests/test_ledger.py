@@ -0,0 +1,159 @@
+import threading
+
+import pytest
+
+from services.ledger import DEFAULT_PROFILE
+
+PROFILE = {"balance": 10000, "bills": {"tata": 950, "adani": 0}, "history": []}
+GOLD = {"type": "gold_purchase", "details": "Digital gold"}
+DEPOSIT = {"type": "deposit", "details": "Deposit to self"}
+TATA = {"type": "bill_payment", "details": "Paid tata bill"}
+
+
+@pytest.fixture
+def ledger(memory):
+    memory.set_profile(PROFILE)
+    return memory.ledger
+
+
+def test_debit_moves_money_and_records_history(ledger):
+    result = ledger.debit(500, "t1", GOLD)
+
+    assert (result.status, result.balance, result.amount) == ("ok", 9500, 500)
+    assert result.applied
+    assert ledger.balance() == 9500
+    entry = ledger.history(limit=1)[0][0]
+    assert (entry["type"], entry["amount"], entry["txn_id"]) == ("gold_purchase", 500, "t1")
+
+
+def test_credit_moves_money(ledger):
+    assert ledger.credit(2500, "t1", DEPOSIT).balance == 12500
+    assert ledger.balance() == 12500
+
+
+def test_insufficient_funds_changes_nothing(ledger):
+    result = ledger.debit(20000, "t1", GOLD)
+
+    assert (result.status, result.balance) == ("insufficient_funds", 10000)
+    assert not result.applied
+    assert ledger.balance() == 10000
+    assert ledger.history_length() == 0
+
+
+@pytest.mark.parametrize("amount", [0, -5])
+def test_non_positive_amounts_are_refused(ledger, amount):
+    with pytest.raises(ValueError):
+        ledger.debit(amount, "t1", GOLD)
+
+
+def test_pay_bill_debits_what_is_due_and_zeroes_it(ledger):
+    result = ledger.pay_bill("tata", "t1", TATA)
+
+    assert (result.status, result.balance, result.amount) == ("ok", 9050, 950)
+    assert ledger.bill("tata") == 0
+    assert ledger.history(limit=1)[0][0]["amount"] == 950
+
+
+def test_pay_bill_refuses_a_changed_bill(ledger):
+    result = ledger.pay_bill("tata", "t1", TATA, expected=900)
+
+    assert (result.status, result.amount) == ("bill_changed", 950)
+    assert ledger.balance() == 10000
+    assert ledger.bill("tata") == 950
+
+
+@pytest.mark.parametrize("biller", ["adani", "unknown"])
+def test_nothing_due_is_no_bill(ledger, biller):
+    assert ledger.pay_bill(biller, "t1", TATA).status == "no_bill"
+    assert ledger.balance() == 10000
+
+
+def test_same_transaction_id_is_applied_once(ledger):
+    first = ledger.debit(500, "t1", GOLD)
+    retry = ledger.debit(500, "t1", GOLD)
+
+    assert (retry.status, retry.balance, retry.amount) == ("duplicate", first.balance, 500)
+    assert retry.applied
+    assert ledger.balance() == 9500
+    assert ledger.history_length() == 1
+
+
+def test_retried_bill_payment_reports_the_original_amount(ledger):
+    ledger.pay_bill("tata", "t1", TATA)
+
+    retry = ledger.pay_bill("tata", "t1", TATA)
+
+    assert (retry.status, retry.amount) == ("duplicate", 950)
+    assert ledger.balance() == 9050
+
+
+def test_refused_transaction_can_be_retried(ledger):
+    ledger.debit(20000, "t1", GOLD)
+    ledger.credit(15000, "t2", DEPOSIT)
+
+    assert ledger.debit(20000, "t1", GOLD).status == "ok"
+    assert ledger.balance() == 5000
+
+
+def test_transaction_ids_expire(memory):
+    memory.ledger.txn_ttl = 60
+    memory.set_profile(PROFILE)
+    memory.ledger.debit(500, "t1", GOLD)
+
+    assert 0 < memory.r.ttl("ledger:txn:t1") <= 60
+
+
+def test_concurrent_debits_never_overdraw(ledger):
+    results = []
+
+    def buy(i):
+        results.append(ledger.debit(1500, f"t{i}", GOLD))
+
+    threads = [threading.Thread(target=buy, args=(i,)) for i in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sum(r.status == "ok" for r in results) == 6
+    assert ledger.balance() == 1000
+    assert ledger.history_length() == 6
+
+
+def test_transaction_id_is_stable_within_a_run(memory):
+    session = memory.for_session("a")
+    session.set_plan_json("[]")
+    first = session.transaction_id(3)
+
+    assert session.transaction_id(3) == first
+    assert session.transaction_id(4) != first
+    assert memory.for_session("b").transaction_id(3) != first
+
+
+def test_new_plan_gets_new_transaction_ids(memory):
+    session = memory.for_session("a")
+    session.set_plan_json("[]")
+    first = session.transaction_id(3)
+
+    session.set_plan_json("[]")
+
+    assert session.transaction_id(3) != first
+
+
+def test_empty_ledger_reads_the_default_profile(memory):
+    profile = memory.get_profile()
+
+    assert profile == DEFAULT_PROFILE
+    assert profile is not DEFAULT_PROFILE
+
+
+def test_reset_replaces_balance_bills_and_history(ledger, memory):
+    ledger.debit(500, "t1", GOLD)
+
+    memory.set_profile({"balance": 7, "bills": {"adani": 3},
+                        "history": [{"type": "deposit", "amount": 7, "details": "seed"}]})
+
+    assert memory.get_profile()["balance"] == 7
+    assert memory.get_profile()["bills"] == {"adani": 3}
+    assert [e["details"] for e in memory.get_profile()["history"]] == ["seed"]
+    assert ledger.history(entry_type="gold_purchase")[0] == []
@@ -0,0 +1,192 @@
+from typing import List
+
+import fakeredis
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+import routes.api as api
+from agents.executor_agent import NAVIGATING_TARGETS, SELECTOR_MAP, ExecutorAgent
+from agents.plan_compiler import FUSABLE_ACTIONS, compile_plan_runs, is_safety_boundary
+from agents.planner_agent import PLAN_TEMPLATES, PlanOutput, PlanStep, plan_for_intent
+from services.async_redis_memory import AsyncRedisMemory
+
+INTENTS = {
+    "buy_gold": {"action": "buy_gold", "amount": 500, "entity": "digital_gold"},
+    "pay_bill": {"action": "pay_bill", "amount": None, "entity": "tata"},
+    "transfer_money": {"action": "transfer_money", "amount": 2000, "entity": "mom"},
+    "deposit_funds": {"action": "deposit_funds", "amount": 3000, "entity": "self"},
+}
+
+
+def plan(action):
+    return [step.dict() for step in plan_for_intent(INTENTS[action]).steps]
+
+
+def compile_runs(steps):
+    return compile_plan_runs(steps, SELECTOR_MAP, NAVIGATING_TARGETS)
+
+
+def shape(runs):
+    return {start: ([s["action"] for s in run.steps], run.navigates) for start, run in runs.items()}
+
+
+def test_templates_cover_every_intent():
+    assert set(INTENTS) == set(PLAN_TEMPLATES)
+
+
+# ------------------------------------
+# Pre-serialized plans
+# ------------------------------------
+@pytest.mark.parametrize("action", sorted(PLAN_TEMPLATES))
+@pytest.mark.parametrize("entity", [None, "mom", "Maa \"ji\" ₹"])
+def test_precompiled_json_matches_pydantic(action, entity):
+    compiled = plan_for_intent({**INTENTS[action], "entity": entity})
+    steps = list(compiled.steps)
+
+    assert compiled.steps_json == TypeAdapter(List[PlanStep]).dump_json(steps).decode()
+    assert compiled.response_json == PlanOutput(steps=steps).json()
+
+
+@pytest.mark.parametrize("amount", ["abc", 2.5, float("inf"), float("nan"), [1]])
+def test_bad_amounts_are_value_errors(amount):
+    with pytest.raises(ValueError):
+        plan_for_intent({"action": "buy_gold", "amount": amount, "entity": "digital_gold"})
+
+
+def test_plan_route_reports_a_bad_amount(memory, redis_server, monkeypatch):
+    async_memory = AsyncRedisMemory(client=fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True))
+    monkeypatch.setattr(api, "async_redis_memory", async_memory)
+    memory.for_session("a").set_intent({"action": "buy_gold", "amount": "lots", "entity": "digital_gold"})
+    app = FastAPI()
+    app.include_router(api.router)
+
+    response = TestClient(app).post("/plan", params={"session_id": "a"})
+
+    assert response.status_code == 200
+    assert response.json() == {"error": "Amount must be a whole number: lots"}
+    assert memory.for_session("a").get_plan() is None
+
+
+@pytest.mark.parametrize("action, expected", [
+    ("buy_gold", {2: (["enter_amount", "click"], True)}),
+    ("pay_bill", {4: (["enter_amount", "click"], True)}),
+    ("transfer_money", {2: (["select_beneficiary", "enter_amount", "click"], True)}),
+    ("deposit_funds", {}),
+])
+def test_template_runs(action, expected):
+    assert shape(compile_runs(plan(action))) == expected
+
+
+@pytest.mark.parametrize("action", sorted(PLAN_TEMPLATES))
+def test_no_run_crosses_a_safety_boundary(action):
+    steps = plan(action)
+
+    for run in compile_runs(steps).values():
+        assert list(run.steps) == steps[run.start:run.end]
+        for step in run.steps:
+            assert step["action"] in FUSABLE_ACTIONS
+            assert not is_safety_boundary(step)
+
+
+@pytest.mark.parametrize("step", [
+    {"action": "click", "target": "submit_bill_button", "requires_pause": True},
+    {"action": "pause_for_approval", "requires_pause": True},
+    {"action": "confirm_payment"},
+    {"action": "confirm_transfer"},
+    {"action": "submit_form"},
+    {"action": "fetch_bill_amount"},
+    {"action": "enter_amount", "requires_pause": True},
+])
+def test_safety_boundaries(step):
+    assert is_safety_boundary(step)
+
+
+@pytest.mark.parametrize("boundary", [
+    {"action": "click", "target": "proceed_button", "requires_pause": True},
+    {"action": "pause_for_approval", "requires_pause": True},
+    {"action": "confirm_payment"},
+    {"action": "fetch_bill_amount", "entity": "tata"},
+    {"action": "navigate", "page": "index"},
+])
+def test_boundary_splits_a_run(boundary):
+    steps = [
+        {"action": "select_biller", "entity": "tata"},
+        {"action": "enter_amount", "amount": 5},
+        boundary,
+        {"action": "select_beneficiary", "entity": "mom"},
+        {"action": "enter_amount", "amount": 5},
+    ]
+
+    assert shape(compile_runs(steps)) == {
+        0: (["select_biller", "enter_amount"], False),
+        3: (["select_beneficiary", "enter_amount"], False),
+    }
+
+
+def test_navigating_click_ends_a_run():
+    steps = [
+        {"action": "enter_amount", "amount": 5},
+        {"action": "click", "target": "proceed_button"},
+        {"action": "select_beneficiary", "entity": "mom"},
+        {"action": "enter_amount", "amount": 5},
+    ]
+
+    assert shape(compile_runs(steps)) == {
+        0: (["enter_amount", "click"], True),
+        2: (["select_beneficiary", "enter_amount"], False),
+    }
+
+
+def test_click_on_an_unmapped_target_is_not_fused():
+    steps = [
+        {"action": "enter_amount", "amount": 5},
+        {"action": "click", "target": "digital_gold"},
+        {"action": "enter_amount", "amount": 5},
+    ]
+
+    assert compile_runs(steps) == {}
+
+
+def test_single_steps_are_not_runs():
+    steps = [
+        {"action": "click", "target": "invest_button"},
+        {"action": "enter_amount", "amount": 5},
+        {"action": "pause_for_approval", "requires_pause": True},
+    ]
+
+    assert compile_runs(steps) == {}
+
+
+@pytest.fixture
+def executor():
+    return ExecutorAgent()
+
+
+def test_fusion_can_be_switched_off(executor):
+    steps = plan("transfer_money")
+    assert executor.compile_runs(steps)
+
+    executor.fusion = False
+    assert executor.compile_runs(steps) == {}
+
+
+def test_human_pacing_disables_fusion(executor):
+    executor.pacing.enabled = True
+
+    assert executor.compile_runs(plan("transfer_money")) == {}
+
+
+def test_fused_ops_match_the_single_step_handlers(executor):
+    run = compile_runs(plan("transfer_money"))[2]
+
+    assert executor.fused_ops(run.steps) == [
+        {"op": "fill", "selector": "#recipient", "value": "mom"},
+        {"op": "fill", "selector": "input#amount", "value": "2000"},
+        {"op": "click", "selector": SELECTOR_MAP["proceed_button"]},
+    ]
+    assert executor.fused_log_lines(run.steps) == [
+        "Typed amount (human-like): 2000",
+        "Clicking proceed_button",
+    ]
@@ -0,0 +1,122 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.api as api
+from services.ledger import HISTORY_KEY, encode_entry, history_type_key
+
+TYPES = ["deposit", "bill_payment", "gold_purchase", "transfer"]
+
+
+@pytest.fixture
+def ledger(memory):
+    """
+    12 entries one second apart (ts 1000..1011), types in rotation.
+    Written with explicit ids so time filters are deterministic.
+    """
+    memory.set_profile({"balance": 0, "bills": {}, "history": []})
+    for i in range(12):
+        entry_type = TYPES[i % len(TYPES)]
+        fields = encode_entry({"type": entry_type, "amount": i, "details": f"#{i}"})
+        entry_id = f"{(1000 + i) * 1000}-0"
+        memory.r.xadd(HISTORY_KEY, fields, id=entry_id)
+        memory.r.xadd(history_type_key(entry_type), fields, id=entry_id)
+    return memory.ledger
+
+
+@pytest.fixture
+def client(memory, ledger, monkeypatch):
+    monkeypatch.setattr(api, "redis_memory", memory)
+    app = FastAPI()
+    app.include_router(api.router)
+    return TestClient(app)
+
+
+def amounts(entries):
+    return [e["amount"] for e in entries]
+
+
+def test_pages_newest_first_until_the_cursor_runs_out(ledger):
+    pages, cursor = [], None
+    while True:
+        entries, cursor = ledger.history(limit=5, before=cursor)
+        pages.append(amounts(entries))
+        if cursor is None:
+            break
+
+    assert pages == [[11, 10, 9, 8, 7], [6, 5, 4, 3, 2], [1, 0]]
+
+
+def test_exact_last_page_needs_one_empty_read(ledger):
+    entries, cursor = ledger.history(limit=6)
+    entries, cursor = ledger.history(limit=6, before=cursor)
+    assert amounts(entries) == [5, 4, 3, 2, 1, 0] and cursor is not None
+
+    assert ledger.history(limit=6, before=cursor) == ([], None)
+
+
+def test_new_entries_do_not_shift_an_open_cursor(ledger, memory):
+    _, cursor = ledger.history(limit=4)
+
+    memory.log_transaction({"type": "deposit", "amount": 99, "details": "new"})
+
+    assert amounts(ledger.history(limit=4, before=cursor)[0]) == [7, 6, 5, 4]
+
+
+def test_type_filter_pages_its_own_entries(ledger):
+    entries, cursor = ledger.history(limit=2, entry_type="gold_purchase")
+    assert amounts(entries) == [10, 6]
+    assert {e["type"] for e in entries} == {"gold_purchase"}
+
+    entries, cursor = ledger.history(limit=2, entry_type="gold_purchase", before=cursor)
+    assert amounts(entries) == [2] and cursor is None
+
+
+def test_unknown_type_is_empty(ledger):
+    assert ledger.history(entry_type="refund") == ([], None)
+
+
+def test_time_bounds_are_inclusive(ledger):
+    entries, _ = ledger.history(since=1003, until=1005)
+
+    assert amounts(entries) == [5, 4, 3]
+    assert [e["ts"] for e in entries] == [1005, 1004, 1003]
+
+
+def test_filters_combine(ledger):
+    entries, _ = ledger.history(entry_type="deposit", since=1001, until=1008)
+
+    assert amounts(entries) == [8, 4]
+
+
+def test_endpoint_pages_with_next_cursor(client):
+    first = client.get("/profile/history", params={"limit": 8}).json()
+    second = client.get("/profile/history",
+                        params={"limit": 8, "cursor": first["next_cursor"]}).json()
+
+    assert amounts(first["entries"]) == [11, 10, 9, 8, 7, 6, 5, 4]
+    assert amounts(second["entries"]) == [3, 2, 1, 0]
+    assert second["next_cursor"] is None
+
+
+def test_endpoint_filters(client):
+    body = client.get("/profile/history",
+                      params={"type": "transfer", "since": 1004, "until": 1011}).json()
+
+    assert amounts(body["entries"]) == [11, 7]
+
+
+@pytest.mark.parametrize("params", [
+    {"limit": 0},
+    {"limit": 201},
+    {"cursor": "latest"},
+    {"type": "gold purchase"},
+])
+def test_endpoint_rejects_bad_parameters(client, params):
+    assert client.get("/profile/history", params=params).status_code == 422
+
+
+def test_profile_summary_has_no_history(client):
+    body = client.get("/profile").json()
+
+    assert body == {"balance": 0, "bills": {}, "history_count": 12}
@@ -0,0 +1,38 @@
+import asyncio
+
+import fakeredis
+
+from services.async_redis_memory import AsyncRedisMemory
+from services.redis_memory import RedisMemory
+from services.redis_pool import REDIS_BLOCKING_MAX_CONNECTIONS, REDIS_MAX_CONNECTIONS, pool_stats
+
+
+def test_blocking_commands_get_their_own_pool(memory):
+    # Building clients doesn't connect, so no Redis server is needed
+    default = RedisMemory(screenshots=memory.screenshots)
+
+    assert default.blocking_r is not default.r
+    assert default.r.connection_pool.max_connections == REDIS_MAX_CONNECTIONS
+    assert default.blocking_r.connection_pool.max_connections == REDIS_BLOCKING_MAX_CONNECTIONS
+    assert default.for_session("a").blocking_r is default.blocking_r
+    assert set(pool_stats()["sync"]) >= {"commands_text", "blocking_text"}
+
+
+def test_async_blocking_commands_get_their_own_pool():
+    async def clients():
+        memory = AsyncRedisMemory().for_session("a")
+        return memory.r, memory.blocking_r
+
+    r, blocking_r = asyncio.run(clients())
+
+    assert blocking_r is not r
+    assert blocking_r.connection_pool.max_connections == REDIS_BLOCKING_MAX_CONNECTIONS
+
+
+def test_an_injected_client_serves_blocking_commands_too(memory, redis_server):
+    assert memory.blocking_r is memory.r
+    assert memory.for_session("a").blocking_r is memory.r
+
+    default = RedisMemory(screenshots=memory.screenshots)
+    default.r = fakeredis.FakeRedis(server=redis_server, decode_responses=True)
+    assert default.blocking_r is default.r
@@ -0,0 +1,193 @@
+import asyncio
+
+import cv2
+import numpy as np
+import pytest
+
+from services.image_prep import VISION_CROP_SELECTOR
+from services.screen_verifier import TieredVerifier, judge_dom, judge_visibility
+
+AMOUNT_BOX = {"x": 100, "y": 260, "width": 200, "height": 40}
+CONTAINER_BOX = {"x": 60, "y": 60, "width": 520, "height": 360}
+VLM_PASS = {"screen_valid": True, "amount_match": True, "entity_match": True, "notes": "vlm"}
+
+
+def screenshot(draw_amount: bool = True) -> bytes:
+    img = np.full((480, 640, 3), 255, np.uint8)
+    if draw_amount:
+        cv2.putText(img, "Rs 500", (110, 290), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+    ok, buf = cv2.imencode(".png", img)
+    assert ok
+    return buf.tobytes()
+
+
+def facts(screen="transfer_confirm", amount="₹500", entity="mom", **overrides):
+    return {
+        "path": f"/{screen}.html",
+        "amount": amount,
+        "entity": entity,
+        "body": "Confirm your transfer",
+        "amount_box": AMOUNT_BOX,
+        "amount_visible": True,
+        "amount_on_top": True,
+        "container_box": CONTAINER_BOX,
+        **overrides,
+    }
+
+
+class StubPage:
+    def __init__(self, result, is_async=False):
+        self.result = result
+        self.is_async = is_async
+
+    def evaluate(self, script, spec):
+        if self.is_async:
+            async def result():
+                return self.result
+            return result()
+        return self.result
+
+
+class StubBrowser:
+    def __init__(self, page_facts, png, is_async=False):
+        self.page = StubPage(page_facts, is_async)
+        self.png = png
+        self.is_async = is_async
+        self.screenshots = []
+
+    def screenshot(self, selector=None):
+        self.screenshots.append(selector)
+        if self.is_async:
+            async def result():
+                return self.png
+            return result()
+        return self.png
+
+
+class StubVision:
+    def __init__(self):
+        self.calls = []
+
+    def verify_confirmation_screen(self, **kwargs):
+        self.calls.append(kwargs)
+        return VLM_PASS
+
+    async def verify_confirmation_screen_async(self, **kwargs):
+        return self.verify_confirmation_screen(**kwargs)
+
+
+# ------------------------------------
+# DOM tier
+# ------------------------------------
+def test_dom_match():
+    verdict = judge_dom(facts(), "transfer_confirm", 500, "mom")
+
+    assert (verdict["screen_valid"], verdict["amount_match"], verdict["entity_match"]) == (True, True, True)
+
+
+@pytest.mark.parametrize("page, field", [
+    (facts(amount="₹5,000"), "amount_match"),
+    (facts(entity="tom"), "entity_match"),
+    (facts(path="/transfer.html"), "screen_valid"),
+])
+def test_dom_mismatch(page, field):
+    assert judge_dom(page, "transfer_confirm", 500, "mom")[field] is False
+
+
+def test_dom_amount_and_entity_are_normalized():
+    verdict = judge_dom(facts(amount="Rs 1,200.00", entity=" Mom "), "transfer_confirm", 1200, "mom")
+
+    assert verdict["amount_match"] and verdict["entity_match"]
+
+
+def test_gold_entity_comes_from_the_page_text():
+    page = facts(screen="gold_confirm", entity=None, body="Buy Digital Gold")
+
+    assert judge_dom(page, "gold_confirm", 500, "digital_gold")["entity_match"]
+    assert not judge_dom({**page, "body": "Buy Silver"}, "gold_confirm", 500, "digital_gold")["entity_match"]
+
+
+@pytest.mark.parametrize("page, screen", [
+    (facts(amount=None), "transfer_confirm"),
+    (facts(amount="pending"), "transfer_confirm"),
+    (facts(entity=""), "transfer_confirm"),
+    (facts(), "unknown_confirm"),
+    (None, "transfer_confirm"),
+])
+def test_dom_inconclusive(page, screen):
+    assert judge_dom(page, screen, 500, "mom") is None
+
+
+# ------------------------------------
+# Visibility tier
+# ------------------------------------
+def test_visibility_confirms_a_drawn_amount():
+    assert judge_visibility(facts(), screenshot())
+
+
+@pytest.mark.parametrize("page, png", [
+    (facts(), screenshot(draw_amount=False)),
+    (facts(amount_visible=False), screenshot()),
+    (facts(amount_on_top=False), screenshot()),
+    (facts(amount_box=None), screenshot()),
+    (facts(amount_box={"x": 900, "y": 900, "width": 10, "height": 10}), screenshot()),
+    (facts(), b"not a png"),
+])
+def test_visibility_fails(page, png):
+    assert not judge_visibility(page, png)
+
+
+# ------------------------------------
+# Tier selection
+# ------------------------------------
+def verify(page_facts, png, is_async=False, screen="transfer_confirm"):
+    vision = StubVision()
+    verifier = TieredVerifier(vision)
+    browser = StubBrowser(page_facts, png, is_async)
+    if is_async:
+        verdict = asyncio.run(verifier.verify_async(browser, screen, 500, "mom"))
+    else:
+        verdict = verifier.verify(browser, screen, 500, "mom")
+    return verdict, vision.calls, browser.screenshots
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_dom_tier_decides_without_the_vlm(is_async):
+    verdict, vlm_calls, _ = verify(facts(), screenshot(), is_async)
+
+    assert verdict["tier"] == "dom" and verdict["amount_match"]
+    assert vlm_calls == []
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_visible_dom_mismatch_fails_closed_without_the_vlm(is_async):
+    verdict, vlm_calls, _ = verify(facts(amount="₹5000"), screenshot(), is_async)
+
+    assert verdict["tier"] == "dom" and verdict["amount_match"] is False
+    assert vlm_calls == []
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_hidden_amount_escalates_to_the_vlm(is_async):
+    verdict, vlm_calls, _ = verify(facts(amount_on_top=False), screenshot(), is_async)
+
+    assert verdict == {**VLM_PASS, "tier": "vlm"}
+    assert len(vlm_calls) == 1
+    assert vlm_calls[0]["crop_box"] == CONTAINER_BOX
+    assert vlm_calls[0]["expected_amount"] == 500
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_inconclusive_dom_escalates_to_the_vlm(is_async):
+    verdict, vlm_calls, _ = verify(facts(amount=None), screenshot(), is_async)
+
+    assert verdict["tier"] == "vlm" and len(vlm_calls) == 1
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_unknown_screen_sends_only_the_container(is_async):
+    verdict, vlm_calls, screenshots = verify(facts(), screenshot(), is_async, screen="refund_confirm")
+
+    assert verdict["tier"] == "vlm"
+    assert screenshots == [VISION_CROP_SELECTOR]
+    assert vlm_calls[0]["crop_box"] is None
@@ -0,0 +1,101 @@
+import cv2
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.api as api
+from services.image_prep import image_size
+
+
+@pytest.fixture
+def store(memory, monkeypatch):
+    monkeypatch.setattr(api, "screenshot_store", memory.screenshots)
+    return memory.screenshots
+
+
+@pytest.fixture
+def client(store):
+    app = FastAPI()
+    app.include_router(api.router)
+    return TestClient(app)
+
+
+def png(w=800, h=400) -> bytes:
+    img = np.zeros((h, w, 3), np.uint8)
+    img[:, : w // 2] = 255
+    ok, buf = cv2.imencode(".png", img)
+    assert ok
+    return buf.tobytes()
+
+
+def test_serves_the_png_with_its_hash_as_etag(client, store):
+    image = png()
+    digest = store.put(image)
+
+    response = client.get(f"/screenshot/{digest}")
+
+    assert response.status_code == 200
+    assert response.content == image
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["etag"] == f'"{digest}"'
+    assert "immutable" in response.headers["cache-control"]
+
+
+@pytest.mark.parametrize("if_none_match", ['"{d}"', 'W/"x", "{d}"', ' "other" , "{d}" '])
+def test_matching_etag_is_a_304(client, store, if_none_match):
+    digest = store.put(png())
+
+    response = client.get(f"/screenshot/{digest}", headers={"If-None-Match": if_none_match.format(d=digest)})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == f'"{digest}"'
+
+
+def test_other_etag_gets_the_image(client, store):
+    digest = store.put(png())
+
+    response = client.get(f"/screenshot/{digest}", headers={"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200 and response.content
+
+
+def test_thumbnail(client, store):
+    digest = store.put(png(800, 400))
+
+    response = client.get(f"/screenshot/{digest}", params={"max_dim": 200})
+
+    assert response.status_code == 200
+    assert image_size(response.content) == (200, 100)
+    assert response.headers["etag"] == f'"{digest}-200"'
+    # Cached next to the original
+    assert store.r.get(store._key(digest, 200)) == response.content
+
+
+def test_thumbnail_has_its_own_etag(client, store):
+    digest = store.put(png())
+
+    full = client.get(f"/screenshot/{digest}", params={"max_dim": 200}, headers={"If-None-Match": f'"{digest}"'})
+    thumb = client.get(f"/screenshot/{digest}", params={"max_dim": 200}, headers={"If-None-Match": f'"{digest}-200"'})
+
+    assert (full.status_code, thumb.status_code) == (200, 304)
+
+
+def test_thumbnail_never_upscales(client, store):
+    digest = store.put(png(100, 50))
+
+    assert image_size(client.get(f"/screenshot/{digest}", params={"max_dim": 400}).content) == (100, 50)
+
+
+@pytest.mark.parametrize("digest", ["0" * 64, "not-a-hash"])
+@pytest.mark.parametrize("params", [{}, {"max_dim": 200}])
+def test_unknown_screenshot_is_a_404(client, digest, params):
+    assert client.get(f"/screenshot/{digest}", params=params).status_code == 404
+
+
+@pytest.mark.parametrize("max_dim", [8, 4096])
+def test_max_dim_is_bounded(client, store, max_dim):
+    digest = store.put(png())
+
+    assert client.get(f"/screenshot/{digest}", params={"max_dim": max_dim}).status_code == 422
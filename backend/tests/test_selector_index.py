@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+from agents.executor_agent import NAVIGATING_TARGETS, SELECTOR_MAP, ExecutorAgent, plan_click_targets
+from services.metrics import metrics
+from services.selector_index import (
+    SelectorIndex, crawl_dummy_bank, crawl_page, load_selector_index, page_from_url, parse_selector,
+)
+
+PAGE = """
+<html><body>
+  <button id="go" onclick="location.href='next.html'">Go</button>
+  <button id="bound">Bound</button>
+  <button id="stay" class="btn primary" onclick="toggle()">Stay</button>
+  <a href="home.html">Back to <b>Home</b></a>
+  <input id="amount" type="number" name="amt">
+  <span class="dup">1</span><span class="dup">2</span>
+  <script>
+    document.getElementById("bound").onclick = () => { location = "done.html"; };
+  </script>
+</body></html>
+"""
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SelectorIndex({"page": crawl_page(PAGE)})
+
+
+@pytest.fixture(scope="module")
+def dummy_bank():
+    return crawl_dummy_bank()
+
+
+@pytest.mark.parametrize("selector, parts", [
+    ("#go", (None, ["go"], [], [])),
+    ("button.btn.primary", ("button", [], ["btn", "primary"], [])),
+    ("input#amount[type=number]", ("input", ["amount"], [], [("type", "number")])),
+    ("input[name='amt']", ("input", [], [], [("name", "amt")])),
+    ("input[name]", ("input", [], [], [("name", None)])),
+])
+def test_parse_selector(selector, parts):
+    assert parse_selector(selector) == parts
+
+
+@pytest.mark.parametrize("selector", ["", "div > #go", "#a #b", "button:has-text('Go')", "a:hover"])
+def test_selectors_the_index_cannot_check(selector):
+    assert parse_selector(selector) is None
+
+
+@pytest.mark.parametrize("url, page", [
+    ("http://localhost:5500/dummy_bank/gold.html?amount=5", "gold"),
+    ("file:///x/dummy_bank/index.html#top", "index"),
+    ("about:blank", None),
+    (None, None),
+])
+def test_page_from_url(url, page):
+    assert page_from_url(url) == page
+
+
+def test_crawl_records_navigation(index):
+    elements = {el.selector: el for el in index.pages["page"]}
+
+    assert (elements["#go"].navigates, elements["#go"].navigates_to) == (True, "next")
+    assert (elements["#bound"].navigates, elements["#bound"].navigates_to) == (True, None)
+    assert elements["#stay"].navigates is True  # inline handler on a page that redirects
+    assert elements['a:has-text("Back to Home")'].navigates_to == "home"
+    assert elements["#amount"].navigates is False
+
+
+def test_find_and_expects(index):
+    assert [el.id for el in index.find("page", "button.btn")] == ["stay"]
+    assert len(index.find("page", "span.dup")) == 2
+    assert index.expects("page", "#amount") is True
+    assert index.expects("page", "#missing") is False
+    # Unknown page or uncheckable selector: let the DOM decide
+    assert index.expects("other", "#go") is None
+    assert index.expects(None, "#go") is None
+    assert index.expects("page", "div > #go") is None
+
+
+def test_validate_reports_each_kind_of_problem(index):
+    problems = index.validate(
+        {"go": "#go", "amount": "#amount", "gone": "#gone", "dup": "span.dup", "fancy": "div > #go"},
+        navigating_targets={"amount", "orphan"},
+        click_targets={"go", "vision_only"},
+    )
+
+    assert problems == [
+        "amount: listed as navigating but never leaves the page",
+        "dup: 'span.dup' matches 2 elements on page",
+        "fancy: selector 'div > #go' can't be checked offline",
+        "go: navigates but is not in navigating_targets",
+        "gone: '#gone' is not on any dummy_bank page",
+        "orphan: in navigating_targets but has no selector",
+        "vision_only: no selector, clicks will use vision",
+    ]
+
+
+def test_executor_selector_map_matches_dummy_bank(dummy_bank):
+    assert dummy_bank.validate(SELECTOR_MAP, NAVIGATING_TARGETS, plan_click_targets()) == []
+
+
+def test_executor_reports_selector_problems_in_metrics():
+    executor = ExecutorAgent()
+    assert metrics.snapshot()["selector_map"] == {"problems": []}
+
+    executor.selector_map["invest_button"] = "#gone"
+    executor.validate_selectors()
+
+    assert metrics.snapshot()["selector_map"]["problems"] == [
+        "invest_button: '#gone' is not on any dummy_bank page",
+    ]
+
+
+@pytest.mark.parametrize("target, pages", [
+    ("invest_button", ["index"]),
+    ("transfer_button", ["index"]),
+    ("pay_bill_button", ["index"]),
+    ("proceed_button", ["bill", "gold", "pay_bill"]),
+    ("submit_bill_button", ["bill_confirm", "gold_confirm", "pay_bill_confirm", "transfer_confirm"]),
+])
+def test_selector_map_pages(dummy_bank, target, pages):
+    assert dummy_bank.pages_for(SELECTOR_MAP[target]) == pages
+
+
+def test_index_round_trips_through_json(dummy_bank, tmp_path):
+    path = tmp_path / "selector_index.json"
+    path.write_text(json.dumps(dummy_bank.to_dict()))
+
+    loaded = load_selector_index(str(path))
+
+    assert loaded.pages == dummy_bank.pages
+    assert loaded.stats()["elements"] == dummy_bank.stats()["elements"]
@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import fakeredis
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.api as api
+from services.async_redis_memory import AsyncRedisMemory
+
+
+@pytest.fixture
+def async_memory(redis_server, monkeypatch):
+    memory = AsyncRedisMemory(client=fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True))
+    monkeypatch.setattr(api, "async_redis_memory", memory)
+    return memory
+
+
+def parse(chunk: str):
+    lines = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return lines["event"], json.loads(lines["data"])
+
+
+async def open_stream(session_id="a"):
+    response = await api.stream_state(session_id=session_id)
+    assert response.media_type == "text/event-stream"
+    return response.body_iterator
+
+
+# The stream never ends on its own and TestClient buffers a response
+# until the app returns, so these drive the SSE generator directly
+def test_snapshot_then_deltas(memory, async_memory):
+    session = memory.for_session("a")
+    session.push_log("before")
+    session.set_paused(True)
+
+    async def read():
+        events = await open_stream()
+        try:
+            first = parse(await events.__anext__())
+            # Written by a sync route or worker thread while the stream is open
+            await asyncio.to_thread(session.push_log, "after")
+            second = parse(await events.__anext__())
+            await asyncio.to_thread(session.set_risk, "odd amount")
+            third = parse(await events.__anext__())
+        finally:
+            await events.aclose()
+        return first, second, third
+
+    (event, snapshot), (log_event, log), (risk_event, risk) = asyncio.run(read())
+
+    assert event == "snapshot"
+    assert snapshot["logs"] == ["before"] and snapshot["paused"] is True
+    assert (log_event, log) == ("log", "after")
+    assert (risk_event, risk) == ("risk", "odd amount")
+
+
+def test_other_sessions_deltas_are_not_streamed(memory, async_memory, monkeypatch):
+    monkeypatch.setattr(api, "STREAM_KEEPALIVE_SECONDS", 0.05)
+
+    async def read():
+        events = await open_stream("a")
+        try:
+            await events.__anext__()
+            await asyncio.to_thread(memory.for_session("b").push_log, "for b")
+            return await events.__anext__()
+        finally:
+            await events.aclose()
+
+    assert asyncio.run(read()) == ": keepalive\n\n"
+
+
+def test_stream_rejects_bad_session_ids(async_memory):
+    app = FastAPI()
+    app.include_router(api.router)
+
+    assert TestClient(app).get("/state/stream", params={"session_id": "a:*"}).status_code == 422
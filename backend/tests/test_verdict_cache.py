@@ -0,0 +1,101 @@
+import cv2
+import numpy as np
+import pytest
+
+from services.verdict_cache import VerdictCache
+
+PASS = {"screen_valid": True, "amount_match": True, "entity_match": True}
+MISMATCH = {"screen_valid": True, "amount_match": False, "entity_match": True}
+EXPECTED = ("gold_confirm", 500, "digital_gold")
+
+
+def confirm_screen(amount: str, compression: int = 3) -> bytes:
+    """
+    A gold_confirm-like layout with only the amount varying.
+    """
+    img = np.full((480, 640, 3), 255, np.uint8)
+    cv2.rectangle(img, (60, 60), (580, 420), (200, 200, 200), 2)
+    cv2.putText(img, "Confirm purchase", (100, 130), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    cv2.putText(img, "Digital Gold", (100, 210), cv2.FONT_HERSHEY_SIMPLEX, 1, (40, 40, 40), 2)
+    cv2.putText(img, f"Amount: Rs {amount}", (100, 290), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+    cv2.rectangle(img, (100, 330), (300, 390), (0, 120, 0), -1)
+    ok, buf = cv2.imencode(".png", img, [cv2.IMWRITE_PNG_COMPRESSION, compression])
+    assert ok
+    return buf.tobytes()
+
+
+@pytest.fixture
+def cache():
+    return VerdictCache(shared=None)
+
+
+def test_500_and_5000_screens_get_different_keys(cache):
+    k500 = cache.key(confirm_screen("500"), *EXPECTED)
+    k5000 = cache.key(confirm_screen("5000"), *EXPECTED)
+
+    assert k500.exact != k5000.exact
+    assert k500.perceptual != k5000.perceptual
+
+
+def test_pass_is_only_served_for_the_same_bytes(cache):
+    screen = confirm_screen("500")
+    cache.put(cache.key(screen, *EXPECTED), PASS)
+
+    assert cache.get(cache.key(screen, *EXPECTED)) == PASS
+    # Same pixels re-encoded: perceptually identical, but not the same bytes
+    reencoded = confirm_screen("500", compression=9)
+    assert reencoded != screen
+    assert cache.key(reencoded, *EXPECTED).perceptual == cache.key(screen, *EXPECTED).perceptual
+    assert cache.get(cache.key(reencoded, *EXPECTED)) is None
+
+
+@pytest.mark.parametrize("tampered", ["600", "5000", "50O", "508"])
+def test_pass_is_never_served_for_a_look_alike(cache, tampered):
+    cache.put(cache.key(confirm_screen("500"), *EXPECTED), PASS)
+
+    assert cache.get(cache.key(confirm_screen(tampered), *EXPECTED)) is None
+
+
+def test_tampered_digit_can_collide_on_the_perceptual_hash(cache):
+    # Why passes are keyed on exact bytes: "508" dHashes like "500"
+    original = cache.key(confirm_screen("500"), *EXPECTED)
+    tampered = cache.key(confirm_screen("508"), *EXPECTED)
+
+    assert tampered.perceptual == original.perceptual
+    assert tampered.exact != original.exact
+
+
+def test_failure_is_served_for_perceptually_identical_screens(cache):
+    cache.put(cache.key(confirm_screen("5000"), *EXPECTED), MISMATCH)
+
+    reencoded = confirm_screen("5000", compression=9)
+    assert cache.get(cache.key(reencoded, *EXPECTED)) == MISMATCH
+
+
+def test_expected_values_are_part_of_the_key(cache):
+    screen = confirm_screen("500")
+    cache.put(cache.key(screen, *EXPECTED), PASS)
+
+    assert cache.get(cache.key(screen, "gold_confirm", 5000, "digital_gold")) is None
+    assert cache.get(cache.key(screen, "gold_confirm", 500, "mom")) is None
+
+
+def test_shared_redis_follows_the_same_rules(memory):
+    writer, reader = VerdictCache(shared=memory), VerdictCache(shared=memory)
+    screen = confirm_screen("500")
+    writer.put(writer.key(screen, *EXPECTED), PASS)
+    writer.put(writer.key(confirm_screen("5000"), *EXPECTED), MISMATCH)
+
+    assert reader.get(reader.key(screen, *EXPECTED)) == PASS
+    assert reader.get(reader.key(confirm_screen("500", compression=9), *EXPECTED)) is None
+    assert reader.get(reader.key(confirm_screen("5000", compression=9), *EXPECTED)) == MISMATCH
+
+
+def test_verdicts_are_per_provider(memory):
+    screen = confirm_screen("500")
+    fake = VerdictCache(shared=memory, provider="fake")
+    fake.put(fake.key(screen, *EXPECTED), PASS)
+
+    gemini = VerdictCache(shared=memory, provider="gemini")
+    assert gemini.get(gemini.key(screen, *EXPECTED)) is None
+    assert all(key.startswith("vision:verdict:fake:") for key in memory.r.keys("vision:verdict:*"))
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+import services.vision_client as vision_client
+from services.vision_client import (
+    CircuitBreaker, CircuitOpen, FakeVisionModel, QueueDeadlineExceeded, TokenBucket, VisionClient,
+)
+
+PASS = {"screen_valid": True, "amount_match": True, "entity_match": True}
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(vision_client, "VISION_BACKOFF_BASE_S", 0.01)
+    monkeypatch.setattr(vision_client, "VISION_BACKOFF_MAX_S", 0.02)
+
+
+def client(model, **kwargs):
+    kwargs.setdefault("rate", 0)
+    kwargs.setdefault("breaker", CircuitBreaker(threshold=3, reset_after=0.2))
+    return VisionClient(model, **kwargs)
+
+
+class CountingModel(FakeVisionModel):
+    """
+    Records the most calls that were in flight at once.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.peak = 0
+
+    async def generate_content_async(self, parts):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await super().generate_content_async(parts)
+        finally:
+            self.active -= 1
+
+
+# ------------------------------------
+# Retries and deadlines
+# ------------------------------------
+def test_retry_then_success():
+    # seed 1: the first draw fails (0.13 < 0.5), the second succeeds
+    model = FakeVisionModel(verdict=PASS, latency_s=0, fail_rate=0.5, seed=1)
+    vision = client(model)
+
+    response = vision.generate(["prompt"])
+
+    assert json.loads(response.text) == PASS
+    assert model.calls == 2
+    assert (vision.breaker.state, vision.breaker.failures) == ("closed", 0)
+
+
+def test_retries_run_out():
+    model = FakeVisionModel(latency_s=0, fail_rate=1.0)
+    vision = client(model, max_retries=2, breaker=CircuitBreaker(threshold=10))
+
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        vision.generate(["prompt"])
+
+    assert model.calls == 3
+
+
+def test_hanging_provider_hits_the_deadline():
+    model = FakeVisionModel(hang=True)
+    vision = client(model, timeout=0.05, deadline=0.2, max_retries=50,
+                    breaker=CircuitBreaker(threshold=100))
+
+    start = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        vision.generate(["prompt"])
+
+    assert time.monotonic() - start < 1
+    assert model.calls >= 2
+
+
+def test_deadline_spent_in_the_queue_does_not_trip_the_breaker():
+    model = FakeVisionModel(verdict=PASS, latency_s=0)
+    # One call per second: the second call waits out its deadline locally
+    vision = client(model, rate=1, deadline=0.2, breaker=CircuitBreaker(threshold=1))
+    vision.generate(["first"])
+
+    with pytest.raises(QueueDeadlineExceeded):
+        vision.generate(["second"])
+
+    assert model.calls == 1
+    assert (vision.breaker.state, vision.breaker.failures) == ("closed", 0)
+
+
+def test_cancelled_calls_are_not_provider_failures():
+    model = FakeVisionModel(hang=True)
+    vision = client(model, timeout=5, deadline=5, breaker=CircuitBreaker(threshold=1))
+
+    async def cancel():
+        task = asyncio.ensure_future(vision.generate_async(["prompt"]))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.05)
+
+    asyncio.run(cancel())
+
+    assert model.calls == 1
+    assert (vision.breaker.state, vision.breaker.failures) == ("closed", 0)
+
+
+# ------------------------------------
+# Circuit breaker
+# ------------------------------------
+def test_breaker_opens_half_opens_and_closes():
+    model = FakeVisionModel(verdict=PASS, latency_s=0, fail_rate=1.0)
+    vision = client(model, max_retries=0, breaker=CircuitBreaker(threshold=2, reset_after=0.1))
+
+    for _ in range(2):
+        with pytest.raises(google_exceptions.ServiceUnavailable):
+            vision.generate(["prompt"])
+    assert vision.breaker.state == "open"
+
+    with pytest.raises(CircuitOpen):
+        vision.generate(["prompt"])
+    assert model.calls == 2
+
+    time.sleep(0.1)
+    assert vision.breaker.state == "half_open"
+    model.fail_rate = 0.0
+    vision.generate(["prompt"])
+
+    assert vision.breaker.state == "closed"
+
+
+def test_failed_trial_reopens_the_breaker():
+    breaker = CircuitBreaker(threshold=1, reset_after=0.05)
+    breaker.record_failure()
+    time.sleep(0.05)
+
+    assert breaker.allow() == "half_open"
+    # Only one trial at a time
+    assert breaker.allow() is None
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_released_trial_lets_the_next_call_try():
+    breaker = CircuitBreaker(threshold=1, reset_after=0.05)
+    breaker.record_failure()
+    time.sleep(0.05)
+
+    breaker.release(breaker.allow())
+
+    assert breaker.allow() == "half_open"
+    assert breaker.failures == 1
+
+
+# ------------------------------------
+# Limits
+# ------------------------------------
+def test_concurrency_cap():
+    model = CountingModel(verdict=PASS, latency_s=0.05)
+    vision = client(model, concurrency=2)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda i: vision.generate([f"prompt {i}"]), range(6)))
+
+    assert model.calls == 6
+    assert model.peak == 2
+
+
+def test_token_bucket_spaces_out_calls():
+    bucket = TokenBucket(rate=20, burst=1)
+
+    async def take(n):
+        start = time.monotonic()
+        for _ in range(n):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # One token up front, then one every 50ms
+    assert asyncio.run(take(4)) >= 0.14
+
+
+# ------------------------------------
+# Fake provider
+# ------------------------------------
+def test_fake_provider_rejects_by_default():
+    verdict = json.loads(client(FakeVisionModel(latency_s=0)).generate(["prompt"]).text)
+
+    assert not any(verdict[check] for check in ("screen_valid", "amount_match", "entity_match"))